@@ -1,42 +1,75 @@
 import streamlit as st
 import sys
 import os
+import uuid
 from pathlib import Path
 
 # Add Python path
 project_root = Path(__file__).parent.parent
 sys.path.append(str(project_root / "prompt_solution_crew" / "src"))
 
-def get_solution_index(solution_name):
-    if solution_name == "JARVIS":
-        return "1"
-    elif solution_name == "SHERLOCK": 
-        return "2"
-    else:  # FLASH
-        return "3"
-
-from prompt_solution_crew.crew import PromptSolutionCrew,RequirementsAnalysis,Direction,DirectionsList,PromptTemplate_1,PromptTemplate_2,PromptTemplate_3
-
-# Store and process crew results
-def process_crew_results(results):
-    try:
-        # Return complete analysis results
-        if isinstance(results, dict):
-            return results
-        return {}
-    except Exception as e:
-        st.error(f"Error processing results: {str(e)}")
-        return {}
-
-# Create session state variable to store architect analysis
-if "architect_analysis" not in st.session_state:
-    st.session_state.architect_analysis = None
-
-# Process results and store to session state
-def store_analysis(results):
-    analysis = process_crew_results(results)
-    if analysis:
-        st.session_state.architect_analysis = analysis
+# crewAI 在首次生成时才加载 (pipeline / evaluation 内部延迟导入), 首屏不等待它初始化
+from prompt_solution_crew.cache import get_cache
+from prompt_solution_crew.pipeline import (
+    DEFAULT_CONCURRENCY, DEFAULT_DIRECTIONS, MAX_DIRECTIONS, MIN_DIRECTIONS,
+    planning_usage
+)
+from prompt_solution_crew.jobs import FAILED, FINISHED, QUEUED, get_job_queue
+from prompt_solution_crew.solution import TEXT_FIELDS, Solution, load_solutions
+from prompt_solution_crew.store import get_result_store
+from prompt_solution_crew.streaming import partial_json_values
+from prompt_solution_crew.telemetry import efficiency_scores
+from prompt_solution_crew.evaluation import assemble_prompt, run_tests
+from prompt_solution_crew.budget import FIELD_BUDGETS, fit_text, saved_tokens
+from prompt_solution_crew.ingest import document_text
+from prompt_solution_crew.scoring import DEFAULT_WEIGHTS, rank_solutions, score_tests
+
+# Codenames shown before the architect has named any solutions
+DEFAULT_SOLUTION_NAMES = ["JARVIS", "SHERLOCK", "FLASH"]
+
+# 当前会话的生成结果; 结果存在服务器端共享的结果库中, 会话里只保留 run_id
+def current_run():
+    run_id = st.session_state.get("run_id")
+    return get_result_store().load(run_id) if run_id else None
+
+# 当前会话生成的方案记录; 每个 run 只构建一次, 所有会话共享
+def current_solutions():
+    run_id = st.session_state.get("run_id")
+    return load_solutions(run_id) if run_id else ()
+
+# Number of generated solutions, or the default before the first generation
+def solution_count():
+    return len(current_solutions()) or DEFAULT_DIRECTIONS
+
+# Solution ``number`` (1-based), or None while it is not generated
+def get_solution(number):
+    solutions = current_solutions()
+    return solutions[number - 1] if number <= len(solutions) else None
+
+# Placeholder shown in the cards before the first generation
+NOT_GENERATED = Solution.from_dict(dict.fromkeys(TEXT_FIELDS, "Not Generated..."))
+
+# Telemetry summary of solution ``number``'s engineer crew on its last run
+def solution_telemetry(number):
+    solution = get_solution(number)
+    return solution.telemetry if solution else None
+
+# Codenames of the generated solutions, falling back to the defaults
+def solution_names():
+    return [
+        getattr(get_solution(i + 1), "codename", None) or (
+            DEFAULT_SOLUTION_NAMES[i] if i < len(DEFAULT_SOLUTION_NAMES) else f"Solution {i + 1}"
+        )
+        for i in range(solution_count())
+    ]
+
+# 每个浏览器会话一个任务归属 ID, 后台队列据此在多个用户之间公平调度
+if "job_owner" not in st.session_state:
+    st.session_state.job_owner = uuid.uuid4().hex
+
+# 刷新页面后从 URL 恢复仍在运行的生成任务
+if "generation_job" not in st.session_state and st.query_params.get("job"):
+    st.session_state.generation_job = st.query_params["job"]
 
 # Page Configuration
 st.set_page_config(
@@ -139,6 +172,15 @@ Email: john.smith@example.com
 Order Number: ORD-2024-001''',
             help="Paste or upload related data (supports JSON or CSV)"
         )
+        # 上传的 PDF 按内容缓存提取结果, 重新运行脚本时不会再次解析
+        sample_file = st.file_uploader("Or use a PDF as sample data", type=['pdf'], key="sample_data_file")
+        if sample_file:
+            try:
+                data_input = document_text(sample_file)
+            except Exception as e:
+                st.error(f"Could not read {sample_file.name}: {str(e)}")
+            else:
+                st.caption(f"Sample data taken from {sample_file.name}")
     
     # Few-Shot Examples (Optional)
     with st.expander("Few-Shot Examples (Optional)"):
@@ -189,164 +231,109 @@ Order Number: ORD-2024-001''',
             if st.session_state.num_examples > 1:
                 st.button("➖ Remove Example", on_click=remove_example)
 
-    # Action Buttons
-    if st.button("Generate Prompt", type="primary"):
-        try:
-            # 创建状态容器
-            status_container = st.empty()
-            result_container = st.empty()
-            
-            # 显示初始状态
-            status_container.info("Initializing PromptSolutionCrew...")
-            
-            # 从Task Configuration收集用户设置
-            
-            # 收集Few-Shot Examples
-            examples = []
-            for i in range(st.session_state.num_examples):
-                example_input = st.session_state.get(f"example_input_{i}")
-                example_output = st.session_state.get(f"example_output_{i}")
-                if example_input and example_output:
-                    examples.append({
-                        "input": example_input,
-                        "output": example_output
-                    })
+    # Execution Settings
+    direction_count = st.slider(
+        "Number of directions",
+        min_value=MIN_DIRECTIONS,
+        max_value=MAX_DIRECTIONS,
+        value=DEFAULT_DIRECTIONS,
+        help="How many optimization directions the architect proposes; each becomes one prompt solution"
+    )
+    max_concurrency = st.slider(
+        "Concurrent prompt engineers",
+        min_value=1,
+        max_value=MAX_DIRECTIONS,
+        value=DEFAULT_CONCURRENCY,
+        help="How many prompt engineer crews run at the same time; 1 runs them one after another"
+    )
+    use_cache = st.checkbox(
+        "Reuse cached results",
+        value=True,
+        help="Return stored results instantly when the same configuration was generated before"
+    )
+    planning_modes = {"On": "on", "Architect only": "architect_only", "Off": "off"}
+    planning_mode = planning_modes[st.selectbox(
+        "Crew planning",
+        options=list(planning_modes),
+        index=0,
+        help="Crew planning adds a planner LLM call before each crew runs"
+    )]
+    with st.expander("Planning cost"):
+        usage = planning_usage()
+        if usage:
+            for crew_name, crew_usage in usage.items():
+                st.caption(
+                    f"{crew_name}: {crew_usage['seconds']:.1f}s, "
+                    f"{crew_usage['prompt_tokens'] + crew_usage['completion_tokens']:.0f} tokens "
+                    f"(avg of {crew_usage['runs']} runs)"
+                )
+        else:
+            st.caption("No planning runs recorded yet.")
+    cache_stats = get_cache().stats()
+    st.caption(f"Cache: {cache_stats['hits']} hits / {cache_stats['misses']} misses")
 
-            # 准备输入数
-            inputs = {
-                'task_description': task_description,
-                'task_type': task_type,
-                'model_preference': str(model_preference),
-                'tone': tone,
-                'context': context or 'not defined',
-                'sample_data': data_input or 'not defined',
-                'examples': str(examples) if examples else 'not defined'
-            }
-            
-            # 更
-            status_container.info("Starting Architecture Analysis...")
-            
-            # 显示用户输入的配置信息
-            st.subheader("User Configuration")
-            st.code(inputs, language="text")
-            
-            # 使用 spinner 显示生成过程
-            with st.spinner('Generating...'):
-                try:
-                    # 创建 PromptSolutionCrew 实例并运行
-                    architect_crew = PromptSolutionCrew().architect_crew()
-                    architect_results = architect_crew.kickoff(inputs=inputs)
-                    
-                    # 更新状态
-                    status_container.success("✅ Architecture Analysis Complete!")
-                    
-                    # 显示架构分析结果
-                    if architect_results:
-                        result_container.json(architect_results)
-                        
-                        # 存储架构分析结果
-                        store_analysis(architect_results)
-                        
-                        # 准备 prompt engineer 1 的输入
-                        prompt_inputs_1 = {
-                            **inputs,  # 包含原始输入
-                            "architect_direction": architect_results["directions"][0]  # 传递第一个方向
-                        }
-
-                        # 准备 prompt engineer 1 的输入
-                        prompt_inputs_2 = {
-                            **inputs,  # 包含原始输入
-                            "architect_direction": architect_results["directions"][1]  # 传递第二个方向
-                        }
-
-                        # 准备 prompt engineer 1 的输入
-                        prompt_inputs_3 = {
-                            **inputs,  # 包含原始输入
-                            "architect_direction": architect_results["directions"][2]  # 传递第三个方向
-                        }
-                        
-                        # 运行 prompt engineer crew 1
-                        status_container.info("Starting Prompt 1 Optimization...")
-                        with st.spinner('Generating Optimized Prompts...'):
-                            try:
-                                prompt_engineer_crew_1 = PromptSolutionCrew().prompt_engineer_crew_1()
-                                engineer_results_1 = prompt_engineer_crew_1.kickoff(inputs=prompt_inputs_1)
-                                
-                                prompt_engineer_crew_2 = PromptSolutionCrew().prompt_engineer_crew_2()
-                                engineer_results_2 = prompt_engineer_crew_2.kickoff(inputs=prompt_inputs_2)
-                                
-                                prompt_engineer_crew_3 = PromptSolutionCrew().prompt_engineer_crew_3()
-                                engineer_results_3 = prompt_engineer_crew_3.kickoff(inputs=prompt_inputs_3)
-                                
-                                # 更新状态
-                                status_container.success("✅ Prompt 1, 2, 3 Generation Successful!")
-                                
-                                # 存储结果
-                                st.session_state.prompt_result_1 = engineer_results_1
-                                st.session_state.direction_1 = architect_results['directions'][0]['focus']
-                                st.session_state.name_1 = architect_results['directions'][0]['name']
-                                st.session_state.codename_1 = architect_results['directions'][0]['codename']
-
-
-
-                                st.session_state.overview_1 = engineer_results_1['explanation_of_optimization_choices']
-                                st.session_state.role_1 = engineer_results_1['role']
-                                st.session_state.task_1 = engineer_results_1['task']
-                                st.session_state.rules_1 = engineer_results_1['rules_constraints']
-                                st.session_state.selected_reasoning_methods_1 = engineer_results_1['reasoning_method']
-                                st.session_state.selected_planning_methods_1 = engineer_results_1['planning_method']
-                                st.session_state.output_format_1 = engineer_results_1['output_format']
-                                  # 存储结果
-                                st.session_state.prompt_result_2 = engineer_results_2
-                                st.session_state.direction_2 = architect_results['directions'][1]['focus']
-                                st.session_state.name_2 = architect_results['directions'][1]['name']
-                                st.session_state.codename_2 = architect_results['directions'][1]['codename']
-                                st.session_state.overview_2 = engineer_results_2['explanation_of_optimization_choices']
-                                st.session_state.role_2 = engineer_results_2['role']
-                                st.session_state.task_2 = engineer_results_2['task']
-                                st.session_state.rules_2 = engineer_results_2['rules_constraints']
-                                st.session_state.selected_reasoning_methods_2 = engineer_results_2['reasoning_method']
-                                st.session_state.selected_planning_methods_2 = engineer_results_2['planning_method']
-                                st.session_state.output_format_2 = engineer_results_2['output_format']
-                                  # 存储结果
-                                st.session_state.prompt_result_3 = engineer_results_3
-                                st.session_state.direction_3 = architect_results['directions'][2]['focus']
-                                st.session_state.name_3 = architect_results['directions'][2]['name']
-                                st.session_state.codename_3 = architect_results['directions'][2]['codename']
-                                st.session_state.overview_3 = engineer_results_3['explanation_of_optimization_choices']
-                                st.session_state.role_3 = engineer_results_3['role']
-                                st.session_state.task_3 = engineer_results_3['task']
-                                st.session_state.rules_3 = engineer_results_3['rules_constraints']
-                                st.session_state.selected_reasoning_methods_3 = engineer_results_3['reasoning_method']
-                                st.session_state.selected_planning_methods_3 = engineer_results_3['planning_method']
-                                st.session_state.output_format_3 = engineer_results_3['output_format']
-                                
-
-                                # 显示优化后的提示词
-                                st.subheader("��� Optimized Prompt 1 Structure")
-                                st.json(engineer_results_1)
-                                
-                                st.subheader("🎯 Optimized Prompt 2 Structure")
-                                st.json(engineer_results_2)
-                                
-                                st.subheader("🎯 Optimized Prompt 3 Structure")
-                                st.json(engineer_results_3)
-                            except Exception as e:
-                                st.error(f"Error during Prompt 1, 2, 3 generation: {str(e)}")
-                                st.exception(e)
-                    else:
-                        result_container.info("Generation complete, but no results returned.")
-                        
-                except Exception as e:
-                    st.error(f"Error during generation process: {str(e)}")
-                    st.error("Detailed error information:")
-                    st.exception(e)
-                    
-        except Exception as e:
-            st.error(f"Error during initialization: {str(e)}")
-            st.error("Detailed error information:")
-            st.exception(e)
-            st.error("Please check configuration and try again")
+    # Action Buttons
+    generation_status = st.empty()
+    # 已有生成任务在运行时禁用按钮, 避免同一会话重复提交
+    if st.button("Generate Prompt", type="primary", disabled="generation_job" in st.session_state):
+        # 收集Few-Shot Examples
+        examples = []
+        for i in range(st.session_state.num_examples):
+            example_input = st.session_state.get(f"example_input_{i}")
+            example_output = st.session_state.get(f"example_output_{i}")
+            if example_input and example_output:
+                examples.append({
+                    "input": example_input,
+                    "output": example_output
+                })
+
+        # 准备输入数
+        inputs = {
+            'task_description': task_description,
+            'task_type': task_type,
+            'model_preference': str(model_preference),
+            'tone': tone,
+            'context': context or 'not defined',
+            'sample_data': data_input or 'not defined',
+            'examples': str(examples) if examples else 'not defined'
+        }
+        
+        # 生成作为后台任务提交, 页面重跑或断线重连都不会中断它; 任务 ID 也写入 URL, 刷新页面后可继续轮询
+        st.session_state.generation_job = get_job_queue().submit(st.session_state.job_owner, {
+            "inputs": inputs,
+            "direction_count": direction_count,
+            "max_concurrency": max_concurrency,
+            "use_cache": use_cache,
+            "planning_mode": planning_mode,
+        })
+        st.session_state.generation_inputs = inputs
+        st.query_params["job"] = st.session_state.generation_job
+        # 重跑页面, 让按钮以禁用状态重新渲染
+        st.rerun()
+
+    # 任务运行期间显示用户输入的配置信息
+    if "generation_job" in st.session_state and "generation_inputs" in st.session_state:
+        st.subheader("User Configuration")
+        st.code(st.session_state.generation_inputs, language="text")
+
+    # 上一次生成任务的结果提示
+    generation_message = st.session_state.pop("generation_message", None)
+    if generation_message:
+        getattr(generation_status, generation_message[0])(generation_message[1])
+    
+    # 上一次生成的耗时
+    run = current_run()
+    if run:
+        st.caption(" | ".join(
+            f"Prompt {i + 1}: {seconds:.1f}s" for i, seconds in enumerate(run["timings"])
+        ))
+        # 超出 token 预算的 Context / Sample Data 在生成前只裁剪一次, 所有 crew 共用裁剪后的文本
+        saved = saved_tokens(run.get("input_budget", {}))
+        if saved:
+            crews = 1 + len(run["solutions"])
+            st.caption(f"Inputs trimmed to budget: {saved:,} tokens saved per crew, {saved * crews:,} across {crews} crews")
+        with st.expander("Architecture Analysis"):
+            st.json(run["architect"])
     
 # Main Content Area
 st.title("Prompt Generator")
@@ -354,212 +341,59 @@ st.title("Prompt Generator")
 
 # Top Section: Prompt Comparison
 
-# Function to render prompt card
-def render_prompt_card(col, version, model_name="claude-3-opus"):
-    with col:
-        # Header section with title and buttons
-        st.markdown(f"""
-            <div style='display: flex; flex-direction: column; margin-bottom: 20px;'>
-                <h2 style='margin: 0; font-size: 1.5em; font-weight: bold;'>{
-                    st.session_state.get('codename_1', 'Not Generated...') if version == "Solution A" else 
-                    st.session_state.get('codename_2', 'Not Generated...') if version == "Solution B" else 
-                    st.session_state.get('codename_3', 'Not Generated...')}</h2>
-                <h4 style='margin: 5px 0; color: #666; font-size: 1em;'>{
-                    st.session_state.get('name_1', 'Not Generated...') if version == "Solution A" else
-                    st.session_state.get('name_2', 'Not Generated...') if version == "Solution B" else
-                    st.session_state.get('name_3', 'Not Generated...')}</h4>
-                <div style='display: flex; gap: 8px; margin-top: 5px;'>
-                    <div id='favorite_{version}' class='icon-button favorite'>⭐</div>
-                    <div class='icon-button'>📥</div>
-                    <div class='icon-button'>🔍</div>
-                </div>
-            </div>
-        """, unsafe_allow_html=True)
-        
-        # Version info
-        st.markdown("<div style='color: #666; margin-bottom: 10px;'>Version 1.0 (2024-12-14)</div>", unsafe_allow_html=True)
-
-        # Solution Introduction
-        st.markdown("<h4 style='margin-top: 20px;'>Direction</h4>", unsafe_allow_html=True)
-
-        # 从 session_state 获取概述文本
-        intro_text = (
-            st.session_state.get('direction_1', 'Not Generated...') if version == "Solution A" else
-            st.session_state.get('direction_2', 'Not Generated...') if version == "Solution B" else
-            st.session_state.get('direction_3', 'Not Generated...')
-        )
-        
-        st.markdown(f"""
-            <div style='
-                background-color: #f8f9fa; 
-                padding: 5px; 
-                border-radius: 4px; 
-                margin-top: 5px; 
-                margin-bottom: 5px; 
-                border: 1px solid #e9ecef;
-                height: 120px;           /* 固定高度 */
-                overflow-y: auto;        /* 内容超出时显示滚动条 */
-            '>
-                <div style='font-size: 0.9em; color: #444; line-height: 1.5; white-space: pre-line;'>
-                    {intro_text}
-                </div>
-            </div>
-        """, unsafe_allow_html=True)
-        
-        
-        # Solution Introduction
-        st.markdown("<h4 style='margin-top: 20px;'>Overview</h4>", unsafe_allow_html=True)
-
-        # 从 session_state 获取概述文本
-        intro_text = (
-            st.session_state.get('overview_1', 'Not Generated...') if version == "Solution A" else
-            st.session_state.get('overview_2', 'Not Generated...') if version == "Solution B" else
-            st.session_state.get('overview_3', 'Not Generated...')
-        )
-        
-        st.markdown(f"""
-            <div style='
-                background-color: #f8f9fa; 
-                padding: 5px; 
-                border-radius: 4px; 
-                margin-top: 5px; 
-                margin-bottom: 5px; 
-                border: 1px solid #e9ecef;
-                height: 200px;           /* 固定高度 */
-                overflow-y: auto;        /* 内容超出时显示滚动条 */
-            '>
-                <div style='font-size: 0.9em; color: #444; line-height: 1.5; white-space: pre-line;'>
-                    {intro_text}
-                </div>
-            </div>
-        """, unsafe_allow_html=True)
-        
-        # Prompt Structure
-        st.markdown("<h4 style='margin-top: 20px;'>Prompt Structure</h4>", unsafe_allow_html=True)
-        
-        # Role Section
-        st.markdown("<div class='section-label'>Role</div>", unsafe_allow_html=True)
-        default_role =  st.session_state.get('role_1', 'Not Generated...') if version == "Solution A" else (st.session_state.get('role_2', 'Not Generated...') if version == "Solution B" else st.session_state.get('role_3', 'Not Generated...'))
-        st.text_area(
-            "Define the role",
-            value=default_role,
-            key=f"{version}_role",
-            height=200,
-            label_visibility="collapsed"
-        )
-        
-        # Task Section
-        st.markdown("<div class='section-label'>Task</div>", unsafe_allow_html=True)
-        default_task = st.session_state.get('task_1', 'Not Generated...') if version == "Solution A" else (st.session_state.get('task_2', 'Not Generated...') if version == "Solution B" else st.session_state.get('task_3', 'Not Generated...'))
-        st.text_area(
-            "Define the task",
-            value=default_task,
-            key=f"{version}_task",
-            height=200,
-            label_visibility="collapsed"
-        )
-        
-        # Rules Section
-        st.markdown("<div class='section-label'>Rules & Constraints</div>", unsafe_allow_html=True)
-        default_rules = st.session_state.get('rules_1', 'Not Generated...') if version == "Solution A" else (st.session_state.get('rules_2', 'Not Generated...') if version == "Solution B" else st.session_state.get('rules_3', 'Not Generated...'))
-        st.text_area(
-            "Define rules",
-            value=default_rules,
-            key=f"{version}_rules",
-            height=200,
-            label_visibility="collapsed"
-        )
-        
-
-        # Add JavaScript for showing original context
-        st.markdown("""
-        <script>
-            document.addEventListener('DOMContentLoaded', function() {
-                const showOriginalButtons = document.querySelectorAll('.show-original');
-                showOriginalButtons.forEach(button => {
-                    button.addEventListener('click', function() {
-                        // Show original context in a modal or tooltip
-                        alert(`Original Context:\n\n${default_context}`);
-                    });
-                });
-            });
-        </script>
-        """, unsafe_allow_html=True)
-        
-        # Update CSS for context icon
-        st.markdown("""
-        <style>
-        .show-original {
-            cursor: pointer;
-            padding: 2px 8px;
-            font-size: 0.9em;
-        }
-        .show-original:hover {
-            background: #e9ecef;
-            border-radius: 4px;
-        }
-        </style>
-        """, unsafe_allow_html=True)
-        
-        # Reasoning Section
-        st.markdown("<div class='section-label'>Reasoning</div>", unsafe_allow_html=True)
-
-        default_reasoning_content = st.session_state.get('selected_reasoning_methods_1', 'Not Generated...') if version == "Solution A" else (st.session_state.get('selected_reasoning_methods_2', 'Not Generated...') if version == "Solution B" else st.session_state.get('selected_reasoning_methods_3', 'Not Generated...'))
-        st.text_area(
-            "Define reasoning",
-            value=default_reasoning_content,
-            key=f"{version}_reasoning_area",
-            height=150,
-            label_visibility="collapsed"
-        )
- 
-        # Planning Section
-        st.markdown("<div class='section-label'>Planning</div>", unsafe_allow_html=True)
-        
-        default_planning_content = st.session_state.get('selected_planning_methods_1', 'Not Generated...') if version == "Solution A" else (st.session_state.get('selected_planning_methods_2', 'Not Generated...') if version == "Solution B" else st.session_state.get('selected_planning_methods_3', 'Not Generated...'))
-        st.text_area(
-            "Define planning",
-            value=default_planning_content,
-            key=f"{version}_planning_area",
-            height=150,
-            label_visibility="collapsed"
-        )
-
-        # Output Format Section
-        st.markdown("<div class='section-label'>Output Format</div>", unsafe_allow_html=True)
-
-        default_output_content = st.session_state.get('output_format_1', 'Not Generated...') if version == "Solution A" else (st.session_state.get('output_format_2', 'Not Generated...') if version == "Solution B" else st.session_state.get('output_format_3', 'Not Generated...'))
-        st.text_area(
-            "Define output format",
-            value=default_output_content,
-            key=f"{version}_output_area",
-            height=150,
-            label_visibility="collapsed"
-        )
-        
-
-        # Enhancements Section
-        with st.expander("Enhancements(TODO)"):
-
-            # Reasoning Method Selection
-            default_reasoning_method = "Chain-of-Thought (CoT)" if version == "Solution A" else ("ReAct" if version == "Solution B" else "Tree-of-Thought (ToT)")
-            reasoning_method = st.selectbox(
-                "Change Reasoning Method",
-                options=[
-                    "Chain-of-Thought (CoT)",
-                "Tree-of-Thought (ToT)",
-                "Buffer of Thoughts (BoT)",
-                "ReAct",
-                "Program-of-Thought"
-            ],
-            index=["Chain-of-Thought (CoT)", "Tree-of-Thought (ToT)", "Buffer of Thoughts (BoT)", "ReAct", "Program-of-Thought"].index(default_reasoning_method),
-                key=f"{version}_reasoning_method",
-                help="Select the reasoning method that best fits your task"
-            )
-        
-        # Reasoning Details based on selected method
-            reasoning_templates = {
-            "Chain-of-Thought (CoT)": """Implementation Details for Chain-of-Thought:
+# Card templates, built once per process instead of on every rerun of every card.
+# Lists with three entries hold the defaults of Solution A, Solution B and all later solutions.
+
+CARD_HEADER_HTML = """
+    <div style='display: flex; flex-direction: column; margin-bottom: 20px;'>
+        <h2 style='margin: 0; font-size: 1.5em; font-weight: bold;'>{codename}</h2>
+        <h4 style='margin: 5px 0; color: #666; font-size: 1em;'>{name}</h4>
+        <div style='display: flex; gap: 8px; margin-top: 5px;'>
+            <div id='favorite_{version}' class='icon-button favorite'>⭐</div>
+            <div class='icon-button'>📥</div>
+            <div class='icon-button'>🔍</div>
+        </div>
+    </div>
+    <div style='color: #666; margin-bottom: 10px;'>Version 1.0 (2024-12-14)</div>
+"""
+
+# Heading plus a fixed-height scrolling panel, for the Direction and Overview texts
+CARD_PANEL_HTML = """
+    <h4 style='margin-top: 20px;'>{title}</h4>
+    <div style='
+        background-color: #f8f9fa;
+        padding: 5px;
+        border-radius: 4px;
+        margin-top: 5px;
+        margin-bottom: 5px;
+        border: 1px solid #e9ecef;
+        height: {height}px;      /* 固定高度 */
+        overflow-y: auto;        /* 内容超出时显示滚动条 */
+    '>
+        <div style='font-size: 0.9em; color: #444; line-height: 1.5; white-space: pre-line;'>
+            {text}
+        </div>
+    </div>
+"""
+
+CONTEXT_LABEL_HTML = """
+    <div style='display: flex; align-items: center; gap: 8px;'>
+        <div class='section-label'>Context</div>
+        <div class='icon-button show-original' title='Show Original Context'>📄</div>
+    </div>
+"""
+
+REASONING_METHODS = [
+    "Chain-of-Thought (CoT)",
+    "Tree-of-Thought (ToT)",
+    "Buffer of Thoughts (BoT)",
+    "ReAct",
+    "Program-of-Thought"
+]
+DEFAULT_REASONING_METHODS = ["Chain-of-Thought (CoT)", "ReAct", "Tree-of-Thought (ToT)"]
+
+REASONING_TEMPLATES = {
+    "Chain-of-Thought (CoT)": """Implementation Details for Chain-of-Thought:
 
 1. Initial Data Scan
    - Identify all potential data fields in email and attachments
@@ -578,7 +412,7 @@ def render_prompt_card(col, version, model_name="claude-3-opus"):
    - Compare data between email body and attachments
    - Resolve conflicts using priority rules
    - Document reasoning for choices made""",
-            "ReAct": """Implementation Details for ReAct:
+    "ReAct": """Implementation Details for ReAct:
 
 1. Observation Phase
    - Scan document for target fields
@@ -599,7 +433,7 @@ def render_prompt_card(col, version, model_name="claude-3-opus"):
    - Check extraction results
    - Validate against rules
    - Document any issues""",
-            "Tree-of-Thought (ToT)": """Implementation Details for Tree-of-Thought:
+    "Tree-of-Thought (ToT)": """Implementation Details for Tree-of-Thought:
 
 1. Root Analysis
    - Identify document structure
@@ -620,35 +454,19 @@ def render_prompt_card(col, version, model_name="claude-3-opus"):
    - Combine successful paths
    - Apply final validation
    - Generate output"""
-        }
-        
-            default_reasoning = reasoning_templates.get(reasoning_method, "")
-            st.text_area(
-                "Define reasoning",
-                value=default_reasoning,
-                key=f"{version}_reasoning",
-                height=250,
-                label_visibility="collapsed"
-            )
-            # Planning Method Selection
-            default_planning_method = "Least-to-Most Decomposition" if version == "Solution A" else ("Plan-and-Solve Strategy" if version == "Solution B" else "Progressive Task Refinement")
-            planning_method = st.selectbox(
-                "Change Planning Method",
-                options=[
-                    "Least-to-Most Decomposition",
-                    "Plan-and-Solve Strategy", 
-                    "Progressive Task Refinement",
-                    "Dependency-Based Planning",
-                    "Hierarchical Task Planning"
-                ],
-                index=["Least-to-Most Decomposition", "Plan-and-Solve Strategy", "Progressive Task Refinement", "Dependency-Based Planning", "Hierarchical Task Planning"].index(default_planning_method),
-                key=f"{version}_planning_method",
-                help="Select the planning method that best fits your task complexity"
-            )
-            
-            # Planning Details based on selected method
-            planning_templates = {
-                "Least-to-Most Decomposition": """Implementation of Least-to-Most Decomposition:
+}
+
+PLANNING_METHODS = [
+    "Least-to-Most Decomposition",
+    "Plan-and-Solve Strategy",
+    "Progressive Task Refinement",
+    "Dependency-Based Planning",
+    "Hierarchical Task Planning"
+]
+DEFAULT_PLANNING_METHODS = ["Least-to-Most Decomposition", "Plan-and-Solve Strategy", "Progressive Task Refinement"]
+
+PLANNING_TEMPLATES = {
+    "Least-to-Most Decomposition": """Implementation of Least-to-Most Decomposition:
 
 1. Field-level Tasks
    - Identify required fields (order_number, dates, emails, etc.)
@@ -669,7 +487,7 @@ def render_prompt_card(col, version, model_name="claude-3-opus"):
    - Verify data completeness
    - Check format compliance
    - Validate business rules""",
-                "Plan-and-Solve Strategy": """Implementation of Plan-and-Solve Strategy:
+    "Plan-and-Solve Strategy": """Implementation of Plan-and-Solve Strategy:
 
 1. Analysis Phase
    - Identify document type and structure
@@ -690,7 +508,7 @@ def render_prompt_card(col, version, model_name="claude-3-opus"):
    - Run validation suite
    - Check completeness
    - Generate quality report""",
-                "Progressive Task Refinement": """Implementation of Progressive Task Refinement:
+    "Progressive Task Refinement": """Implementation of Progressive Task Refinement:
 
 1. Initial Scan
    - Quick document overview
@@ -711,44 +529,10 @@ def render_prompt_card(col, version, model_name="claude-3-opus"):
    - Verify all fields
    - Format consistency
    - Output preparation"""
-            }
-            
-            default_planning = planning_templates.get(planning_method, "")
-            st.text_area(
-                "Define planning",
-                value=default_planning,
-                key=f"{version}_planning",
-                height=200,
-                label_visibility="collapsed"
-            )
-            # Multi-Model Evaluation
-            st.markdown("<div class='section-label'>Multi-Model Evaluation</div>", unsafe_allow_html=True)
-            
-            # Get user's model preference (use the first selected GPT model)
-            selected_model = None
-            for model, versions in model_options.items():
-                if model == "GPT" and st.session_state.get(f"checkbox_{model}", False):
-                    selected_versions = st.session_state.get(f"multiselect_{model}", [])
-                    if selected_versions:
-                        selected_model = selected_versions[0]
-                        break
-            
-            if not selected_model:
-                selected_model = "gpt-4-turbo"  # 默认模型
-            
-            # Display selected model status
-            st.markdown("##### Model Status")
-            st.markdown(f"""
-                <div style='display: flex; align-items: center; gap: 8px; margin-bottom: 4px;'>
-                    <div style='color: #28a745;'>●</div>
-                    <div style='font-weight: 500;'>{selected_model}</div>
-                    <div style='color: #28a745; font-size: 0.9em;'>(User Preferred Model)</div>
-                </div>
-            """, unsafe_allow_html=True)
-            
-            # Model Selection Rationale
-            st.markdown("##### Selection Rationale")
-            default_rationale = """This prompt configuration is optimized for data extraction tasks with the following considerations:
+}
+
+SELECTION_RATIONALES = [
+    """This prompt configuration is optimized for data extraction tasks with the following considerations:
 
 1. Model Selection:
    - Using GPT-4 Turbo as the primary model for its superior performance in structured data extraction
@@ -762,7 +546,8 @@ def render_prompt_card(col, version, model_name="claude-3-opus"):
 3. Performance Benefits:
    - High accuracy in field extraction
    - Fast processing speed
-   - Cost-effective for production use""" if version == "Solution A" else ("""This prompt configuration is optimized for validation tasks with the following considerations:
+   - Cost-effective for production use""",
+    """This prompt configuration is optimized for validation tasks with the following considerations:
 
 1. Model Selection:
    - Using GPT-4 Turbo for its robust validation capabilities
@@ -776,7 +561,8 @@ def render_prompt_card(col, version, model_name="claude-3-opus"):
 3. Performance Benefits:
    - High validation accuracy
    - Real-time processing
-   - Efficient error handling""" if version == "Solution B" else """This prompt configuration is optimized for minimal extraction with the following considerations:
+   - Efficient error handling""",
+    """This prompt configuration is optimized for minimal extraction with the following considerations:
 
 1. Model Selection:
    - Using GPT-4 Turbo for its precise extraction capabilities
@@ -790,95 +576,11 @@ def render_prompt_card(col, version, model_name="claude-3-opus"):
 3. Performance Benefits:
    - Quick response time
    - Resource efficient
-   - Cost optimized""")
-            
-            st.text_area(
-                "Model Selection Reasoning",
-                value=default_rationale,
-                height=200,
-                key=f"{version}_model_rationale",
-                help="Explanation of why this model was selected for this prompt"
-            )
-            
-            # Model Settings
-            st.markdown("##### Model Settings")
-            cols = st.columns(2)
-            
-            with cols[0]:
-                # Temperature
-                st.slider(
-                    "Temperature",
-                    min_value=0.0,
-                    max_value=1.0,
-                    value=0.7,
-                    step=0.1,
-                    key=f"{version}_temp",
-                    help="Controls randomness in the output"
-                )
-                
-                # Top P
-                st.slider(
-                    "Top P",
-                    min_value=0.0,
-                    max_value=1.0,
-                    value=0.9,
-                    step=0.1,
-                    key=f"{version}_top_p",
-                    help="Controls diversity via nucleus sampling"
-                )
-            
-            with cols[1]:
-                # Max tokens
-                st.number_input(
-                    "Max Tokens",
-                    min_value=1,
-                    max_value=4096,
-                    value=2048,
-                    step=1,
-                    key=f"{version}_max_tokens",
-                    help="Maximum number of tokens to generate"
-                )
-                
-                # Frequency Penalty
-                st.slider(
-                    "Frequency Penalty",
-                    min_value=-2.0,
-                    max_value=2.0,
-                    value=0.0,
-                    step=0.1,
-                    key=f"{version}_freq_penalty",
-                    help="Adjusts likelihood based on frequency"
-                )
-            
-            st.markdown("---")
-            
-            # Dynamic Prompt Optimization
-            st.markdown("<div class='section-label'>Dynamic Prompt Optimization</div>", unsafe_allow_html=True)
-            
-            # Examples Section
-            st.markdown("##### Examples")
-            
-            # Container for examples
-            examples_container = st.container()
-            
-            # State for tracking number of examples
-            if f'{version}_num_examples' not in st.session_state:
-                st.session_state[f'{version}_num_examples'] = 3  # Default 3 examples
-
-
-            # Context Section
-            st.markdown("""
-                <div style='display: flex; align-items: center; gap: 8px;'>
-                    <div class='section-label'>Context</div>
-                    <div class='icon-button show-original' title='Show Original Context'>📄</div>
-                </div>
-            """, unsafe_allow_html=True)
-            
-            # Get user input from sidebar
-            user_context = context if 'context' in locals() else ""
-            
-            # Default context when no user input
-            default_context = """Background:
+   - Cost optimized"""
+]
+
+DEFAULT_CONTEXTS = [
+    """Background:
 - TechHeroes is an e-commerce company specializing in tech products
 - They receive orders through email and various document formats
 - The system needs to process both direct customer emails and forwarded messages
@@ -896,7 +598,8 @@ Technical Environment:
 Business Requirements:
 - 24/7 order processing capability
 - Real-time data extraction and validation
-- Compliance with data protection regulations""" if version == "Solution A" else ("""Processing Environment:
+- Compliance with data protection regulations""",
+    """Processing Environment:
 - PDF processing system with OCR capabilities
 - Regular document structure updates
 - High volume of daily orders
@@ -914,7 +617,8 @@ Technical Setup:
 Quality Requirements:
 - 99.9% accuracy target
 - Real-time validation
-- Automated error reporting""" if version == "Solution B" else """Processing Setup:
+- Automated error reporting""",
+    """Processing Setup:
 - Basic PDF text extraction
 - Single-thread processing
 - Minimal memory usage
@@ -932,23 +636,12 @@ Technical Environment:
 Performance Focus:
 - Speed over complexity
 - Resource efficiency
-- Minimal overhead""")
-
-            # Display context with user input override
-            display_context = user_context if user_context else default_context
-            st.text_area(
-                "Define context",
-                value=display_context,
-                key=f"{version}_context",
-                height=200,
-                label_visibility="collapsed"
-        )
-                        
-            
-            # Default examples data
-            default_examples = [
-                {
-                    "input": """Email Content:
+- Minimal overhead"""
+]
+
+DEFAULT_EXAMPLES = [
+    {
+        "input": """Email Content:
 Subject: Order Confirmation #12345
 From: john.smith@company.com
 Date: 2024-03-15
@@ -956,7 +649,7 @@ Date: 2024-03-15
 Dear TechHeroes,
 Please process my order #TH-2024-12345.
 Shipping Address: 123 Main St, Boston, MA 02108""",
-                    "output": """{
+        "output": """{
   "order_number": "TH202412345",
   "buyer_email": "john.smith@company.com",
   "order_date": "2024-03-15",
@@ -967,15 +660,15 @@ Shipping Address: 123 Main St, Boston, MA 02108""",
     "zip": "02108"
   }
 }"""
-                },
-                {
-                    "input": """Attachment: invoice.pdf
+    },
+    {
+        "input": """Attachment: invoice.pdf
 Order: #TH-2024-56789
 Customer: Jane Doe (jane.doe@email.com)
 Products:
 - 2x TH-PRD-001 ($99.99 each)
 - 1x TH-PRD-002 ($149.99)""",
-                    "output": """{
+        "output": """{
   "order_number": "TH202456789",
   "buyer_email": "jane.doe@email.com",
   "products": [
@@ -991,16 +684,16 @@ Products:
     }
   ]
 }"""
-                },
-                {
-                    "input": """Email Content:
+    },
+    {
+        "input": """Email Content:
 From: support@vendor.com
 Subject: Updated Order Details
 
 Updated delivery for order #TH-2024-78901
 New delivery date: April 1st, 2024
 Contact: Mark Wilson (mark.w@customer.com)""",
-                    "output": """{
+        "output": """{
   "error": "Invalid sender email",
   "details": "Email must be from individual address, not support@vendor.com",
   "order_data": {
@@ -1009,17 +702,11 @@ Contact: Mark Wilson (mark.w@customer.com)""",
     "contact_email": "mark.w@customer.com"
   }
 }"""
-                }
-            ]
-            # Add format selection
-            output_format = st.selectbox(
-                "Select Output Format",
-                options=["JSON", "Email", "Markdown", "Text", "Other"],
-                key=f"{version}_output_format",
-                help="Select the desired output format for the response"
-            )
-        
-            default_output = """{
+    }
+]
+
+DEFAULT_OUTPUT_FORMATS = [
+    """{
   "Reasoning": [
     "Reasoning statements documenting decision-making processes and resolving ambiguities."
   ],
@@ -1049,7 +736,8 @@ Contact: Mark Wilson (mark.w@customer.com)""",
       "product_n_quantity": "integer"
     }
   ]
-}""" if version == "Solution A" else ("""{
+}""",
+    """{
   "status": "success|error",
   "extracted_data": {
     "order_date": "YYYY-MM-DD",
@@ -1068,160 +756,402 @@ Contact: Mark Wilson (mark.w@customer.com)""",
       "suggestion": "correction_suggestion"
     }
   ]
-}""" if version == "Solution B" else """{
+}""",
+    """{
   "extracted_data": {
     "date": "YYYY-MM-DD",
     "name": "string",
     "email": "string"
   }
-}""")
-            st.text_area(
-                "Define output format",
-                value=default_output,
-                key=f"{version}_output",
-                height=100,
-                label_visibility="collapsed"
-            )            
-            # Function to add new example
-            def add_example(version):
-                st.session_state[f'{version}_num_examples'] += 1
-            
-            # Function to remove last example
-            def remove_example(version):
-                if st.session_state[f'{version}_num_examples'] > 1:
-                    st.session_state[f'{version}_num_examples'] -= 1
-            
-            # Display examples
-            for i in range(st.session_state[f'{version}_num_examples']):
-                with examples_container:
-                    st.markdown(f"**Example {i+1}**")
-                    col1, col2 = st.columns(2)
-                    with col1:
-                        default_input = default_examples[i]["input"] if i < len(default_examples) else ""
-                        st.text_area(
-                            "Input",
-                            value=default_input,
-                            key=f"{version}_example_input_{i}",
-                            height=100
-                        )
-                    with col2:
-                        default_output = default_examples[i]["output"] if i < len(default_examples) else ""
-                        st.text_area(
-                            "Output",
-                            value=default_output,
-                            key=f"{version}_example_output_{i}",
-                            height=100
-                        )
-                    st.markdown("---")
-            
-            # Add/Remove example buttons
-            col1, col2 = st.columns(2)
-            with col1:
-                st.button("➕ Add Example", key=f"{version}_add_example", 
-                         on_click=add_example, args=(version,))
-            with col2:
-                if st.session_state[f'{version}_num_examples'] > 1:
-                    st.button("➖ Remove Example", key=f"{version}_remove_example",
-                             on_click=remove_example, args=(version,))
-            
-            # Edge Cases Section
-            st.markdown("##### Edge Cases")
-            
-            # State for tracking number of edge cases
-            if f'{version}_num_edge_cases' not in st.session_state:
-                st.session_state[f'{version}_num_edge_cases'] = 3  # Default 3 edge cases
-            
-            # Default edge cases
-            default_edge_cases = [
-                {
-                    "case": "Invalid Email Format",
-                    "input": """From: sales@company.com
+}"""
+]
+
+DEFAULT_EDGE_CASES = [
+    {
+        "case": "Invalid Email Format",
+        "input": """From: sales@company.com
 Order: #TH-2024-99999
 Customer: Alice Johnson""",
-                    "handling": """Return error:
+        "handling": """Return error:
 {
   "error": "Invalid email format",
   "details": "Generic email address not allowed (sales@company.com)",
   "required": "Individual email address (e.g., firstname.lastname@company.com)"
 }"""
-                },
-                {
-                    "case": "Multiple Order Numbers",
-                    "input": """Reference: #TH-2024-11111
+    },
+    {
+        "case": "Multiple Order Numbers",
+        "input": """Reference: #TH-2024-11111
 Original Order: #TH-2024-22222
 Updated Order: #TH-2024-33333""",
-                    "handling": """Extract all order numbers and prioritize:
+        "handling": """Extract all order numbers and prioritize:
 {
   "current_order": "TH202433333",
   "original_order": "TH202422222",
   "reference_order": "TH202411111",
   "note": "Using most recent order number as primary reference"
 }"""
-                },
-                {
-                    "case": "Inconsistent Date Formats",
-                    "input": """Order Date: 03/15/2024
+    },
+    {
+        "case": "Inconsistent Date Formats",
+        "input": """Order Date: 03/15/2024
 Delivery: 2024-04-01
 Expected: 1st May 2024""",
-                    "handling": """Normalize all dates to ISO format:
+        "handling": """Normalize all dates to ISO format:
 {
   "order_date": "2024-03-15",
   "delivery_date": "2024-04-01",
   "expected_date": "2024-05-01",
   "note": "All dates normalized to YYYY-MM-DD format"
 }"""
-                }
-            ]
-            
-            # Function to add new edge case
-            def add_edge_case(version):
-                st.session_state[f'{version}_num_edge_cases'] += 1
-            
-            # Function to remove last edge case
-            def remove_edge_case(version):
-                if st.session_state[f'{version}_num_edge_cases'] > 1:
-                    st.session_state[f'{version}_num_edge_cases'] -= 1
-            
-            # Display edge cases
-            for i in range(st.session_state[f'{version}_num_edge_cases']):
-                with st.container():
-                    st.markdown(f"**Edge Case {i+1}**")
-                    default_case = default_edge_cases[i] if i < len(default_edge_cases) else {"case": "", "input": "", "handling": ""}
-                    
-                    # Case Description
-                    st.text_input("Case Description", 
-                                value=default_case["case"],
-                                key=f"{version}_edge_case_desc_{i}")
-                    
-                    col1, col2 = st.columns(2)
-                    with col1:
-                        st.text_area(
-                            "Example Input",
-                            value=default_case["input"],
-                            key=f"{version}_edge_case_input_{i}",
-                            height=80
-                        )
-                    with col2:
-                        st.text_area(
-                            "Handling Strategy",
-                            value=default_case["handling"],
-                            key=f"{version}_edge_case_handling_{i}",
-                            height=80
-                        )
-                    st.markdown("---")
-            
-            # Add/Remove edge case buttons
+    }
+]
+EMPTY_EDGE_CASE = {"case": "", "input": "", "handling": ""}
+
+# Add or remove one example / edge case row on a card
+def add_card_row(counter_key):
+    st.session_state[counter_key] += 1
+
+def remove_card_row(counter_key):
+    if st.session_state[counter_key] > 1:
+        st.session_state[counter_key] -= 1
+
+# Function to render prompt card
+def render_prompt_card(col, index):
+    with col:
+        prompt_card(index)
+
+# 每张卡片是一个 fragment: 编辑卡片内的控件只重跑这张卡片, 不重跑整个页面
+@st.fragment
+def prompt_card(index):
+    version = f"Solution {chr(ord('A') + index)}"
+    number = index + 1
+    variant = min(index, 2)
+    solution = get_solution(number) or NOT_GENERATED
+
+    # Header section with title, buttons and version info
+    st.markdown(CARD_HEADER_HTML.format(
+        codename=solution.codename,
+        name=solution.name,
+        version=version
+    ), unsafe_allow_html=True)
+
+    # 方向和概述文本来自方案记录
+    st.markdown(CARD_PANEL_HTML.format(
+        title="Direction", height=120, text=solution.focus
+    ), unsafe_allow_html=True)
+    st.markdown(CARD_PANEL_HTML.format(
+        title="Overview", height=200, text=solution.overview
+    ), unsafe_allow_html=True)
+
+    # Prompt Structure
+    st.markdown("<h4 style='margin-top: 20px;'>Prompt Structure</h4>", unsafe_allow_html=True)
+
+    # Role Section
+    st.markdown("<div class='section-label'>Role</div>", unsafe_allow_html=True)
+    st.text_area(
+        "Define the role",
+        value=solution.role,
+        key=f"{version}_role",
+        height=200,
+        label_visibility="collapsed"
+    )
+
+    # Task Section
+    st.markdown("<div class='section-label'>Task</div>", unsafe_allow_html=True)
+    st.text_area(
+        "Define the task",
+        value=solution.task,
+        key=f"{version}_task",
+        height=200,
+        label_visibility="collapsed"
+    )
+
+    # Rules Section
+    st.markdown("<div class='section-label'>Rules & Constraints</div>", unsafe_allow_html=True)
+    st.text_area(
+        "Define rules",
+        value=solution.rules,
+        key=f"{version}_rules",
+        height=200,
+        label_visibility="collapsed"
+    )
+
+    # Reasoning Section
+    st.markdown("<div class='section-label'>Reasoning</div>", unsafe_allow_html=True)
+    st.text_area(
+        "Define reasoning",
+        value=solution.reasoning,
+        key=f"{version}_reasoning_area",
+        height=150,
+        label_visibility="collapsed"
+    )
+
+    # Planning Section
+    st.markdown("<div class='section-label'>Planning</div>", unsafe_allow_html=True)
+    st.text_area(
+        "Define planning",
+        value=solution.planning,
+        key=f"{version}_planning_area",
+        height=150,
+        label_visibility="collapsed"
+    )
+
+    # Output Format Section
+    st.markdown("<div class='section-label'>Output Format</div>", unsafe_allow_html=True)
+    st.text_area(
+        "Define output format",
+        value=solution.output_format,
+        key=f"{version}_output_area",
+        height=150,
+        label_visibility="collapsed"
+    )
+
+    # Enhancements Section
+    with st.expander("Enhancements(TODO)"):
+        render_card_enhancements(version, variant)
+
+# Enhancements expander of a prompt card
+def render_card_enhancements(version, variant):
+    # Reasoning Method Selection
+    reasoning_method = st.selectbox(
+        "Change Reasoning Method",
+        options=REASONING_METHODS,
+        index=REASONING_METHODS.index(DEFAULT_REASONING_METHODS[variant]),
+        key=f"{version}_reasoning_method",
+        help="Select the reasoning method that best fits your task"
+    )
+
+    # Reasoning Details based on selected method
+    st.text_area(
+        "Define reasoning",
+        value=REASONING_TEMPLATES.get(reasoning_method, ""),
+        key=f"{version}_reasoning",
+        height=250,
+        label_visibility="collapsed"
+    )
+    # Planning Method Selection
+    planning_method = st.selectbox(
+        "Change Planning Method",
+        options=PLANNING_METHODS,
+        index=PLANNING_METHODS.index(DEFAULT_PLANNING_METHODS[variant]),
+        key=f"{version}_planning_method",
+        help="Select the planning method that best fits your task complexity"
+    )
+
+    # Planning Details based on selected method
+    st.text_area(
+        "Define planning",
+        value=PLANNING_TEMPLATES.get(planning_method, ""),
+        key=f"{version}_planning",
+        height=200,
+        label_visibility="collapsed"
+    )
+    # Multi-Model Evaluation
+    st.markdown("<div class='section-label'>Multi-Model Evaluation</div>", unsafe_allow_html=True)
+
+    # Get user's model preference (use the first selected GPT model)
+    selected_model = None
+    for model, versions in model_options.items():
+        if model == "GPT" and st.session_state.get(f"checkbox_{model}", False):
+            selected_versions = st.session_state.get(f"multiselect_{model}", [])
+            if selected_versions:
+                selected_model = selected_versions[0]
+                break
+
+    if not selected_model:
+        selected_model = "gpt-4-turbo"  # 默认模型
+
+    # Display selected model status
+    st.markdown("##### Model Status")
+    st.markdown(f"""
+        <div style='display: flex; align-items: center; gap: 8px; margin-bottom: 4px;'>
+            <div style='color: #28a745;'>●</div>
+            <div style='font-weight: 500;'>{selected_model}</div>
+            <div style='color: #28a745; font-size: 0.9em;'>(User Preferred Model)</div>
+        </div>
+    """, unsafe_allow_html=True)
+
+    # Model Selection Rationale
+    st.markdown("##### Selection Rationale")
+    st.text_area(
+        "Model Selection Reasoning",
+        value=SELECTION_RATIONALES[variant],
+        height=200,
+        key=f"{version}_model_rationale",
+        help="Explanation of why this model was selected for this prompt"
+    )
+
+    # Model Settings
+    st.markdown("##### Model Settings")
+    cols = st.columns(2)
+
+    with cols[0]:
+        # Temperature
+        st.slider(
+            "Temperature",
+            min_value=0.0,
+            max_value=1.0,
+            value=0.7,
+            step=0.1,
+            key=f"{version}_temp",
+            help="Controls randomness in the output"
+        )
+
+        # Top P
+        st.slider(
+            "Top P",
+            min_value=0.0,
+            max_value=1.0,
+            value=0.9,
+            step=0.1,
+            key=f"{version}_top_p",
+            help="Controls diversity via nucleus sampling"
+        )
+
+    with cols[1]:
+        # Max tokens
+        st.number_input(
+            "Max Tokens",
+            min_value=1,
+            max_value=4096,
+            value=2048,
+            step=1,
+            key=f"{version}_max_tokens",
+            help="Maximum number of tokens to generate"
+        )
+
+        # Frequency Penalty
+        st.slider(
+            "Frequency Penalty",
+            min_value=-2.0,
+            max_value=2.0,
+            value=0.0,
+            step=0.1,
+            key=f"{version}_freq_penalty",
+            help="Adjusts likelihood based on frequency"
+        )
+
+    st.markdown("---")
+
+    # Dynamic Prompt Optimization
+    st.markdown("<div class='section-label'>Dynamic Prompt Optimization</div>", unsafe_allow_html=True)
+
+    # Examples Section
+    st.markdown("##### Examples")
+
+    # Container for examples
+    examples_container = st.container()
+
+    # State for tracking number of examples
+    if f'{version}_num_examples' not in st.session_state:
+        st.session_state[f'{version}_num_examples'] = 3  # Default 3 examples
+
+    # Context Section
+    st.markdown(CONTEXT_LABEL_HTML, unsafe_allow_html=True)
+
+    # Get user input from sidebar
+    user_context = context if 'context' in locals() else ""
+
+    # Display context with user input override
+    st.text_area(
+        "Define context",
+        value=user_context if user_context else DEFAULT_CONTEXTS[variant],
+        key=f"{version}_context",
+        height=200,
+        label_visibility="collapsed"
+    )
+
+    # Add format selection
+    st.selectbox(
+        "Select Output Format",
+        options=["JSON", "Email", "Markdown", "Text", "Other"],
+        key=f"{version}_output_format",
+        help="Select the desired output format for the response"
+    )
+    st.text_area(
+        "Define output format",
+        value=DEFAULT_OUTPUT_FORMATS[variant],
+        key=f"{version}_output",
+        height=100,
+        label_visibility="collapsed"
+    )
+
+    # Display examples
+    for i in range(st.session_state[f'{version}_num_examples']):
+        with examples_container:
+            st.markdown(f"**Example {i+1}**")
             col1, col2 = st.columns(2)
             with col1:
-                st.button("➕ Add Edge Case", key=f"{version}_add_edge_case",
-                         on_click=add_edge_case, args=(version,))
+                st.text_area(
+                    "Input",
+                    value=DEFAULT_EXAMPLES[i]["input"] if i < len(DEFAULT_EXAMPLES) else "",
+                    key=f"{version}_example_input_{i}",
+                    height=100
+                )
             with col2:
-                if st.session_state[f'{version}_num_edge_cases'] > 1:
-                    st.button("➖ Remove Edge Case", key=f"{version}_remove_edge_case",
-                             on_click=remove_edge_case, args=(version,))
-                    
+                st.text_area(
+                    "Output",
+                    value=DEFAULT_EXAMPLES[i]["output"] if i < len(DEFAULT_EXAMPLES) else "",
+                    key=f"{version}_example_output_{i}",
+                    height=100
+                )
+            st.markdown("---")
+
+    # Add/Remove example buttons
+    col1, col2 = st.columns(2)
+    with col1:
+        st.button("➕ Add Example", key=f"{version}_add_example",
+                  on_click=add_card_row, args=(f'{version}_num_examples',))
+    with col2:
+        if st.session_state[f'{version}_num_examples'] > 1:
+            st.button("➖ Remove Example", key=f"{version}_remove_example",
+                      on_click=remove_card_row, args=(f'{version}_num_examples',))
+
+    # Edge Cases Section
+    st.markdown("##### Edge Cases")
+
+    # State for tracking number of edge cases
+    if f'{version}_num_edge_cases' not in st.session_state:
+        st.session_state[f'{version}_num_edge_cases'] = 3  # Default 3 edge cases
+
+    # Display edge cases
+    for i in range(st.session_state[f'{version}_num_edge_cases']):
+        with st.container():
+            st.markdown(f"**Edge Case {i+1}**")
+            default_case = DEFAULT_EDGE_CASES[i] if i < len(DEFAULT_EDGE_CASES) else EMPTY_EDGE_CASE
+
+            # Case Description
+            st.text_input("Case Description",
+                          value=default_case["case"],
+                          key=f"{version}_edge_case_desc_{i}")
+
+            col1, col2 = st.columns(2)
+            with col1:
+                st.text_area(
+                    "Example Input",
+                    value=default_case["input"],
+                    key=f"{version}_edge_case_input_{i}",
+                    height=80
+                )
+            with col2:
+                st.text_area(
+                    "Handling Strategy",
+                    value=default_case["handling"],
+                    key=f"{version}_edge_case_handling_{i}",
+                    height=80
+                )
+            st.markdown("---")
 
-                            
+    # Add/Remove edge case buttons
+    col1, col2 = st.columns(2)
+    with col1:
+        st.button("➕ Add Edge Case", key=f"{version}_add_edge_case",
+                  on_click=add_card_row, args=(f'{version}_num_edge_cases',))
+    with col2:
+        if st.session_state[f'{version}_num_edge_cases'] > 1:
+            st.button("➖ Remove Edge Case", key=f"{version}_remove_edge_case",
+                      on_click=remove_card_row, args=(f'{version}_num_edge_cases',))
 
 # Add custom CSS
 st.markdown("""
@@ -1259,6 +1189,16 @@ st.markdown("""
         background: #e9ecef;
     }
     
+    .show-original {
+        cursor: pointer;
+        padding: 2px 8px;
+        font-size: 0.9em;
+    }
+    .show-original:hover {
+        background: #e9ecef;
+        border-radius: 4px;
+    }
+    
     .favorite {
         color: #666;
     }
@@ -1281,192 +1221,407 @@ st.markdown("""
 </style>
 """, unsafe_allow_html=True)
 
-# Create three columns with equal width
-col1, col2, col3 = st.columns(3)
+# Seconds between polls of a running generation job
+JOB_POLL_SECONDS = 1
 
-# Render three prompt cards
-render_prompt_card(col1, "Solution A")
-render_prompt_card(col2, "Solution B")
-render_prompt_card(col3, "Solution C")
+# Fields shown on a card while its solution is being generated
+LIVE_CARD_FIELDS = [
+    ("focus", "Direction"),
+    ("role", "Role"),
+    ("task", "Task"),
+    ("rules_constraints", "Rules & Constraints"),
+]
+
+# Render placeholders that streamed tokens are written into during generation
+def render_live_card(col, index):
+    with col:
+        placeholders = {"codename": st.empty()}
+        placeholders["codename"].markdown(f"## Solution {chr(ord('A') + index)}")
+        for field, label in LIVE_CARD_FIELDS:
+            st.markdown(f"<div class='section-label'>{label}</div>", unsafe_allow_html=True)
+            placeholders[field] = st.empty()
+            placeholders[field].caption("Waiting...")
+    return placeholders
+
+# Copy the partial architect and engineer output received so far into the live cards
+def update_live_cards(texts, live_cards):
+    architect_text = texts.get("architect", "")
+    for field in ("codename", "focus"):
+        for index, value in enumerate(partial_json_values(architect_text, field)[:len(live_cards)]):
+            if field == "codename":
+                live_cards[index][field].markdown(f"## {value}")
+            else:
+                live_cards[index][field].text(value)
+    for index, placeholders in enumerate(live_cards):
+        engineer_text = texts.get(f"engineer:{index}")
+        if engineer_text:
+            for field in ("role", "task", "rules_constraints"):
+                values = partial_json_values(engineer_text, field)
+                if values:
+                    placeholders[field].text(values[-1])
+
+# Point the session at a finished generation job's run, or record why it has none
+def finish_generation(job):
+    del st.session_state.generation_job
+    st.session_state.pop("generation_inputs", None)
+    if "job" in st.query_params:
+        del st.query_params["job"]
+    if job is None:
+        st.session_state.generation_message = ("error", "The generation job is no longer available.")
+        return
+    if job["request"].get("kind") == "regenerate":
+        finish_regeneration(job)
+        return
+    if job["status"] == FAILED:
+        st.session_state.generation_message = ("error", f"Error during generation process: {job['error']}")
+        return
+    # 会话只保存结果库中的 run_id
+    st.session_state.run_id = job["result"]["run_id"]
+
+# 单个方案重新生成结束: 切换到新的 run 并更新版本号, 结果提示显示在该方案的权重选项卡中
+def finish_regeneration(job):
+    index = job["request"]["index"]
+    if job["status"] == FAILED:
+        st.session_state.regeneration_message = {"index": index, "error": job["error"]}
+        return
+    st.session_state.run_id = job["result"]["run_id"]
+    version_key = f"solution_{index}_version"
+    st.session_state[version_key] = st.session_state[version_key] + 0.1 if version_key in st.session_state else 1.0
+    st.session_state.regeneration_message = {"index": index, "seconds": job["result"]["seconds"]}
+
+# 重新生成单个方案时, 其余卡片显示现有内容, 只有该方案的卡片等待流式输出
+def fill_regeneration_cards(request, live_cards):
+    for index, (solution, placeholders) in enumerate(zip(load_solutions(request["run_id"]), live_cards)):
+        placeholders["codename"].markdown(f"## {solution.codename}")
+        placeholders["focus"].text(solution.focus)
+        if index != request["index"]:
+            for field, value in (("role", solution.role), ("task", solution.task), ("rules_constraints", solution.rules)):
+                placeholders[field].text(value)
+
+# 轮询后台生成任务, 只重跑这个 fragment; 任务结束后存储结果并重跑整个页面
+@st.fragment(run_every=JOB_POLL_SECONDS)
+def generation_progress(job_id):
+    job = get_job_queue().get(job_id)
+    if job is None or job["status"] in FINISHED:
+        finish_generation(job)
+        st.rerun()
+    count = job["request"]["direction_count"]
+    progress = job["progress"] or {}
+    regenerating = job["request"].get("kind") == "regenerate"
+    if job["status"] == QUEUED:
+        st.info(f"Waiting for a free worker ({job['position']} jobs ahead)...")
+    elif regenerating:
+        st.info(f"Regenerating {solution_names()[job['request']['index']]} Prompt...")
+    elif progress.get("stage") == "engineers":
+        st.info(f"✅ Architecture Analysis Complete! Optimizing {count} prompts...")
+    else:
+        st.info("Starting Architecture Analysis...")
+    live_cards = []
+    for row_start in range(0, count, 3):
+        columns = st.columns(3)
+        for offset, col in enumerate(columns[:count - row_start]):
+            live_cards.append(render_live_card(col, row_start + offset))
+    if regenerating:
+        fill_regeneration_cards(job["request"], live_cards)
+    update_live_cards(progress.get("texts", {}), live_cards)
+
+# Render one prompt card per solution, three equal-width columns per row, or the live cards of a running job
+generation_job = st.session_state.get("generation_job")
+if generation_job:
+    generation_progress(generation_job)
+else:
+    num_solutions = solution_count()
+    for row_start in range(0, num_solutions, 3):
+        columns = st.columns(3)
+        for offset, col in enumerate(columns[:num_solutions - row_start]):
+            render_prompt_card(col, row_start + offset)
+
+# Flame-style timeline of the spans of the last generation, one row per span
+def render_trace_timeline(spans):
+    import plotly.graph_objects as go
+    
+    parents = {span["span_id"]: span["parent_id"] for span in spans}
+    
+    def depth(span):
+        level, parent = 0, span["parent_id"]
+        while parent in parents:
+            level, parent = level + 1, parents[parent]
+        return level
+    
+    origin = min(span["start_ns"] for span in spans)
+    depths = [depth(span) for span in spans]
+    fig = go.Figure(go.Bar(
+        x=[(span["end_ns"] - span["start_ns"]) / 1e9 for span in spans],
+        base=[(span["start_ns"] - origin) / 1e9 for span in spans],
+        y=list(range(len(spans))),
+        orientation="h",
+        marker=dict(color=depths, colorscale="Blues", cmin=-1, cmax=max(depths) + 1),
+        customdata=[
+            "<br>".join(f"{key}: {value}" for key, value in span["attributes"].items()) + (
+                f"<br>error: {span['error']}" if span["error"] else ""
+            )
+            for span in spans
+        ],
+        hovertemplate="%{base:.2f}s + %{x:.2f}s<br>%{customdata}<extra></extra>",
+    ))
+    fig.update_layout(
+        yaxis=dict(
+            tickvals=list(range(len(spans))),
+            ticktext=["\u00a0\u00a0" * level + span["name"] for level, span in zip(depths, spans)],
+            autorange="reversed",
+        ),
+        xaxis_title="Seconds",
+        height=max(200, 22 * len(spans) + 60),
+        margin=dict(l=20, r=20, t=20, b=40),
+    )
+    st.plotly_chart(fig, use_container_width=True)
+    st.caption("Traces are also written as OTLP/JSON to the file set by PROMPT_TRACE_PATH.")
+
+generation_trace = (current_run() or {}).get("trace")
+if generation_trace:
+    with st.expander("Generation Timeline"):
+        render_trace_timeline(generation_trace)
+
+# Efficiency metric and breakdown of one solution, measured on its last run
+def render_efficiency(index, score):
+    telemetry = solution_telemetry(index + 1)
+    st.metric(
+        "Efficiency", "—" if score is None else f"{score}%",
+        help="Latency and tokens relative to the fastest and cheapest solution"
+    )
+    if telemetry is None:
+        token_usage = response_time = cost = "—"
+    else:
+        token_usage = f"{telemetry['prompt_tokens'] + telemetry['completion_tokens']:,}"
+        response_time = f"{telemetry['wall_seconds']:.1f}s"
+        if telemetry["queued_seconds"] >= 0.1:
+            response_time += f" ({telemetry['queued_seconds']:.1f}s queued)"
+        cost = f"${telemetry['cost']:.4f}" if telemetry["calls"] else "$0 (cached)"
+    
+    # Efficiency Breakdown Box
+    st.markdown(f"""
+        <div style='background-color: #f1f8ff; padding: 10px; border-radius: 4px; margin-top: 5px; margin-bottom: 20px; border: 1px solid #cce5ff;'>
+            <div style='font-size: 0.9em; color: #004085; margin-bottom: 5px;'>
+                <strong>Efficiency Breakdown</strong>
+            </div>
+            <div style='display: flex; justify-content: space-between; font-size: 0.85em; color: #004085; margin-bottom: 3px;'>
+                <span>Token Usage:</span>
+                <span>{token_usage}</span>
+            </div>
+            <div style='display: flex; justify-content: space-between; font-size: 0.85em; color: #004085; margin-bottom: 3px;'>
+                <span>Response Time:</span>
+                <span>{response_time}</span>
+            </div>
+            <div style='display: flex; justify-content: space-between; font-size: 0.85em; color: #004085;'>
+                <span>Cost per Run:</span>
+                <span>{cost}</span>
+            </div>
+        </div>
+    """, unsafe_allow_html=True)
 
 # Bottom Section: Evaluation & Analysis
 st.header("Evaluation & Analysis")
-eval_tab1, eval_tab2 = st.tabs(["Test & Results(TODO)", "Evaluation Metrics(Copy Optimized Prompt)"])
+eval_tab1, eval_tab2 = st.tabs(["Test & Results", "Evaluation Metrics(Copy Optimized Prompt)"])
+
+# The prompt of one solution as currently edited in its card
+def card_solution(index):
+    version = f"Solution {chr(ord('A') + index)}"
+    return {
+        "role": st.session_state.get(f"{version}_role"),
+        "task": st.session_state.get(f"{version}_task"),
+        "rules": st.session_state.get(f"{version}_rules"),
+        "reasoning": st.session_state.get(f"{version}_reasoning_area"),
+        "planning": st.session_state.get(f"{version}_planning_area"),
+        "output_format": st.session_state.get(f"{version}_output_area"),
+    }
+
+# Test cases of one solution: the uploaded document, its few-shot examples and its edge cases
+def card_test_cases(index, document=None):
+    version = f"Solution {chr(ord('A') + index)}"
+    cases = []
+    if document:
+        cases.append({"name": "Uploaded document", "kind": "document", "input": document, "expected": None})
+    for i in range(st.session_state.get(f"{version}_num_examples", 0)):
+        if st.session_state.get(f"{version}_example_input_{i}"):
+            cases.append({
+                "name": f"Example {i + 1}",
+                "kind": "example",
+                "input": st.session_state[f"{version}_example_input_{i}"],
+                "expected": st.session_state.get(f"{version}_example_output_{i}"),
+            })
+    for i in range(st.session_state.get(f"{version}_num_edge_cases", 0)):
+        if st.session_state.get(f"{version}_edge_case_input_{i}"):
+            cases.append({
+                "name": st.session_state.get(f"{version}_edge_case_desc_{i}") or f"Edge Case {i + 1}",
+                "kind": "edge_case",
+                "input": st.session_state[f"{version}_edge_case_input_{i}"],
+                "expected": st.session_state.get(f"{version}_edge_case_handling_{i}"),
+            })
+    return cases
 
 with eval_tab1:
     st.subheader("Test Input")
     
     # Display user input task
     st.markdown("**Task Description:**")
-    st.info("Extract order date, buyer name and email address from my order pdf")
+    st.info((current_run() or {}).get("inputs", {}).get(
+        "task_description", "Extract order date, buyer name and email address from my order pdf"
+    ))
     
     # File upload
     uploaded_file = st.file_uploader("Upload PDF file for testing", type=['pdf'])
     
     # Run Test button
     if st.button("Run Test", type="primary"):
-        st.info("Running test with all three solutions...")
-        
-        # 创建三列显示测试结果
-        test_col1, test_col2, test_col3 = st.columns(3)
-        
-        with test_col1:
-            st.markdown("#### JARVIS Results")
-            
-            # Planning 部分
-            st.markdown("**Planning:**")
-            st.code("""1. Document Analysis
-- Parse PDF structure
-- Identify key sections
-- Map target fields
-
-2. Field Extraction
-- Date patterns
-- Name formats
-- Email validation
-
-3. Data Validation
-- Format check
-- Completeness verify
-- Error handling""")
-            
-            # Reasoning 部分
-            st.markdown("**Reasoning:**")
-            st.code("""Using Chain-of-Thought:
-1. Located order section
-2. Found date: 2024-03-20
-3. Identified customer info block
-4. Extracted name: John Smith
-5. Validated email format
-6. Confirmed: john.smith@example.com""")
-            
-            # Output 部分
-            st.markdown("**Output:**")
-            st.json({
-                "order_date": "2024-03-20",
-                "buyer_name": "John Smith",
-                "email": "john.smith@example.com",
-                "confidence_score": 0.95
-            })
-            
-        with test_col2:
-            st.markdown("#### SHERLOCK Results")
-            
-            # Planning 部分
-            st.markdown("**Planning:**")
-            st.code("""1. Initial Scan
-- Document structure check
-- Field location mapping
-- Validation rules setup
-
-2. Data Processing
-- Pattern matching
-- Format validation
-- Error detection
-
-3. Quality Control
-- Data verification
-- Format standardization
-- Completeness check""")
-            
-            # Reasoning 部分
-            st.markdown("**Reasoning:**")
-            st.code("""Using ReAct:
-1. PDF scan complete
-2. Date found: 2024-03-20
-3. Name section identified
-4. Name extracted: John Smith
-5. Email located and validated
-6. Email confirmed: john.smith@example.com""")
-            
-            # Output 部分
-            st.markdown("**Output:**")
-            st.json({
-                "extracted_data": {
-                    "date": "2024-03-20",
-                    "name": "John Smith",
-                    "email": "john.smith@example.com"
-                },
-                "validation": {
-                    "all_fields_found": True,
-                    "formats_valid": True
+        test_names = solution_names()
+        try:
+            document = document_text(uploaded_file) if uploaded_file else None
+        except Exception as e:
+            st.error(f"Could not read the uploaded PDF: {str(e)}")
+        else:
+            # 测试文档与 Sample Data 使用同一 token 预算, 过长时只保留开头和结尾
+            if document:
+                document, tokens, kept = fit_text(document, FIELD_BUDGETS["sample_data"])
+                if kept < tokens:
+                    st.warning(
+                        f"{uploaded_file.name} is about {tokens:,} tokens, more than a test input can hold; "
+                        f"only its first and last parts ({kept:,} tokens) are used."
+                    )
+            test_cases = [card_test_cases(i, document) for i in range(len(test_names))]
+            with st.spinner(f"Running {sum(map(len, test_cases))} tests across {len(test_names)} solutions..."):
+                st.session_state.test_results = {
+                    "names": test_names,
+                    "cases": test_cases,
+                    "results": run_tests([assemble_prompt(card_solution(i)) for i in range(len(test_names))], test_cases),
                 }
-            })
-            
-        with test_col3:
-            st.markdown("#### FLASH Results")
-            
-            # Planning 部分
-            st.markdown("**Planning:**")
-            st.code("""1. Quick Scan
-- Target field search
-- Direct extraction
-- Basic validation
-
-2. Processing
-- Simple pattern match
-- Format check
-- Data extraction""")
-            
-            # Reasoning 部分
-            st.markdown("**Reasoning:**")
-            st.code("""Using Tree-of-Thought:
-1. Scanned document
-2. Found date: 2024-03-20
-3. Extracted name: John Smith
-4. Found email: john.smith@example.com
-5. Basic validation passed""")
-            
-            # Output 部分
-            st.markdown("**Output:**")
-            st.json({
-                "date": "2024-03-20",
-                "name": "John Smith",
-                "email": "john.smith@example.com"
-            })
+    
+    # 每个方案一列, 每行三列显示测试结果
+    test_results = st.session_state.get("test_results")
+    if test_results:
+        for row_start in range(0, len(test_results["names"]), 3):
+            test_columns = st.columns(3)
+            for offset, test_col in enumerate(test_columns[:len(test_results["names"]) - row_start]):
+                index = row_start + offset
+                with test_col:
+                    st.markdown(f"#### {test_results['names'][index]} Results")
+                    results = test_results["results"][index]
+                    if not results:
+                        st.info("No test cases: upload a document or add examples to this solution.")
+                        continue
+                    failed = sum("error" in result for result in results)
+                    st.caption(
+                        f"{len(results) - failed}/{len(results)} ran | "
+                        f"mean latency {sum(result['seconds'] for result in results) / len(results):.1f}s"
+                    )
+                    for case, result in zip(test_results["cases"][index], results):
+                        with st.expander(f"{case['name']} ({result['seconds']:.1f}s)", expanded=len(results) == 1):
+                            if "error" in result:
+                                st.error(result["error"])
+                                continue
+                            # Output 部分
+                            st.markdown("**Output:**")
+                            if result["json"] is not None:
+                                st.json(result["json"])
+                            else:
+                                st.code(result["output"], language="text")
+                            if case["expected"]:
+                                st.markdown("**Expected:**")
+                                st.code(case["expected"], language="text")
+
+# A scored metric, or a dash when the last test run could not measure it
+def score_metric(label, score, help):
+    st.metric(label, "—" if score is None else f"{score}%", help=help)
+
+# Advanced metrics the test run measures: (section, [(label, metric, help)])
+ADVANCED_METRICS = [
+    ("Stability Analysis", [
+        ("Format Compatibility", "schema_validity", "Share of outputs matching the expected output schema"),
+        ("System Stability", "reliability", "Share of test calls that completed without an error"),
+        ("Error Handling", "edge_case_match", "Expected handling reproduced on the edge cases"),
+    ]),
+    ("Explainability", [
+        ("Process Transparency", "reasoning_coverage", "Share of outputs that explain their reasoning"),
+    ]),
+    ("Creativity & Adaptability", [
+        ("Learning Ability", "example_match", "Expected fields reproduced on the few-shot examples"),
+    ]),
+]
+
+# Core metrics shown on the radar chart
+CORE_DIMENSIONS = [("accuracy", "Accuracy"), ("goal", "Goal Achievement"), ("efficiency", "Efficiency"), ("logic", "Logic Score")]
+
+# Metrics of one solution, scored from its last test run
+def render_solution_metrics(index, name, scores):
+    dimensions = scores["dimensions"]
+    st.markdown(f"#### {name} Analysis")
+    
+    # 核心维度
+    st.markdown("**Core Metrics**")
+    
+    # 第一行：准确性和目标达成度
+    col1, col2 = st.columns(2)
+    with col1:
+        score_metric("Accuracy", dimensions["accuracy"][index], "Expected output fields reproduced across all test cases")
+    with col2:
+        score_metric("Goal Achievement", dimensions["goal"][index], "Expected output fields present in the outputs")
+    
+    # 第二行：效率和逻辑性
+    col3, col4 = st.columns(2)
+    with col3:
+        render_efficiency(index, dimensions["efficiency"][index])
+    with col4:
+        score_metric("Logic Score", dimensions["logic"][index], "Expected handling reproduced on the edge cases")
+    
+    # 高级维度（展开区）
+    with st.expander("Advanced Dimensions"):
+        for section, entries in ADVANCED_METRICS:
+            st.markdown(f"**{section}**")
+            section_cols = st.columns(2)
+            for position, (label, metric, help) in enumerate(entries):
+                with section_cols[position % 2]:
+                    score_metric(label, scores["metrics"][metric][index], help)
+        st.caption("Safety & Compliance is not measured by the automated tests.")
 
 with eval_tab2:
+    evaluated_names = solution_names()
+    test_results = st.session_state.get("test_results")
+    tested = bool(test_results) and len(test_results["names"]) == len(evaluated_names)
+    if tested:
+        scores = score_tests(test_results["cases"], test_results["results"])
+    else:
+        # 尚未测试时, 效率来自生成阶段的运行数据
+        scores = score_tests([[] for _ in evaluated_names], [[] for _ in evaluated_names])
+        scores["dimensions"]["efficiency"] = efficiency_scores([
+            solution_telemetry(i + 1) for i in range(len(evaluated_names))
+        ])
+    st.session_state.solution_scores = scores
     
     # 首先显示评估结果
     st.markdown("### Evaluation Results")
-    metric_col1, metric_col2, metric_col3 = st.columns(3)
+    if not test_results:
+        st.info("Run Test in the Test & Results tab to score the solutions against their examples and edge cases.")
+    for row_start in range(0, len(evaluated_names), 3):
+        metric_columns = st.columns(3)
+        for offset, metric_col in enumerate(metric_columns[:len(evaluated_names) - row_start]):
+            with metric_col:
+                render_solution_metrics(row_start + offset, evaluated_names[row_start + offset], scores)
     
     # 创建核心指标对比可化
     st.markdown("### Core Metrics Comparison")
     
-    # 准备数据
-    metrics_data = {
-        "JARVIS": {
-            "Accuracy": 98,
-            "Goal Achievement": 100,
-            "Efficiency": 95,
-            "Logic Score": 97
-        },
-        "SHERLOCK": {
-            "Accuracy": 95,
-            "Goal Achievement": 95,
-            "Efficiency": 93,
-            "Logic Score": 93
-        },
-        "FLASH": {
-            "Accuracy": 92,
-            "Goal Achievement": 90,
-            "Efficiency": 98,
-            "Logic Score": 90
-        }
-    }
-    
     # 使用Plotly建雷达图
     import plotly.graph_objects as go
+    import plotly.colors
     
-    categories = list(metrics_data["JARVIS"].keys())
+    categories = [label for _, label in CORE_DIMENSIONS]
     
     fig = go.Figure()
     
-    colors = {"JARVIS": "#1f77b4", "SHERLOCK": "#ff7f0e", "FLASH": "#2ca02c"}
+    palette = plotly.colors.qualitative.Plotly
     
-    for solution in metrics_data:
-        values = list(metrics_data[solution].values())
+    for index, solution in enumerate(evaluated_names):
+        # 未测量的维度画为 0
+        values = [scores["dimensions"][slug][index] or 0 for slug, _ in CORE_DIMENSIONS]
         # 添加首个值到末尾以闭合图形
         values.append(values[0])
         
@@ -1474,7 +1629,7 @@ with eval_tab2:
             r=values,
             theta=categories + [categories[0]],
             name=solution,
-            line=dict(color=colors[solution]),
+            line=dict(color=palette[index % len(palette)]),
             fill='toself',
             opacity=0.4
         ))
@@ -1492,262 +1647,49 @@ with eval_tab2:
     )
     
     st.plotly_chart(fig, use_container_width=True)
-
     
-    # JARVIS Results
-    with metric_col1:
-        st.markdown("#### JARVIS Analysis")
-        
-        # 核心维度
-        st.markdown("**Core Metrics**")
-        
-        # 第一行：准确性和目标达成度
-        col1, col2 = st.columns(2)
-        with col1:
-            st.metric("Accuracy", "98%", help="Match rate between expected and actual outputs")
-        with col2:
-            st.metric("Goal Achievement", "100%", help="Completion rate of required tasks")
-        
-        # 第二行：效率和逻辑性
-        col3, col4 = st.columns(2)
-        with col3:
-            st.metric("Efficiency", "95%", help="Overall efficiency score")
-            # Efficiency Breakdown Box
-            st.markdown("""
-                <div style='background-color: #f1f8ff; padding: 10px; border-radius: 4px; margin-top: 5px; margin-bottom: 20px; border: 1px solid #cce5ff;'>
-                    <div style='font-size: 0.9em; color: #004085; margin-bottom: 5px;'>
-                        <strong>Efficiency Breakdown</strong>
-                    </div>
-                    <div style='display: flex; justify-content: space-between; font-size: 0.85em; color: #004085; margin-bottom: 3px;'>
-                        <span>Token Usage:</span>
-                        <span>2,500</span>
-                    </div>
-                    <div style='display: flex; justify-content: space-between; font-size: 0.85em; color: #004085; margin-bottom: 3px;'>
-                        <span>Response Time:</span>
-                        <span>2.5s</span>
-                    </div>
-                    <div style='display: flex; justify-content: space-between; font-size: 0.85em; color: #004085;'>
-                        <span>Cost per Run:</span>
-                        <span>$0.05</span>
-                    </div>
-                </div>
-            """, unsafe_allow_html=True)
-        with col4:
-            st.metric("Logic Score", "97%", help="Quality of reasoning process")
-        
-        # 高级维度（展开区）
-        with st.expander("Advanced Dimensions"):
-            # 稳定性分析
-            st.markdown("**Stability Analysis**")
-            stab_col1, stab_col2 = st.columns(2)
-            with stab_col1:
-                st.metric("Format Compatibility", "96%", help="Ability to handle different document formats")
-                st.metric("Error Handling", "98%", help="Effectiveness in handling exceptions")
-            with stab_col2:
-                st.metric("Cross-platform", "95%", help="Consistency across different platforms")
-                st.metric("System Stability", "97%", help="Overall system stability")
-            
-            # 可解释性
-            st.markdown("**Explainability**")
-            exp_col1, exp_col2 = st.columns(2)
-            with exp_col1:
-                st.metric("Process Transparency", "98%", help="Clarity of the extraction process")
-                st.metric("Decision Clarity", "97%", help="Clarity of decision making")
-            with exp_col2:
-                st.metric("Documentation", "96%", help="Quality of reasoning documentation")
-                st.metric("Reasoning Path", "95%", help="Clarity of reasoning steps")
-            
-            # 创造力
-            st.markdown("**Creativity & Adaptability**")
-            cre_col1, cre_col2 = st.columns(2)
-            with cre_col1:
-                st.metric("Pattern Recognition", "94%", help="Ability to identify data patterns")
-                st.metric("Format Flexibility", "93%", help="Adaptability to format changes")
-            with cre_col2:
-                st.metric("Edge Case Handling", "92%", help="Handling of unusual scenarios")
-                st.metric("Learning Ability", "91%", help="Capability to learn from new cases")
-            
-            # 安全性
-            st.markdown("**Safety & Compliance**")
-            saf_col1, saf_col2 = st.columns(2)
-            with saf_col1:
-                st.metric("Data Protection", "99%", help="Security of data handling")
-                st.metric("Bias Prevention", "98%", help="Prevention of biased results")
-            with saf_col2:
-                st.metric("Compliance", "97%", help="Adherence to standards")
-                st.metric("Risk Control", "96%", help="Effectiveness of risk management")
-    
-    # SHERLOCK Results
-    with metric_col2:
-        st.markdown("#### SHERLOCK Analysis")
-        
-        # 核心维度
-        st.markdown("**Core Metrics**")
-        
-        col1, col2 = st.columns(2)
-        with col1:
-            st.metric("Accuracy", "95%", help="Match rate between expected and actual outputs")
-        with col2:
-            st.metric("Goal Achievement", "98%", help="Completion rate of required tasks")
-        
-        col3, col4 = st.columns(2)
-        with col3:
-            st.metric("Efficiency", "97%", help="Overall efficiency score")
-            # Efficiency Breakdown Box
-            st.markdown("""
-                <div style='background-color: #f1f8ff; padding: 10px; border-radius: 4px; margin-top: 5px; margin-bottom: 20px; border: 1px solid #cce5ff;'>
-                    <div style='font-size: 0.9em; color: #004085; margin-bottom: 5px;'>
-                        <strong>Efficiency Breakdown</strong>
-                    </div>
-                    <div style='display: flex; justify-content: space-between; font-size: 0.85em; color: #004085; margin-bottom: 3px;'>
-                        <span>Token Usage:</span>
-                        <span>1,800</span>
-                    </div>
-                    <div style='display: flex; justify-content: space-between; font-size: 0.85em; color: #004085; margin-bottom: 3px;'>
-                        <span>Response Time:</span>
-                        <span>1.8s</span>
-                    </div>
-                    <div style='display: flex; justify-content: space-between; font-size: 0.85em; color: #004085;'>
-                        <span>Cost per Run:</span>
-                        <span>$0.035</span>
-                    </div>
-                </div>
-            """, unsafe_allow_html=True)
-        with col4:
-            st.metric("Logic Score", "96%", help="Quality of reasoning process")
-        
-        # SHERLOCK Advanced Dimensions
-        with st.expander("Advanced Dimensions"):
-            # 稳定性分析
-            st.markdown("**Stability Analysis**")
-            stab_col1, stab_col2 = st.columns(2)
-            with stab_col1:
-                st.metric("Format Compatibility", "97%", help="Ability to handle different document formats")
-                st.metric("Error Handling", "96%", help="Effectiveness in handling exceptions")
-            with stab_col2:
-                st.metric("Cross-platform", "97%", help="Consistency across different platforms")
-                st.metric("System Stability", "97%", help="Overall system stability")
-            
-            # 可解释性
-            st.markdown("**Explainability**")
-            exp_col1, exp_col2 = st.columns(2)
-            with exp_col1:
-                st.metric("Process Transparency", "96%", help="Clarity of the extraction process")
-                st.metric("Decision Clarity", "95%", help="Clarity of decision making")
-            with exp_col2:
-                st.metric("Documentation", "97%", help="Quality of reasoning documentation")
-                st.metric("Reasoning Path", "95%", help="Clarity of reasoning steps")
-            
-            # 创造力
-            st.markdown("**Creativity & Adaptability**")
-            cre_col1, cre_col2 = st.columns(2)
-            with cre_col1:
-                st.metric("Pattern Recognition", "92%", help="Ability to identify data patterns")
-                st.metric("Format Flexibility", "91%", help="Adaptability to format changes")
-            with cre_col2:
-                st.metric("Edge Case Handling", "93%", help="Handling of unusual scenarios")
-                st.metric("Learning Ability", "91%", help="Capability to learn from new cases")
-            
-            # 安全性
-            st.markdown("**Safety & Compliance**")
-            saf_col1, saf_col2 = st.columns(2)
-            with saf_col1:
-                st.metric("Data Protection", "98%", help="Security of data handling")
-                st.metric("Bias Prevention", "97%", help="Prevention of biased results")
-            with saf_col2:
-                st.metric("Compliance", "98%", help="Adherence to standards")
-                st.metric("Risk Control", "96%", help="Effectiveness of risk management")
-    
-    # FLASH Results
-    with metric_col3:
-        st.markdown("#### FLASH Analysis")
-        
-        # 核心维度
-        st.markdown("**Core Metrics**")
-        
-        col1, col2 = st.columns(2)
-        with col1:
-            st.metric("Accuracy", "92%", help="Match rate between expected and actual outputs")
-        with col2:
-            st.metric("Goal Achievement", "95%", help="Completion rate of required tasks")
-        
-        col3, col4 = st.columns(2)
-        with col3:
-            st.metric("Efficiency", "99%", help="Overall efficiency score")
-            # Efficiency Breakdown Box
-            st.markdown("""
-                <div style='background-color: #f1f8ff; padding: 10px; border-radius: 4px; margin-top: 5px; margin-bottom: 20px; border: 1px solid #cce5ff;'>
-                    <div style='font-size: 0.9em; color: #004085; margin-bottom: 5px;'>
-                        <strong>Efficiency Breakdown</strong>
-                    </div>
-                    <div style='display: flex; justify-content: space-between; font-size: 0.85em; color: #004085; margin-bottom: 3px;'>
-                        <span>Token Usage:</span>
-                        <span>1,200</span>
-                    </div>
-                    <div style='display: flex; justify-content: space-between; font-size: 0.85em; color: #004085; margin-bottom: 3px;'>
-                        <span>Response Time:</span>
-                        <span>1.2s</span>
-                    </div>
-                    <div style='display: flex; justify-content: space-between; font-size: 0.85em; color: #004085;'>
-                        <span>Cost per Run:</span>
-                        <span>$0.025</span>
-                    </div>
-                </div>
-            """, unsafe_allow_html=True)
-        with col4:
-            st.metric("Logic Score", "93%", help="Quality of reasoning process")
-        
-        # FLASH Advanced Dimensions
-        with st.expander("Advanced Dimensions"):
-            # 稳定性分析
-            st.markdown("**Stability Analysis**")
-            stab_col1, stab_col2 = st.columns(2)
-            with stab_col1:
-                st.metric("Format Compatibility", "94%", help="Ability to handle different document formats")
-                st.metric("Error Handling", "93%", help="Effectiveness in handling exceptions")
-            with stab_col2:
-                st.metric("Cross-platform", "92%", help="Consistency across different platforms")
-                st.metric("System Stability", "90%", help="Overall system stability")
-            
-            # 可解释性
-            st.markdown("**Explainability**")
-            exp_col1, exp_col2 = st.columns(2)
-            with exp_col1:
-                st.metric("Process Transparency", "91%", help="Clarity of the extraction process")
-                st.metric("Decision Clarity", "92%", help="Clarity of decision making")
-            with exp_col2:
-                st.metric("Documentation", "90%", help="Quality of reasoning documentation")
-                st.metric("Reasoning Path", "89%", help="Clarity of reasoning steps")
-            
-            # 创造力
-            st.markdown("**Creativity & Adaptability**")
-            cre_col1, cre_col2 = st.columns(2)
-            with cre_col1:
-                st.metric("Pattern Recognition", "88%", help="Ability to identify data patterns")
-                st.metric("Format Flexibility", "87%", help="Adaptability to format changes")
-            with cre_col2:
-                st.metric("Edge Case Handling", "87%", help="Handling of unusual scenarios")
-                st.metric("Learning Ability", "86%", help="Capability to learn from new cases")
-            
-            # 安全性
-            st.markdown("**Safety & Compliance**")
-            saf_col1, saf_col2 = st.columns(2)
-            with saf_col1:
-                st.metric("Data Protection", "96%", help="Security of data handling")
-                st.metric("Bias Prevention", "95%", help="Prevention of biased results")
-            with saf_col2:
-                st.metric("Compliance", "94%", help="Adherence to standards")
-                st.metric("Risk Control", "93%", help="Effectiveness of risk management")
+    # 按各方案的权重滑块综合排名; 只用已存的分数, 不会重新调用 LLM
+    st.markdown("### Weighted Ranking")
+    composite, ranking = rank_solutions(scores["dimensions"], [
+        {slug: st.session_state.get(f"solution_{index}_{slug}", weight) for slug, weight in DEFAULT_WEIGHTS.items()}
+        for index in range(len(evaluated_names))
+    ])
+    if composite[ranking[0]] is None:
+        st.info("Scores appear once solutions have been generated or tested.")
+    else:
+        # 只有测试过且分数不并列时才宣布第一名
+        if not tested:
+            st.info("Run tests to rank the solutions; until then the scores only reflect generation cost.")
+        elif len(ranking) > 1 and composite[ranking[0]] == composite[ranking[1]]:
+            st.info(f"No single winner: the top solutions tie at a weighted score of {composite[ranking[0]]}")
+        else:
+            winner = evaluated_names[ranking[0]]
+            st.success(f"🏆 {winner} ranks first with a weighted score of {composite[ranking[0]]}")
+        rank_cols = st.columns(len(ranking))
+        for place, (rank_col, index) in enumerate(zip(rank_cols, ranking), start=1):
+            with rank_col:
+                st.metric(
+                    f"#{place} {evaluated_names[index]}",
+                    "—" if composite[index] is None else composite[index],
+                    help="Weighted mean of the dimensions measured for every solution, using this solution's weights"
+                )
     
     # 维度权重调整
     st.markdown("### Dimension Weights")
     
+    # 滑块提示中显示该维度的测量值
+    def measured_note(index, slug):
+        score = st.session_state.solution_scores["dimensions"][slug][index]
+        return ". Not measured yet" if score is None else f". Measured: {score}%"
+    
     # 创建选项卡用于不同方案的权重调整
-    weight_tabs = st.tabs(["JARVIS Weights", "SHERLOCK Weights", "FLASH Weights"])
+    # 控件按方案序号命名: 代号由模型生成, 可能重复, 也会随每次生成改变
+    weight_solution_names = solution_names()
+    weight_tabs = st.tabs([f"{name} Weights" for name in weight_solution_names])
     
     for idx, tab in enumerate(weight_tabs):
         with tab:
-            solution_name = ["JARVIS", "SHERLOCK", "FLASH"][idx]
+            solution_name = weight_solution_names[idx]
             st.markdown(f"#### {solution_name} Dimension Weights")
             
             # 核心度
@@ -1755,25 +1697,25 @@ with eval_tab2:
             core_col1, core_col2 = st.columns(2)
             with core_col1:
                 accuracy_weight = st.slider(
-                    "Accuracy Weight", 0.0, 1.0, 0.3, 0.1,
-                    help="Measures the match between expected and actual outputs",
-                    key=f"{solution_name}_accuracy"
+                    "Accuracy Weight", 0.0, 1.0, DEFAULT_WEIGHTS["accuracy"], 0.1,
+                    help="Measures the match between expected and actual outputs" + measured_note(idx, "accuracy"),
+                    key=f"solution_{idx}_accuracy"
                 )
                 efficiency_weight = st.slider(
-                    "Efficiency Weight", 0.0, 1.0, 0.2, 0.1,
-                    help="Evaluates token usage, response time, and cost",
-                    key=f"{solution_name}_efficiency"
+                    "Efficiency Weight", 0.0, 1.0, DEFAULT_WEIGHTS["efficiency"], 0.1,
+                    help="Evaluates token usage, response time, and cost" + measured_note(idx, "efficiency"),
+                    key=f"solution_{idx}_efficiency"
                 )
             with core_col2:
                 logic_weight = st.slider(
-                    "Logic Weight", 0.0, 1.0, 0.3, 0.1,
-                    help="Assesses reasoning path and process clarity",
-                    key=f"{solution_name}_logic"
+                    "Logic Weight", 0.0, 1.0, DEFAULT_WEIGHTS["logic"], 0.1,
+                    help="Assesses reasoning path and process clarity" + measured_note(idx, "logic"),
+                    key=f"solution_{idx}_logic"
                 )
                 goal_weight = st.slider(
-                    "Goal Achievement Weight", 0.0, 1.0, 0.2, 0.1,
-                    help="Checks if all required tasks are completed",
-                    key=f"{solution_name}_goal"
+                    "Goal Achievement Weight", 0.0, 1.0, DEFAULT_WEIGHTS["goal"], 0.1,
+                    help="Checks if all required tasks are completed" + measured_note(idx, "goal"),
+                    key=f"solution_{idx}_goal"
                 )
             
             # 高级维度
@@ -1781,73 +1723,74 @@ with eval_tab2:
             adv_col1, adv_col2 = st.columns(2)
             with adv_col1:
                 stability_weight = st.slider(
-                    "Stability Weight", 0.0, 1.0, 0.1, 0.1,
-                    help="Tests robustness across different inputs",
-                    key=f"{solution_name}_stability"
+                    "Stability Weight", 0.0, 1.0, DEFAULT_WEIGHTS["stability"], 0.1,
+                    help="Tests robustness across different inputs" + measured_note(idx, "stability"),
+                    key=f"solution_{idx}_stability"
                 )
                 explain_weight = st.slider(
-                    "Explainability Weight", 0.0, 1.0, 0.1, 0.1,
-                    help="Evaluates clarity of reasoning process",
-                    key=f"{solution_name}_explain"
+                    "Explainability Weight", 0.0, 1.0, DEFAULT_WEIGHTS["explain"], 0.1,
+                    help="Evaluates clarity of reasoning process" + measured_note(idx, "explain"),
+                    key=f"solution_{idx}_explain"
                 )
             with adv_col2:
                 creative_weight = st.slider(
-                    "Creativity Weight", 0.0, 1.0, 0.1, 0.1,
-                    help="Assesses flexibility and adaptability",
-                    key=f"{solution_name}_creative"
+                    "Creativity Weight", 0.0, 1.0, DEFAULT_WEIGHTS["creative"], 0.1,
+                    help="Assesses flexibility and adaptability" + measured_note(idx, "creative"),
+                    key=f"solution_{idx}_creative"
                 )
                 safety_weight = st.slider(
-                    "Safety Weight", 0.0, 1.0, 0.1, 0.1,
-                    help="Checks for bias and harmful content",
-                    key=f"{solution_name}_safety"
+                    "Safety Weight", 0.0, 1.0, DEFAULT_WEIGHTS["safety"], 0.1,
+                    help="Checks for bias and harmful content" + measured_note(idx, "safety"),
+                    key=f"solution_{idx}_safety"
                 )
             
-            # 新生按钮
-            if st.button(f"Regenerate {solution_name} Prompt", key=f"regenerate_{solution_name}"):
-                # 版本号管理
-                if f'{solution_name}_version' not in st.session_state:
-                    st.session_state[f'{solution_name}_version'] = 1.0
+            # 新生按钮: 与生成一样作为后台任务提交, 页面重跑或断线重连都不会中断它
+            if st.button(f"Regenerate {solution_name} Prompt", key=f"regenerate_solution_{idx}",
+                         disabled=bool(generation_job)):
+                run = current_run()
+                if run is None or idx >= len(run["solutions"]):
+                    st.warning("Generate prompts first, then regenerate a single solution.")
                 else:
-                    st.session_state[f'{solution_name}_version'] += 0.1
-                
-                st.success(f"""
-                Prompt regenerated successfully!
-                New version: {st.session_state[f'{solution_name}_version']:.1f}
-                
-                Weight Configuration:
-                - Accuracy: {accuracy_weight}
-                - Efficiency: {efficiency_weight}
-                - Logic: {logic_weight}
-                - Goal Achievement: {goal_weight}
-                - Stability: {stability_weight}
-                - Explainability: {explain_weight}
-                - Creativity: {creative_weight}
-                - Safety: {safety_weight}
-                """)
+                    # 只重新运行该方案的 prompt engineer crew, 复用架构分析结果
+                    st.session_state.generation_job = get_job_queue().submit(st.session_state.job_owner, {
+                        "kind": "regenerate",
+                        "run_id": run["run_id"],
+                        "index": idx,
+                        "direction_count": len(run["solutions"]),
+                        "planning_mode": planning_mode,
+                    })
+                    st.query_params["job"] = st.session_state.generation_job
+                    st.rerun()
+
+            # 后台重新生成结束后的结果提示
+            regeneration_message = st.session_state.get("regeneration_message")
+            if regeneration_message and regeneration_message["index"] == idx:
+                del st.session_state.regeneration_message
+                if "error" in regeneration_message:
+                    st.error(f"Error during {solution_name} regeneration: {regeneration_message['error']}")
+                else:
+                    st.success(f"""
+                    Prompt regenerated successfully in {regeneration_message['seconds']:.1f}s!
+                    New version: {st.session_state[f'solution_{idx}_version']:.1f}
+                    
+                    Weight Configuration:
+                    - Accuracy: {accuracy_weight}
+                    - Efficiency: {efficiency_weight}
+                    - Logic: {logic_weight}
+                    - Goal Achievement: {goal_weight}
+                    - Stability: {stability_weight}
+                    - Explainability: {explain_weight}
+                    - Creativity: {creative_weight}
+                    - Safety: {safety_weight}
+                    """)
 
             # Copy button
-            if st.button(f"Copy {solution_name} Prompt", type="primary", key=f"copy_{solution_name}"):
+            if st.button(f"Copy {solution_name} Prompt", type="primary", key=f"copy_solution_{idx}"):
                 # Get solution index
-                solution_idx = get_solution_index(solution_name)
+                solution_idx = idx + 1
                 
                 # Prepare text to copy
-                prompt_text = f"""Role:
-{st.session_state.get(f'role_{solution_idx}', 'Not Generated...')}
-
-Task:
-{st.session_state.get(f'task_{solution_idx}', 'Not Generated...')}
-
-Rules & Constraints:
-{st.session_state.get(f'rules_{solution_idx}', 'Not Generated...')}
-
-Reasoning:
-{st.session_state.get(f'selected_reasoning_methods_{solution_idx}', 'Not Generated...')}
-
-Planning:
-{st.session_state.get(f'selected_planning_methods_{solution_idx}', 'Not Generated...')}
-
-Output Format:
-{st.session_state.get(f'output_format_{solution_idx}', 'Not Generated...')}"""
+                prompt_text = assemble_prompt((get_solution(solution_idx) or Solution()).to_dict())
 
                 try:
                     # Try using pyperclip first
@@ -1856,7 +1799,7 @@ Output Format:
                     st.success(f"""
                     ✅ Prompt copied to clipboard successfully!
                     Solution: {solution_name}
-                    Version: {st.session_state.get(f'{solution_name}_version', 1.0):.1f}
+                    Version: {st.session_state.get(f'solution_{idx}_version', 1.0):.1f}
                     """)
                 except Exception as e:
                     # Fallback: Show the text in a code block for manual copying
@@ -0,0 +1,81 @@
+"""
+Import-time budget for the Prompt Generator page.
+
+Imports the modules ``pages/prompt_generator.py`` loads at the top in a
+fresh interpreter, and fails when that takes longer than ``--budget``
+seconds or pulls in a module that should only load on first use (crewAI,
+litellm, plotly, pyperclip):
+
+    python benchmarks/import_time.py
+    python benchmarks/import_time.py --budget 0.5 --runs 5
+"""
+import argparse
+import json
+import subprocess
+import sys
+from pathlib import Path
+
+SRC_DIR = Path(__file__).parent.parent / "src"
+
+# The package modules the page imports before its first element renders
+PAGE_IMPORTS = (
+    "prompt_solution_crew.cache",
+    "prompt_solution_crew.pipeline",
+    "prompt_solution_crew.jobs",
+    "prompt_solution_crew.solution",
+    "prompt_solution_crew.streaming",
+    "prompt_solution_crew.telemetry",
+    "prompt_solution_crew.tracing",
+    "prompt_solution_crew.evaluation",
+    "prompt_solution_crew.budget",
+    "prompt_solution_crew.ingest",
+    "prompt_solution_crew.scoring",
+)
+
+# Modules that must stay out of the page's import path
+DEFERRED = ("crewai", "litellm", "plotly", "pyperclip")
+
+PROBE = """
+import importlib, json, sys, time
+sys.path.insert(0, {src!r})
+start = time.perf_counter()
+for name in {modules!r}:
+    importlib.import_module(name)
+seconds = time.perf_counter() - start
+print(json.dumps({{
+    "seconds": seconds,
+    "loaded": sorted(name for name in {deferred!r} if name in sys.modules),
+}}))
+"""
+
+
+def measure():
+    """Import the page modules in a fresh interpreter; returns seconds taken and deferred modules loaded."""
+    code = PROBE.format(src=str(SRC_DIR), modules=PAGE_IMPORTS, deferred=DEFERRED)
+    output = subprocess.run([sys.executable, "-c", code], check=True, capture_output=True, text=True).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--budget", type=float, default=0.5, help="allowed import seconds (default: 0.5)")
+    parser.add_argument("--runs", type=int, default=3, help="fresh interpreters to time; the fastest counts")
+    args = parser.parse_args()
+
+    runs = [measure() for _ in range(args.runs)]
+    seconds = min(run["seconds"] for run in runs)
+    loaded = sorted({name for run in runs for name in run["loaded"]})
+    print(json.dumps({"seconds": round(seconds, 3), "budget": args.budget, "deferred_loaded": loaded}, indent=2))
+
+    failed = False
+    if loaded:
+        print(f"FAIL page imports load {', '.join(loaded)} eagerly", file=sys.stderr)
+        failed = True
+    if seconds > args.budget:
+        print(f"FAIL page imports took {seconds:.3f}s, budget is {args.budget}s", file=sys.stderr)
+        failed = True
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,189 @@
+"""
+Regression benchmark for prompt generation.
+
+Runs a fixed corpus of task configurations through ``batch.generate``, the
+architect and prompt engineer pipeline batch runs use, input budgets and
+cache included, against a local stand-in for the LLM (a deterministic
+stub, or a cassette recorded with ``--record``), and writes latency
+percentiles, tokens per stage, cache hit rate and output-schema
+validity to a JSON file meant to be committed and diffed:
+
+    python benchmarks/run_benchmarks.py --output benchmarks/results.json
+    python benchmarks/run_benchmarks.py --baseline benchmarks/results.json
+
+With ``--baseline`` the run fails when p95 latency or tokens grow, or schema
+validity drops, by more than ``--tolerance``.
+"""
+import argparse
+import importlib.metadata
+import json
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+BENCHMARK_DIR = Path(__file__).parent
+sys.path.insert(0, str(BENCHMARK_DIR.parent / "src"))
+sys.path.insert(0, str(BENCHMARK_DIR))
+
+# Isolate the run: fresh response cache, no trace file, no provider rate limits
+os.environ["PROMPT_CACHE_PATH"] = str(Path(tempfile.mkdtemp()) / "responses.db")
+os.environ["PROMPT_TRACE_PATH"] = ""
+os.environ["PROMPT_LLM_RPM"] = "0"
+os.environ["PROMPT_LLM_TPM"] = "0"
+os.environ.setdefault("OPENAI_API_KEY", "benchmark")
+# and no network calls for crewAI telemetry or LiteLLM's model price list
+os.environ.setdefault("OTEL_SDK_DISABLED", "true")
+os.environ.setdefault("LITELLM_LOCAL_MODEL_COST_MAP", "True")
+
+import numpy as np
+
+from prompt_solution_crew.batch import generate, normalize_inputs
+from prompt_solution_crew.cache import get_cache
+from prompt_solution_crew.crew import PLANNING_MODES, DirectionsList, PromptTemplate
+from prompt_solution_crew.llm import set_transport
+from prompt_solution_crew.telemetry import RunTelemetry
+from prompt_solution_crew.transport import ReplayTransport
+from stub import StubTransport
+
+DEFAULT_CORPUS = BENCHMARK_DIR / "corpus.jsonl"
+
+
+def percentiles(values):
+    if not values:
+        return {"p50": None, "p95": None}
+    return {"p50": round(float(np.percentile(values, 50)), 3), "p95": round(float(np.percentile(values, 95)), 3)}
+
+
+def is_valid(model, result):
+    try:
+        model.model_validate(result)
+    except Exception:
+        return False
+    return True
+
+
+def run_record(inputs, direction_count, planning_mode):
+    """
+    Generate one record through the batch pipeline and return its stage telemetry and output validity.
+
+    A record that fails, e.g. because the stand-in LLM did not recognize a
+    changed prompt, counts as invalid output instead of ending the run.
+    """
+    telemetry = RunTelemetry()
+    start = time.perf_counter()
+    error = None
+    try:
+        result = generate(inputs, direction_count=direction_count, planning_mode=planning_mode, telemetry=telemetry)
+    except Exception as exc:
+        error = f"{type(exc).__name__}: {exc}"
+        print(f"record failed: {error}", file=sys.stderr)
+        valid = [False]
+    else:
+        valid = [is_valid(DirectionsList, result["architect"])] + [
+            is_valid(PromptTemplate, solution) for solution in result["solutions"]
+        ]
+    return {
+        "seconds": time.perf_counter() - start,
+        "stages": telemetry.summaries(),
+        "valid": valid,
+        "error": error,
+    }
+
+
+def run_pass(records, direction_count, planning_mode):
+    cache = get_cache()
+    hits, misses = cache.stats()["hits"], cache.stats()["misses"]
+    runs = [run_record(record, direction_count, planning_mode) for record in records]
+    stats = cache.stats()
+    lookups = stats["hits"] - hits + stats["misses"] - misses
+
+    def stage_values(prefix, field):
+        return [
+            summary[field]
+            for run in runs
+            for name, summary in run["stages"].items()
+            if name.split(":")[0] == prefix
+        ]
+
+    stages = {}
+    for prefix in ("architect", "engineer"):
+        stages[prefix] = {
+            "latency": percentiles(stage_values(prefix, "wall_seconds")),
+            "prompt_tokens": round(float(np.mean(stage_values(prefix, "prompt_tokens") or [0])), 1),
+            "completion_tokens": round(float(np.mean(stage_values(prefix, "completion_tokens") or [0])), 1),
+            "llm_calls": round(float(np.mean(stage_values(prefix, "calls") or [0])), 2),
+        }
+    valid = [flag for run in runs for flag in run["valid"]]
+    return {
+        "latency": percentiles([run["seconds"] for run in runs]),
+        "stages": stages,
+        "cache_hit_rate": round((stats["hits"] - hits) / lookups, 3) if lookups else None,
+        "schema_validity": round(sum(valid) / len(valid), 3) if valid else None,
+        "errors": sum(run["error"] is not None for run in runs),
+    }
+
+
+def regressions(baseline, results, tolerance):
+    """Human-readable list of metrics that got worse than the baseline by more than ``tolerance``."""
+    found = []
+    for index, (old, new) in enumerate(zip(baseline["passes"], results["passes"]), start=1):
+        checks = [("latency p95", old["latency"]["p95"], new["latency"]["p95"])]
+        for stage in new["stages"]:
+            for field in ("prompt_tokens", "completion_tokens"):
+                checks.append((f"{stage} {field}", old["stages"][stage][field], new["stages"][stage][field]))
+        for name, before, after in checks:
+            if before and after and after > before * (1 + tolerance):
+                found.append(f"pass {index} {name}: {before} -> {after}")
+        if (old["schema_validity"] or 0) - (new["schema_validity"] or 0) > tolerance:
+            found.append(f"pass {index} schema validity: {old['schema_validity']} -> {new['schema_validity']}")
+        if new["errors"] > old.get("errors", 0):
+            found.append(f"pass {index} failed records: {old.get('errors', 0)} -> {new['errors']}")
+    return found
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--corpus", default=DEFAULT_CORPUS, help="JSONL task configurations")
+    parser.add_argument("--output", help="write results to this JSON file")
+    parser.add_argument("--baseline", help="compare against a previous results file")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="allowed relative regression (default: 0.2)")
+    parser.add_argument("--passes", type=int, default=2, help="passes over the corpus; later passes hit the cache")
+    parser.add_argument("-n", "--directions", type=int, default=3)
+    parser.add_argument("--planning", choices=PLANNING_MODES, default="on")
+    parser.add_argument("--speed", type=float, default=1.0, help="stand-in LLM speed-up factor")
+    parser.add_argument("--replay", metavar="CASSETTE",
+                        help="answer from a recorded cassette instead of the stub, at --speed")
+    args = parser.parse_args()
+
+    with open(args.corpus, encoding="utf-8") as corpus:
+        records = [normalize_inputs(json.loads(line)) for line in corpus if line.strip()]
+    set_transport(ReplayTransport(args.replay, speed=args.speed) if args.replay else StubTransport(speed=args.speed))
+    results = {
+        "config": {
+            "corpus": Path(args.corpus).name,
+            "records": len(records),
+            "directions": args.directions,
+            "planning": args.planning,
+            "speed": args.speed,
+            "llm": Path(args.replay).name if args.replay else "stub",
+            "crewai": importlib.metadata.version("crewai"),
+        },
+        "passes": [run_pass(records, args.directions, args.planning) for _ in range(args.passes)],
+    }
+    text = json.dumps(results, indent=2, sort_keys=True)
+    if args.output:
+        Path(args.output).write_text(text + "\n", encoding="utf-8")
+    print(text)
+
+    if args.baseline:
+        found = regressions(json.loads(Path(args.baseline).read_text(encoding="utf-8")), results, args.tolerance)
+        for line in found:
+            print(f"REGRESSION {line}", file=sys.stderr)
+        return 1 if found else 0
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
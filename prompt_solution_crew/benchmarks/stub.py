@@ -0,0 +1,85 @@
+import hashlib
+import json
+import re
+import time
+
+from crewai.utilities.planning_handler import PlannerTaskPydanticOutput
+
+from prompt_solution_crew.crew import DirectionsList, PromptTemplate
+
+
+class StubTransport:
+    """
+    Deterministic local stand-in for the LLM provider.
+
+    Answers the architect, prompt engineer and planner prompts with
+    schema-valid JSON in crewAI's ``Final Answer:`` format, derived from a
+    hash of the request so every task gets its own answer. Each call sleeps
+    for a fixed base latency plus a per-token delay, scaled by ``speed``, so
+    latency numbers stay stable between runs.
+    """
+
+    offline = True
+
+    def __init__(self, base_latency=0.05, token_latency=0.0005, speed=1.0, chunk_size=16):
+        self.base_latency = base_latency
+        self.token_latency = token_latency
+        self.speed = speed
+        self.chunk_size = chunk_size
+
+    def complete(self, model, messages, stream=False, live=None):
+        text = self.answer(messages)
+        delay = (self.base_latency + self.token_latency * len(text) / 4) / self.speed
+        if not stream:
+            time.sleep(delay)
+            return text
+        return self._chunks(text, delay)
+
+    def _chunks(self, text, delay):
+        chunks = [text[i:i + self.chunk_size] for i in range(0, len(text), self.chunk_size)]
+        for chunk in chunks:
+            time.sleep(delay / len(chunks))
+            yield chunk
+
+    def answer(self, messages):
+        prompt = "\n".join(str(message.get("content", "")) for message in messages)
+        seed = hashlib.sha256(prompt.encode("utf-8")).hexdigest()[:8]
+        # The planner's prompt lists the agents' roles, so it is matched first
+        if "Task Execution Planner" in prompt or "list_of_plans_per_task" in prompt:
+            payload = PlannerTaskPydanticOutput(list_of_plans_per_task=[
+                {"task": "Task Number 1", "plan": f"Follow the task description step by step ({seed})."}
+            ]).model_dump()
+        elif "Prompt Engineering Architect" in prompt:
+            count = re.search(r"identify the (\d+) most relevant", prompt)
+            payload = self.directions(seed, int(count.group(1)) if count else 3)
+        elif "Prompt Engineer" in prompt:
+            payload = self.prompt_template(seed)
+        else:
+            payload = {"answer": f"stub-{seed}"}
+        return f"Thought: I now can give a great answer\nFinal Answer: {json.dumps(payload)}"
+
+    def directions(self, seed, count):
+        return DirectionsList(directions=[
+            {
+                "name": f"Direction {index + 1}",
+                "codename": f"STUB-{seed}-{index + 1}",
+                "focus": "Accuracy of the extracted fields",
+                "relevance": "Matches the stated task",
+                "benefits": ["Consistent output", "Fewer follow-up corrections"],
+                "implementation_considerations": {"validation": "Check every required field"},
+                "assigned_prompt_engineer": "Prompt Engineer",
+            }
+            for index in range(count)
+        ]).model_dump()
+
+    def prompt_template(self, seed):
+        return PromptTemplate(
+            role=f"You are a meticulous assistant ({seed}).",
+            task="Complete the task described by the user.",
+            rules_constraints="- Only use information present in the input",
+            reasoning_method="Chain-of-Thought",
+            planning_method="Plan-and-Solve",
+            output_format='{"result": "string"}',
+            explanation_of_optimization_choices="Favors precision over recall.",
+            usage_guidelines="Send the document as the user message.",
+        ).model_dump()
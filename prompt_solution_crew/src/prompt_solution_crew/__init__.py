@@ -0,0 +1,25 @@
+import sys
+
+
+def _use_pysqlite3():
+    """
+    Swap in pysqlite3 when the system sqlite3 is missing or too old.
+
+    chromadb, pulled in by crewAI, needs SQLite 3.35 or newer, which some
+    hosts such as Streamlit Community Cloud do not ship; pysqlite3-binary
+    bundles its own. Hosts with a recent sqlite3 never import pysqlite3.
+    """
+    try:
+        import sqlite3
+        if sqlite3.sqlite_version_info >= (3, 35, 0):
+            return
+    except ImportError:
+        pass
+    try:
+        __import__("pysqlite3")
+    except ImportError:
+        return
+    sys.modules["sqlite3"] = sys.modules.pop("pysqlite3")
+
+
+_use_pysqlite3()
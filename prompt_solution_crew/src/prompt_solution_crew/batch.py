@@ -0,0 +1,152 @@
+import json
+import threading
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+from prompt_solution_crew.budget import fit_inputs
+from prompt_solution_crew.journal import record_key
+from prompt_solution_crew.pipeline import (
+    DEFAULT_CONCURRENCY,
+    DEFAULT_DIRECTIONS,
+    architect_directions,
+    run_architect_crew,
+    run_engineer_crews,
+)
+from prompt_solution_crew.ratelimit import lane
+from prompt_solution_crew.telemetry import RunTelemetry
+from prompt_solution_crew.tracing import span
+
+# Defaults the Streamlit page uses for fields the user leaves empty
+INPUT_DEFAULTS = {
+    "task_type": "Recommended",
+    "model_preference": ["Recommended"],
+    "tone": "Professional",
+    "context": "not defined",
+    "sample_data": "not defined",
+    "examples": "not defined",
+}
+
+
+def normalize_inputs(record):
+    """Build kickoff inputs from a task configuration, the same way the page does."""
+    if not record.get("task_description"):
+        raise ValueError("task_description is required")
+    inputs = {"task_description": record["task_description"]}
+    for key, default in INPUT_DEFAULTS.items():
+        value = record.get(key) or default
+        inputs[key] = value if isinstance(value, str) else str(value)
+    return inputs
+
+
+def generate(inputs, direction_count=DEFAULT_DIRECTIONS, max_concurrency=DEFAULT_CONCURRENCY,
+             use_cache=True, planning_mode=None, journal=None, telemetry=None):
+    """
+    Run the architect and prompt engineer crews for one task configuration.
+
+    With a ``CheckpointJournal``, every finished stage is journaled and
+    stages already in the journal are reused instead of rerun. The result
+    includes the tokens, time and cost of every solution's engineer crew,
+    and how far the free-text inputs were cut to fit their token budgets.
+    Pass a ``RunTelemetry`` to also read back the cost of every stage.
+    """
+    key = record_key(inputs, direction_count)
+    inputs, input_budget = fit_inputs(inputs)
+    telemetry = RunTelemetry() if telemetry is None else telemetry
+    architect_results = journal.get(key, "architect") if journal else None
+    if architect_results is None:
+        architect_results = run_architect_crew(
+            inputs,
+            direction_count=direction_count,
+            use_cache=use_cache,
+            planning_mode=planning_mode,
+            telemetry=telemetry,
+        )
+        architect_directions(architect_results)
+        if journal:
+            journal.record(key, "architect", architect_results)
+
+    directions = architect_directions(architect_results)
+    finished = [journal.get(key, f"engineer:{index}") if journal else None for index in range(len(directions))]
+    missing = [index for index, entry in enumerate(finished) if entry is None]
+
+    def on_result(position, result, seconds):
+        entry = {"result": result, "seconds": seconds, "telemetry": telemetry.summary(f"engineer:{position}")}
+        finished[missing[position]] = entry
+        if journal:
+            journal.record(key, f"engineer:{missing[position]}", entry)
+
+    run_engineer_crews(
+        inputs,
+        [directions[index] for index in missing],
+        max_concurrency=max_concurrency,
+        use_cache=use_cache,
+        planning_mode=planning_mode,
+        on_result=on_result,
+        telemetry=telemetry,
+    )
+    return {
+        "architect": architect_results,
+        "solutions": [entry["result"] for entry in finished],
+        "timings": [entry["seconds"] for entry in finished],
+        "telemetry": [entry.get("telemetry") for entry in finished],
+        "input_budget": input_budget,
+    }
+
+
+def run_batch(lines, output, workers=4, **options):
+    """
+    Generate prompts for every task configuration in a JSONL stream.
+
+    Up to ``workers`` records are processed at once and only twice that many
+    lines are read ahead, so arbitrarily large inputs are streamed. Each
+    finished record is written to ``output`` as one JSON line as soon as it
+    completes, in completion order; failures, including lines that are not
+    valid JSON, are written with an ``error`` field instead of a result.
+    ``options`` are passed on to ``generate``. LLM calls run in the batch
+    rate-limit lane, so interactive generations in the same process go first.
+
+    With a ``journal``, records it marks as done are skipped, so rerunning
+    after a crash only pays for the missing stages. Returns the number of
+    succeeded, failed and skipped records.
+    """
+    journal = options.get("journal")
+    direction_count = options.get("direction_count", DEFAULT_DIRECTIONS)
+    lock = threading.Lock()
+    counts = {"succeeded": 0, "failed": 0, "skipped": 0}
+
+    def process(number, text):
+        line = {"line": number, "id": None}
+        key = None
+        try:
+            record = json.loads(text)
+            line["id"] = record.get("id")
+            inputs = normalize_inputs(record)
+            key = record_key(inputs, direction_count)
+            if journal and journal.get(key, "done"):
+                with lock:
+                    counts["skipped"] += 1
+                return
+            with lane("batch"), span("generation", line=number):
+                line["result"] = generate(inputs, **options)
+        except Exception as e:
+            line["error"] = f"{type(e).__name__}: {e}"
+        with lock:
+            output.write(json.dumps(line, default=str) + "\n")
+            output.flush()
+            counts["failed" if "error" in line else "succeeded"] += 1
+        if journal and "result" in line:
+            journal.record(key, "done", True)
+
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        in_flight = set()
+        for number, text in enumerate(lines, start=1):
+            if not text.strip():
+                continue
+            in_flight.add(pool.submit(process, number, text))
+            if len(in_flight) >= workers * 2:
+                done, in_flight = wait(in_flight, return_when=FIRST_COMPLETED)
+                # Record failures are written as lines; anything raised here, such as a failed write, stops the run
+                for future in done:
+                    future.result()
+        for future in in_flight:
+            future.result()
+    return counts
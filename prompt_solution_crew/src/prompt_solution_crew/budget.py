@@ -0,0 +1,108 @@
+import os
+
+# The model the crews run on (see crew.py), whose tokenizer measures the inputs
+TOKENIZER_MODEL = "gpt-4o-mini"
+
+# Token budget of each free-text input field that every crew's task interpolates
+FIELD_BUDGETS = {
+    "context": int(os.getenv("PROMPT_CONTEXT_TOKENS", 1500)),
+    "sample_data": int(os.getenv("PROMPT_SAMPLE_DATA_TOKENS", 3000)),
+}
+
+# Share of a field's budget kept from its start; the rest is kept from its end
+HEAD_SHARE = 0.75
+
+OMISSION_MARKER = "[... {lines} lines, about {tokens} tokens, omitted ...]"
+
+
+def count_tokens(model, messages=None, text=None):
+    """Count tokens with the model's tokenizer, falling back to a rough estimate."""
+    try:
+        from litellm import token_counter
+        if messages is not None:
+            return token_counter(model=model, messages=messages)
+        return token_counter(model=model, text=text or "")
+    except Exception:
+        if messages is not None:
+            text = " ".join(str(message.get("content", "")) for message in messages)
+        return len(text or "") // 4
+
+
+def _leading_lines(lines, budget, model):
+    """The leading lines that fit in ``budget`` tokens, and the tokens they take."""
+    kept, used = [], 0
+    for line in lines:
+        tokens = count_tokens(model, text=line + "\n")
+        if used + tokens > budget:
+            break
+        kept.append(line)
+        used += tokens
+    return kept, used
+
+
+def fit_text(text, budget, model=TOKENIZER_MODEL):
+    """
+    Cut ``text`` down to about ``budget`` tokens.
+
+    Returns the text and its tokens before and after. Text within budget
+    is returned unchanged. Otherwise whole lines are kept from the start
+    and from the end, since headers and the first records of pasted data
+    matter most, and the middle is replaced by a marker saying how much
+    was left out. Beyond one count of the whole text, only the lines that
+    are kept get measured. The result never takes more tokens than the
+    budget or, for a budget too small to hold any text, the marker alone.
+    """
+    tokens = count_tokens(model, text=text)
+    if tokens <= budget:
+        return text, tokens, tokens
+    # The marker's tokens come out of the budget; a budget smaller than the marker keeps only the marker
+    room = max(budget - count_tokens(model, text=OMISSION_MARKER), 0)
+    lines = text.splitlines()
+    head, used = _leading_lines(lines, int(room * HEAD_SHARE), model)
+    tail, _ = _leading_lines(reversed(lines[len(head):]), room - used, model)
+    tail.reverse()
+    if not head and not tail and room:
+        # A single line longer than the whole budget: keep its proportional start
+        head = [text[:len(text) * room // tokens]]
+
+    def join():
+        omitted = len(lines) - len(head) - len(tail)
+        marker = OMISSION_MARKER.format(lines=omitted, tokens=tokens - count_tokens(model, text="\n".join(head + tail)))
+        return "\n".join(head + [marker] + tail), count_tokens(model, text=marker)
+
+    fitted, marker_tokens = join()
+    kept = count_tokens(model, text=fitted)
+    # Lines measured one by one can add up to less than their joined text; drop edge lines until it fits
+    while kept > max(budget, marker_tokens) and (head or tail):
+        for _ in range(max(1, (len(head) + len(tail)) * (kept - budget) // kept)):
+            if head and len(head) >= len(tail):
+                head.pop()
+            elif tail:
+                tail.pop(0)
+        fitted, marker_tokens = join()
+        kept = count_tokens(model, text=fitted)
+    return fitted, tokens, kept
+
+
+def fit_inputs(inputs, budgets=None, model=TOKENIZER_MODEL):
+    """
+    Fit the free-text fields of crew inputs into their token budgets.
+
+    Returns the fitted inputs and a report of ``{"tokens", "kept"}`` per
+    field. Fit once per generation and hand the result to every crew, so
+    the architect and each engineer interpolate the same compact text and
+    share their cache entries.
+    """
+    fitted = dict(inputs)
+    report = {}
+    for field, budget in (FIELD_BUDGETS if budgets is None else budgets).items():
+        if not isinstance(inputs.get(field), str):
+            continue
+        fitted[field], tokens, kept = fit_text(inputs[field], budget, model)
+        report[field] = {"tokens": tokens, "kept": kept}
+    return fitted, report
+
+
+def saved_tokens(report):
+    """Prompt tokens a budget report saves on every crew that reads the inputs."""
+    return sum(max(0, field["tokens"] - field["kept"]) for field in report.values())
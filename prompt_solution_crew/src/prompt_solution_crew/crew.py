@@ -1,18 +1,47 @@
-from crewai import Agent, Crew, Process, Task,LLM
+from crewai import Agent, Crew, Process, Task
 from crewai.project import CrewBase, agent, crew, task
 from pathlib import Path
 import yaml
 from pydantic import BaseModel
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any
 import os
-import json	
+import copy
+import threading
 
+from prompt_solution_crew.llm import MeteredLLM
 
-my_llm = LLM(
+
+my_llm = MeteredLLM(
     api_key=os.getenv("OPENAI_API_KEY"),
     model="gpt-4o-mini"
 )
 
+_config_cache = {}
+_config_lock = threading.Lock()
+
+
+def load_config(config_path):
+    """
+    Parse a YAML config file, reusing the parsed result across crews.
+
+    The parse is cached per path and redone only when the file's mtime
+    changes, so edited configs still hot-reload. Each caller gets its own
+    deep copy, because CrewBase fills agent and task objects into it.
+    """
+    path = Path(config_path)
+    mtime = path.stat().st_mtime_ns
+    with _config_lock:
+        cached = _config_cache.get(path)
+        if cached is None or cached[0] != mtime:
+            with open(path, "r", encoding="utf-8") as file:
+                cached = (mtime, yaml.safe_load(file))
+            _config_cache[path] = cached
+    return copy.deepcopy(cached[1])
+
+
+# Crew-level planning: "on" for every crew, "off", or "architect_only"
+PLANNING_MODES = ("on", "off", "architect_only")
+
 class RequirementsAnalysis(BaseModel):
 	summary: str
 	constraints: List[str]
@@ -32,28 +61,7 @@ class Direction(BaseModel):
 class DirectionsList(BaseModel):
     directions: List[Direction] = []
 
-class PromptTemplate_1(BaseModel):
-    role: str
-    task: str
-    rules_constraints: str
-    reasoning_method: str
-    planning_method: str
-    output_format: str
-    explanation_of_optimization_choices: str
-    usage_guidelines: str
-
-
-class PromptTemplate_2(BaseModel):
-    role: str
-    task: str
-    rules_constraints: str
-    reasoning_method: str
-    planning_method: str
-    output_format: str
-    explanation_of_optimization_choices: str
-    usage_guidelines: str
-
-class PromptTemplate_3(BaseModel):
+class PromptTemplate(BaseModel):
     role: str
     task: str
     rules_constraints: str
@@ -70,38 +78,46 @@ class PromptSolutionCrew:
     agents_config = "config/agents.yaml"
     tasks_config = "config/tasks.yaml"
 
+    def __init__(self, planning_mode=None):
+        planning_mode = planning_mode or os.getenv("PROMPT_PLANNING_MODE", "on")
+        if planning_mode not in PLANNING_MODES:
+            raise ValueError(f"Unknown planning mode {planning_mode!r}, expected one of {PLANNING_MODES}")
+        self.planning_mode = planning_mode
 
-    @agent
-    def architect(self) -> Agent:
-        return Agent(
-            config=self.agents_config["architect"],
-            allow_delegation=False,
-            verbose=True,
-            llm=my_llm
-        )
-
-    @agent
-    def prompt_engineer_1(self) -> Agent:
-        return Agent(
-            config=self.agents_config["prompt_engineer_1"],
-            allow_delegation=False,
-            verbose=True,
-            llm=my_llm
+    def planning_settings(self, crew_name):
+        """Planning settings for a crew, with a metered planner LLM so its cost can be read back."""
+        enabled = self.planning_mode == "on" or (
+            self.planning_mode == "architect_only" and crew_name == "architect_crew"
         )
+        if not enabled:
+            return {"planning": False}
+        return {
+            "planning": True,
+            "planning_llm": MeteredLLM(
+                api_key=os.getenv("OPENAI_API_KEY"), model=my_llm.model, streaming=False, label="planner"
+            ),
+        }
+
+    def engineer_task_config(self):
+        """The shared engineer task config, with its static instruction block placed first."""
+        config = dict(self.tasks_config["optimize_prompt_direction"])
+        shared_prefix = config.pop("shared_prefix")
+        config["description"] = f"{shared_prefix}\n{config['description']}"
+        return config
 
     @agent
-    def prompt_engineer_2(self) -> Agent:
+    def architect(self) -> Agent:
         return Agent(
-            config=self.agents_config["prompt_engineer_2"],
+            config=self.agents_config["architect"],
             allow_delegation=False,
             verbose=True,
             llm=my_llm
         )
 
     @agent
-    def prompt_engineer_3(self) -> Agent:
+    def prompt_engineer(self) -> Agent:
         return Agent(
-            config=self.agents_config["prompt_engineer_3"],
+            config=self.agents_config["prompt_engineer"],
             allow_delegation=False,
             verbose=True,
             llm=my_llm
@@ -117,30 +133,12 @@ class PromptSolutionCrew:
         )
 
     @task
-    def optimize_prompt_direction_1(self) -> Task:
-        """Create a develop strategies task."""
-        return Task(
-            config=self.tasks_config['optimize_prompt_direction_1'],
-            agent=self.prompt_engineer_1(),
-            output_json=PromptTemplate_1
-        )
-
-    @task
-    def optimize_prompt_direction_2(self) -> Task:
-        """Create a develop strategies task."""
-        return Task(
-            config=self.tasks_config['optimize_prompt_direction_2'],
-            agent=self.prompt_engineer_2(),
-            output_json=PromptTemplate_2
-        )
-
-    @task
-    def optimize_prompt_direction_3(self) -> Task:
-        """Create a develop strategies task."""
+    def optimize_prompt_direction(self) -> Task:
+        """Create an optimize prompt task for one architect direction."""
         return Task(
-            config=self.tasks_config['optimize_prompt_direction_3'],
-            agent=self.prompt_engineer_3(),
-            output_json=PromptTemplate_3
+            config=self.engineer_task_config(),
+            agent=self.prompt_engineer(),
+            output_json=PromptTemplate
         )
 
 
@@ -153,37 +151,20 @@ class PromptSolutionCrew:
             tasks=[self.analyze_requirements_task()],
             process=Process.sequential,
             verbose=True,
-            planning=True
+            **self.planning_settings("architect_crew")
         ) 
     @crew
-    def prompt_engineer_crew_1(self) -> Crew:
-        """Creates the prompt_engineer crew"""
+    def prompt_engineer_crew(self) -> Crew:
+        """Creates the prompt_engineer crew for one architect direction"""
         return Crew(
-            agents=[self.prompt_engineer_1()],
-            tasks=[self.optimize_prompt_direction_1()],
+            agents=[self.prompt_engineer()],
+            tasks=[self.optimize_prompt_direction()],
             process=Process.sequential,
             verbose=True,
-            planning=True
+            **self.planning_settings("prompt_engineer_crew")
         ) 
 
-    @crew
-    def prompt_engineer_crew_2(self) -> Crew:
-        """Creates the prompt_engineer crew"""
-        return Crew(
-            agents=[self.prompt_engineer_2()],
-            tasks=[self.optimize_prompt_direction_2()],
-            process=Process.sequential,
-            verbose=True,
-            planning=True
-        ) 
 
-    @crew
-    def prompt_engineer_crew_3(self) -> Crew:
-        """Creates the prompt_engineer crew"""
-        return Crew(
-            agents=[self.prompt_engineer_3()],
-            tasks=[self.optimize_prompt_direction_3()],
-            process=Process.sequential,
-            verbose=True,
-            planning=True
-        ) 
+# CrewBase re-reads and re-parses both YAML files for every instance; serve
+# them from the mtime-checked cache instead
+PromptSolutionCrew.load_yaml = staticmethod(load_config)
@@ -0,0 +1,110 @@
+import contextvars
+import json
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from prompt_solution_crew.budget import count_tokens
+from prompt_solution_crew.tracing import span
+
+DEFAULT_TEST_CONCURRENCY = 6
+
+# Sections of a solution in the order they appear in the final prompt
+PROMPT_SECTIONS = (
+    ("Role", "role"),
+    ("Task", "task"),
+    ("Rules & Constraints", "rules"),
+    ("Reasoning", "reasoning"),
+    ("Planning", "planning"),
+    ("Output Format", "output_format"),
+)
+
+
+def assemble_prompt(solution):
+    """Join a solution's sections into the final prompt text."""
+    return "\n\n".join(
+        f"{title}:\n{solution.get(field) or 'Not Generated...'}" for title, field in PROMPT_SECTIONS
+    )
+
+
+def parse_output(text):
+    """
+    The JSON in a model output or expected output, or None.
+
+    Accepts JSON inside a code fence or after a line of prose, such as an
+    edge case's "Return error:" handling strategy.
+    """
+    text = (text or "").strip()
+    if text.startswith("```"):
+        text = text.split("\n", 1)[-1].rsplit("```", 1)[0]
+    try:
+        return json.loads(text)
+    except ValueError:
+        pass
+    start, end = text.find("{"), text.rfind("}")
+    if start == -1 or end < start:
+        return None
+    try:
+        return json.loads(text[start:end + 1])
+    except ValueError:
+        return None
+
+
+def tester_llm(model=None):
+    """A metered LLM for test runs; its output is never streamed to the page."""
+    from prompt_solution_crew.crew import my_llm
+    from prompt_solution_crew.llm import MeteredLLM
+
+    return MeteredLLM(
+        api_key=os.getenv("OPENAI_API_KEY"), model=model or my_llm.model, streaming=False, label="test"
+    )
+
+
+def run_case(llm, prompt, case):
+    """Run one test case against a prompt and return the output, latency and tokens."""
+    messages = [
+        {"role": "system", "content": prompt},
+        {"role": "user", "content": case["input"]},
+    ]
+    start = time.perf_counter()
+    with span("test.case", case=case["name"]):
+        try:
+            output = llm.call(messages)
+        except Exception as e:
+            return {"error": f"{type(e).__name__}: {e}", "seconds": time.perf_counter() - start}
+    return {
+        "output": output,
+        "json": parse_output(output),
+        "seconds": time.perf_counter() - start,
+        "tokens": count_tokens(llm.model, messages=messages) + count_tokens(llm.model, text=output),
+    }
+
+
+def run_tests(prompts, cases, max_concurrency=DEFAULT_TEST_CONCURRENCY, llm=None):
+    """
+    Run every prompt against its test cases.
+
+    ``cases[i]`` is the list of ``{"name", "input", "expected"}`` cases for
+    ``prompts[i]``. All (prompt, case) pairs run concurrently on a pool of
+    ``max_concurrency`` workers, under the shared rate limiter. Returns one
+    list of results per prompt, in case order; a failed call is reported
+    with an ``error`` instead of failing the run.
+    """
+    llm = llm or tester_llm()
+    pairs = [
+        (solution, index, prompt, case)
+        for solution, (prompt, solution_cases) in enumerate(zip(prompts, cases))
+        for index, case in enumerate(solution_cases)
+    ]
+    results = [[None] * len(solution_cases) for solution_cases in cases]
+    if not pairs:
+        return results
+    with span("test.run", prompts=len(prompts), cases=len(pairs)):
+        with ThreadPoolExecutor(max_workers=max(1, min(max_concurrency, len(pairs)))) as pool:
+            futures = {
+                pool.submit(contextvars.copy_context().run, run_case, llm, prompt, case): (solution, index)
+                for solution, index, prompt, case in pairs
+            }
+            for future, (solution, index) in futures.items():
+                results[solution][index] = future.result()
+    return results
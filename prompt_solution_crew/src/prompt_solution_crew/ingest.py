@@ -0,0 +1,122 @@
+import gzip
+import hashlib
+import itertools
+import json
+import os
+import threading
+import uuid
+from pathlib import Path
+
+DEFAULT_DOCUMENT_DIR = Path.home() / ".cache" / "prompt_solution_crew" / "documents"
+
+# Bytes read at a time while hashing an uploaded file
+HASH_CHUNK_SIZE = 1 << 20
+
+
+def file_digest(file):
+    """SHA-256 of a PDF given as a path or a seekable binary file object, read in chunks."""
+    digest = hashlib.sha256()
+    if isinstance(file, (str, os.PathLike)):
+        with open(file, "rb") as handle:
+            for chunk in iter(lambda: handle.read(HASH_CHUNK_SIZE), b""):
+                digest.update(chunk)
+        return digest.hexdigest()
+    position = file.tell()
+    file.seek(0)
+    for chunk in iter(lambda: file.read(HASH_CHUNK_SIZE), b""):
+        digest.update(chunk)
+    file.seek(position)
+    return digest.hexdigest()
+
+
+def extract_pages(file):
+    """
+    Yield the text of each page of a PDF, parsing one page at a time.
+
+    A path is opened and read on demand; pypdf would load the whole file
+    into memory if it were given the path itself.
+    """
+    from pypdf import PdfReader
+
+    if isinstance(file, (str, os.PathLike)):
+        with open(file, "rb") as handle:
+            yield from extract_pages(handle)
+        return
+    for page in PdfReader(file).pages:
+        yield page.extract_text() or ""
+
+
+class DocumentCache:
+    """
+    Text extracted from PDFs, cached on disk by file content hash.
+
+    ``pages`` streams a document's page texts: from the cache when the same
+    file was read before, otherwise straight from the PDF while each page
+    is also appended to a gzip JSON-lines file. That file only replaces the
+    cache entry once every page was extracted, so a read that is stopped
+    early or fails leaves nothing behind. The ``max_documents`` most
+    recently read documents are kept.
+    """
+
+    def __init__(self, directory=DEFAULT_DOCUMENT_DIR, max_documents=100):
+        self.directory = Path(directory)
+        self.max_documents = max_documents
+        self.directory.mkdir(parents=True, exist_ok=True)
+
+    def _path(self, digest):
+        return self.directory / f"{digest}.jsonl.gz"
+
+    def pages(self, file):
+        """Yield the text of every page of a PDF given as a path or binary file object."""
+        path = self._path(file_digest(file))
+        try:
+            handle = gzip.open(path, "rt", encoding="utf-8")
+        except FileNotFoundError:
+            yield from self._extract(file, path)
+            return
+        os.utime(path)
+        with handle:
+            for line in handle:
+                yield json.loads(line)
+
+    def _extract(self, file, path):
+        partial = path.with_name(f"{path.name}.{uuid.uuid4().hex}.part")
+        try:
+            with gzip.open(partial, "wt", encoding="utf-8") as out:
+                for text in extract_pages(file):
+                    out.write(json.dumps(text) + "\n")
+                    yield text
+            os.replace(partial, path)
+        finally:
+            partial.unlink(missing_ok=True)
+        self._trim()
+
+    def _trim(self):
+        documents = sorted(self.directory.glob("*.jsonl.gz"), key=lambda path: path.stat().st_mtime, reverse=True)
+        for path in documents[self.max_documents:]:
+            path.unlink(missing_ok=True)
+
+    def text(self, file, max_pages=None):
+        """The text of a PDF's first ``max_pages`` pages, or of all pages, one page per line block."""
+        return "\n".join(itertools.islice(self.pages(file), max_pages))
+
+
+_documents = None
+_documents_lock = threading.Lock()
+
+
+def get_document_cache():
+    """Return the process-wide document cache, configured from the environment."""
+    global _documents
+    with _documents_lock:
+        if _documents is None:
+            _documents = DocumentCache(
+                directory=os.getenv("PROMPT_DOCUMENT_DIR", DEFAULT_DOCUMENT_DIR),
+                max_documents=int(os.getenv("PROMPT_DOCUMENT_MAX", 100)),
+            )
+        return _documents
+
+
+def document_text(file, max_pages=None):
+    """The text of a PDF given as a path or binary file object, through the shared document cache."""
+    return get_document_cache().text(file, max_pages)
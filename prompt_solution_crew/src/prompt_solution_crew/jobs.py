@@ -0,0 +1,345 @@
+import contextvars
+import json
+import os
+import sqlite3
+import threading
+import time
+import uuid
+from contextlib import closing
+from pathlib import Path
+
+from prompt_solution_crew.budget import fit_inputs
+from prompt_solution_crew.pipeline import architect_directions, run_architect_crew, run_engineer_crew, run_engineer_crews
+from prompt_solution_crew.store import get_result_store
+from prompt_solution_crew.streaming import TokenStream
+from prompt_solution_crew.telemetry import RunTelemetry
+from prompt_solution_crew.tracing import get_tracer
+
+DEFAULT_JOBS_PATH = Path.home() / ".cache" / "prompt_solution_crew" / "jobs.db"
+DEFAULT_WORKERS = 2
+
+# Job states; a job only moves forward through them
+QUEUED, RUNNING, DONE, FAILED = "queued", "running", "done", "failed"
+FINISHED = (DONE, FAILED)
+
+# Seconds between progress writes while a job is streaming
+PROGRESS_INTERVAL = 0.5
+
+# Seconds between heartbeats of running jobs, and without one after which a running job is requeued
+HEARTBEAT_INTERVAL = 10.0
+DEFAULT_STALE_SECONDS = 60.0
+
+
+class JobQueue:
+    """
+    SQLite-backed job queue worked by a local pool of threads.
+
+    Jobs belong to the process, not to the Streamlit script run that
+    submitted them, so they keep running through reruns and browser
+    reconnects; their progress and result are stored in SQLite and read
+    back by job ID. A free worker takes the oldest queued job of the owner
+    with the fewest running jobs, ties going to the owner served least
+    recently, so one user's burst of jobs cannot starve everyone else.
+    The process working a job records a heartbeat for it every few
+    seconds. Several processes may share the database, so only a running
+    job whose heartbeat is older than ``stale_seconds``, left behind by a
+    process that died, is queued again for the next free worker.
+
+    ``handler(request, report)`` runs one job and returns its JSON result;
+    it may call ``report(progress)`` with JSON progress at any time.
+    """
+
+    def __init__(self, handler, path=DEFAULT_JOBS_PATH, workers=DEFAULT_WORKERS, keep_seconds=24 * 3600,
+                 stale_seconds=DEFAULT_STALE_SECONDS):
+        self.handler = handler
+        self.path = Path(path)
+        self.keep_seconds = keep_seconds
+        self.stale_seconds = stale_seconds
+        self._wake = threading.Condition()
+        self._running = set()
+        self._running_lock = threading.Lock()
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        with closing(self._connect()) as conn, conn:
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS jobs ("
+                "id TEXT PRIMARY KEY, owner TEXT NOT NULL, status TEXT NOT NULL, "
+                "request TEXT NOT NULL, progress TEXT, result TEXT, error TEXT, "
+                "created REAL NOT NULL, started REAL, finished REAL, heartbeat REAL)"
+            )
+            # Databases created before heartbeats were recorded
+            if "heartbeat" not in {row[1] for row in conn.execute("PRAGMA table_info(jobs)")}:
+                conn.execute("ALTER TABLE jobs ADD COLUMN heartbeat REAL")
+            conn.execute("CREATE INDEX IF NOT EXISTS jobs_status ON jobs (status, created)")
+        self._workers = [
+            threading.Thread(target=self._work, name=f"job-worker-{index}", daemon=True)
+            for index in range(workers)
+        ]
+        if workers:
+            self._workers.append(threading.Thread(target=self._beat, name="job-heartbeat", daemon=True))
+        for worker in self._workers:
+            worker.start()
+
+    def _connect(self):
+        return sqlite3.connect(self.path, timeout=30)
+
+    def submit(self, owner, request):
+        """Queue a job for ``owner`` and return its ID."""
+        job_id = uuid.uuid4().hex
+        now = time.time()
+        with closing(self._connect()) as conn, conn:
+            conn.execute(
+                "INSERT INTO jobs (id, owner, status, request, created) VALUES (?, ?, ?, ?, ?)",
+                (job_id, owner, QUEUED, json.dumps(request, default=str), now),
+            )
+            conn.execute(
+                "DELETE FROM jobs WHERE status IN (?, ?) AND finished < ?",
+                (*FINISHED, now - self.keep_seconds),
+            )
+        with self._wake:
+            self._wake.notify()
+        return job_id
+
+    def get(self, job_id):
+        """The job as a dict, with its queue position while queued, or None if unknown."""
+        with closing(self._connect()) as conn:
+            conn.row_factory = sqlite3.Row
+            row = conn.execute("SELECT * FROM jobs WHERE id = ?", (job_id,)).fetchone()
+            if row is None:
+                return None
+            job = dict(row)
+            if job["status"] == QUEUED:
+                job["position"] = conn.execute(
+                    "SELECT COUNT(*) FROM jobs WHERE status = ? AND created < ?", (QUEUED, job["created"])
+                ).fetchone()[0]
+        for field in ("request", "progress", "result"):
+            if job[field] is not None:
+                job[field] = json.loads(job[field])
+        return job
+
+    def _claim(self):
+        """Atomically requeue stale running jobs, then mark the next fairly scheduled job as running and return it."""
+        with closing(self._connect()) as conn:
+            conn.isolation_level = None
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                now = time.time()
+                conn.execute(
+                    "UPDATE jobs SET status = ?, started = NULL, heartbeat = NULL "
+                    "WHERE status = ? AND COALESCE(heartbeat, started, 0) < ?",
+                    (QUEUED, RUNNING, now - self.stale_seconds),
+                )
+                row = conn.execute(
+                    "SELECT id, request FROM jobs AS job WHERE status = ? ORDER BY "
+                    "(SELECT COUNT(*) FROM jobs WHERE owner = job.owner AND status = ?), "
+                    "(SELECT COALESCE(MAX(started), 0) FROM jobs WHERE owner = job.owner), "
+                    "created LIMIT 1",
+                    (QUEUED, RUNNING),
+                ).fetchone()
+                if row is not None:
+                    conn.execute(
+                        "UPDATE jobs SET status = ?, started = ?, heartbeat = ? WHERE id = ?",
+                        (RUNNING, now, now, row[0]),
+                    )
+                conn.execute("COMMIT")
+            except BaseException:
+                conn.execute("ROLLBACK")
+                raise
+        return None if row is None else (row[0], json.loads(row[1]))
+
+    def _update(self, job_id, **fields):
+        columns = ", ".join(f"{name} = ?" for name in fields)
+        with closing(self._connect()) as conn, conn:
+            conn.execute(f"UPDATE jobs SET {columns} WHERE id = ?", (*fields.values(), job_id))
+
+    def _beat(self):
+        """Refresh the heartbeat of the jobs this process is running."""
+        while True:
+            time.sleep(HEARTBEAT_INTERVAL)
+            with self._running_lock:
+                running = list(self._running)
+            if not running:
+                continue
+            try:
+                with closing(self._connect()) as conn, conn:
+                    conn.execute(
+                        f"UPDATE jobs SET heartbeat = ? WHERE status = ? AND id IN ({', '.join('?' * len(running))})",
+                        (time.time(), RUNNING, *running),
+                    )
+            except sqlite3.Error:
+                # A busy database only delays this beat; the next one comes well before the job goes stale
+                continue
+
+    def _work(self):
+        while True:
+            claimed = self._claim()
+            if claimed is None:
+                with self._wake:
+                    self._wake.wait(timeout=1.0)
+                continue
+            job_id, request = claimed
+
+            def report(progress):
+                self._update(job_id, progress=json.dumps(progress, default=str), heartbeat=time.time())
+
+            with self._running_lock:
+                self._running.add(job_id)
+            try:
+                result = self.handler(request, report)
+                self._update(job_id, status=DONE, result=json.dumps(result, default=str), finished=time.time())
+            except Exception as e:
+                self._update(job_id, status=FAILED, error=f"{type(e).__name__}: {e}", finished=time.time())
+            finally:
+                with self._running_lock:
+                    self._running.discard(job_id)
+
+
+def _relay(work, stream, report, stage):
+    """
+    Run ``work()`` in a helper thread and return its result.
+
+    While it runs, the stream's text so far is reported as ``{"stage",
+    "texts"}`` progress, with ``stage()`` naming the current step. The
+    helper inherits this thread's context, so spans and telemetry scopes
+    carry over.
+    """
+    outcome = {}
+
+    def target():
+        try:
+            outcome["value"] = work()
+        except Exception as e:
+            outcome["error"] = e
+
+    worker = threading.Thread(target=contextvars.copy_context().run, args=(target,), daemon=True)
+    worker.start()
+    while worker.is_alive():
+        worker.join(PROGRESS_INTERVAL)
+        if stream.poll():
+            report({"stage": stage(), "texts": stream.texts})
+    if "error" in outcome:
+        raise outcome["error"]
+    return outcome["value"]
+
+
+def run_generation(request, report):
+    """
+    Job handler for one page generation: the architect and engineer crews.
+
+    The crews run in a helper thread while this one relays their streamed
+    output as progress. The free-text inputs are fitted to their token
+    budgets once, and every crew reads the fitted copy. The finished run is
+    saved to the result store and the job result only holds its
+    ``run_id``. An architect result without directions fails the job with
+    the same ValueError as ``batch.generate``.
+    """
+    inputs, input_budget = fit_inputs(request["inputs"])
+    stream = TokenStream()
+    telemetry = RunTelemetry()
+    outcome = {}
+
+    def generate():
+        with get_tracer().span("generation", direction_count=request["direction_count"]) as root:
+            outcome["trace_id"] = root.trace_id
+            outcome["architect"] = run_architect_crew(
+                inputs,
+                direction_count=request["direction_count"],
+                use_cache=request["use_cache"],
+                planning_mode=request["planning_mode"],
+                stream=stream,
+                telemetry=telemetry,
+            )
+            outcome["engineers"] = run_engineer_crews(
+                inputs,
+                architect_directions(outcome["architect"]),
+                max_concurrency=request["max_concurrency"],
+                use_cache=request["use_cache"],
+                planning_mode=request["planning_mode"],
+                stream=stream,
+                telemetry=telemetry,
+            )
+
+    _relay(generate, stream, report, lambda: "engineers" if "architect" in outcome else "architect")
+
+    solutions, timings = outcome["engineers"]
+    return {"run_id": get_result_store().save({
+        "inputs": inputs,
+        "architect": outcome["architect"],
+        "solutions": solutions,
+        "timings": timings,
+        "telemetry": {
+            "architect": telemetry.summary("architect"),
+            "engineers": [telemetry.summary(f"engineer:{index}") for index in range(len(solutions))],
+        },
+        "trace": get_tracer().trace(outcome["trace_id"]),
+        "input_budget": input_budget,
+    })}
+
+
+def run_regeneration(request, report):
+    """
+    Job handler that reruns the engineer crew of one solution of a stored run.
+
+    The architect analysis is reused and the crew's cache entry refreshed.
+    Stored runs are never modified, so the run with that solution replaced
+    is saved as a new run; the job result holds its ``run_id``, the
+    solution ``index`` and the crew's ``seconds``.
+    """
+    run = get_result_store().load(request["run_id"])
+    if run is None:
+        raise LookupError("the run to regenerate is no longer stored")
+    index = request["index"]
+    stage = f"engineer:{index}"
+    stream = TokenStream()
+    telemetry = RunTelemetry()
+    outcome = {}
+
+    def regenerate():
+        with get_tracer().span("regeneration", index=index) as root:
+            outcome["trace_id"] = root.trace_id
+            return run_engineer_crew(
+                run["inputs"],
+                run["architect"]["directions"][index],
+                refresh=True,
+                planning_mode=request["planning_mode"],
+                stream=stream,
+                stage=stage,
+                telemetry=telemetry,
+            )
+
+    result, seconds = _relay(regenerate, stream, report, lambda: stage)
+
+    replaced = {field: value for field, value in run.items() if field != "run_id"}
+    for field, value in (("solutions", result), ("timings", seconds)):
+        replaced[field] = list(run[field])
+        replaced[field][index] = value
+    engineers = list(run["telemetry"]["engineers"])
+    engineers[index] = telemetry.summary(stage)
+    replaced["telemetry"] = {**run["telemetry"], "engineers": engineers}
+    replaced["trace"] = get_tracer().trace(outcome["trace_id"])
+    return {"run_id": get_result_store().save(replaced), "index": index, "seconds": seconds}
+
+
+# Job handlers by request kind; requests without a kind are page generations
+HANDLERS = {"generate": run_generation, "regenerate": run_regeneration}
+
+
+def run_job(request, report):
+    """Run a queued job with the handler for its request's ``kind``."""
+    return HANDLERS[request.get("kind", "generate")](request, report)
+
+
+_queue = None
+_queue_lock = threading.Lock()
+
+
+def get_job_queue():
+    """Return the process-wide job queue for generations and regenerations, configured from the environment."""
+    global _queue
+    with _queue_lock:
+        if _queue is None:
+            _queue = JobQueue(
+                run_job,
+                path=os.getenv("PROMPT_JOBS_PATH", DEFAULT_JOBS_PATH),
+                workers=int(os.getenv("PROMPT_JOB_WORKERS", DEFAULT_WORKERS)),
+            )
+        return _queue
@@ -0,0 +1,63 @@
+import hashlib
+import json
+import os
+import threading
+from pathlib import Path
+
+
+def record_key(inputs, direction_count):
+    """Stable hash identifying one task configuration of a batch run."""
+    payload = json.dumps({"inputs": inputs, "direction_count": direction_count}, sort_keys=True, default=str)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class CheckpointJournal:
+    """
+    Append-only JSONL journal of finished pipeline stages.
+
+    Every entry maps a record key and a stage name (``architect``,
+    ``engineer:<i>`` or ``done``) to that stage's result. Entries are flushed
+    and fsynced as they are written, so after a crash a restarted run can
+    look up everything that finished and only redo the stages that were in
+    flight. A torn last line from an interrupted write is ignored on load.
+    """
+
+    def __init__(self, path):
+        self.path = Path(path)
+        self._entries = {}
+        self._lock = threading.Lock()
+        torn = False
+        if self.path.exists():
+            with open(self.path, encoding="utf-8") as journal:
+                for line in journal:
+                    torn = not line.endswith("\n")
+                    try:
+                        entry = json.loads(line)
+                    except json.JSONDecodeError:
+                        continue
+                    self._entries[(entry["key"], entry["stage"])] = entry["result"]
+        self._file = open(self.path, "a", encoding="utf-8")
+        if torn:
+            self._file.write("\n")
+
+    def get(self, key, stage):
+        """The recorded result of a stage, or None if it has not finished."""
+        with self._lock:
+            return self._entries.get((key, stage))
+
+    def record(self, key, stage, result):
+        line = json.dumps({"key": key, "stage": stage, "result": result}, default=str)
+        with self._lock:
+            self._file.write(line + "\n")
+            self._file.flush()
+            os.fsync(self._file.fileno())
+            self._entries[(key, stage)] = result
+
+    def close(self):
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
@@ -0,0 +1,207 @@
+import threading
+import time
+
+from crewai import LLM
+
+from prompt_solution_crew import streaming, telemetry, tracing
+from prompt_solution_crew.budget import count_tokens
+from prompt_solution_crew.ratelimit import get_limiter
+from prompt_solution_crew.transport import transport_from_env
+
+# Stand-in for the provider that every MeteredLLM call goes to, when set
+_transport = None
+_transport_configured = False
+_transport_lock = threading.Lock()
+
+# Completion tokens reserved from the rate limiter when max_tokens is unset
+COMPLETION_ESTIMATE = 1024
+
+# Call measurements MeteredLLM.usage() totals
+USAGE_FIELDS = ("seconds", "queued_seconds", "prompt_tokens", "completion_tokens")
+MAX_RATE_LIMIT_RETRIES = 5
+
+
+def is_rate_limit_error(error):
+    try:
+        from litellm.exceptions import RateLimitError
+    except ImportError:
+        return getattr(error, "status_code", None) == 429
+    return isinstance(error, RateLimitError) or getattr(error, "status_code", None) == 429
+
+
+def retry_after(error):
+    """The provider's Retry-After delay in seconds, if the error carries one."""
+    headers = getattr(getattr(error, "response", None), "headers", None) or {}
+    try:
+        return float(headers.get("retry-after"))
+    except (TypeError, ValueError):
+        return None
+
+
+def set_transport(transport):
+    """
+    Send every ``MeteredLLM`` call to ``transport`` instead of the provider.
+
+    A transport has a ``complete(model, messages, stream, live)`` method
+    returning the response text, or an iterator of text chunks when
+    ``stream`` is true; ``live()`` makes the real provider call in the same
+    form, for transports that record. Calls to a transport with a true
+    ``offline`` attribute bypass the rate limiter. Pass None to go back to
+    live calls.
+    """
+    global _transport, _transport_configured
+    with _transport_lock:
+        _transport = transport
+        _transport_configured = True
+
+
+def get_transport():
+    """The installed transport, set up from the cassette settings in the environment on first use."""
+    global _transport, _transport_configured
+    with _transport_lock:
+        if not _transport_configured:
+            _transport = transport_from_env()
+            _transport_configured = True
+        return _transport
+
+
+class MeteredLLM(LLM):
+    """
+    LLM that records the latency and token counts of every call.
+
+    Calls made while a ``streaming.TokenStream`` stage is active are streamed
+    and their tokens forwarded to it; pass ``streaming=False`` for LLMs whose
+    output should never be shown, such as the crew planner.
+
+    Every call goes through the process-wide ``ratelimit.RateLimiter`` and
+    is retried with backoff when the provider answers with a 429. Calls are
+    also reported to the ``telemetry.RunTelemetry`` scope they run in and
+    traced as ``llm.<label>`` spans. The LLM itself only keeps running
+    totals, since one instance is shared by every run in the process.
+    """
+
+    def __init__(self, *args, streaming=True, label="agent", **kwargs):
+        super().__init__(*args, **kwargs)
+        self.streaming = streaming
+        self.label = label
+        self._usage = dict.fromkeys(("calls",) + USAGE_FIELDS, 0)
+        self._usage_lock = threading.Lock()
+
+    def call(self, messages, *args, **kwargs):
+        if isinstance(messages, str):
+            messages = [{"role": "user", "content": messages}]
+        with tracing.span(f"llm.{self.label}", model=self.model) as span:
+            record = self._metered_call(messages, *args, **kwargs)
+            response = record.pop("response")
+            span.set(**record)
+        with self._usage_lock:
+            self._usage["calls"] += 1
+            for field in USAGE_FIELDS:
+                self._usage[field] += record[field]
+        telemetry.record(self.model, record)
+        return response
+
+    def _metered_call(self, messages, *args, **kwargs):
+        limiter = get_limiter()
+        prompt_tokens = count_tokens(self.model, messages=messages)
+        estimated = prompt_tokens + (self.max_tokens or self.max_completion_tokens or COMPLETION_ESTIMATE)
+        start = time.perf_counter()
+        queued = 0.0
+        transport = get_transport()
+        # Offline transports never reach the provider, so they skip its rate limits
+        throttled = not getattr(transport, "offline", False)
+        for attempt in range(MAX_RATE_LIMIT_RETRIES + 1):
+            if throttled:
+                queued += limiter.acquire(estimated)
+            try:
+                if transport is not None:
+                    response = self._transport_call(transport, messages, *args, **kwargs)
+                elif self.streaming and streaming.is_streaming() and not kwargs.get("tools"):
+                    callbacks = kwargs.get("callbacks", args[0] if args else None)
+                    response = self._relay(self._live_chunks(messages, callbacks))
+                else:
+                    response = super().call(messages, *args, **kwargs)
+                break
+            except Exception as e:
+                if attempt == MAX_RATE_LIMIT_RETRIES or not is_rate_limit_error(e):
+                    raise
+                limiter.backoff(retry_after(e))
+        completion_tokens = count_tokens(self.model, text=str(response))
+        if throttled:
+            limiter.settle(estimated, prompt_tokens + completion_tokens)
+        return {
+            "response": response,
+            "seconds": time.perf_counter() - start - queued,
+            "queued_seconds": queued,
+            "retries": attempt,
+            "prompt_tokens": prompt_tokens,
+            "completion_tokens": completion_tokens,
+        }
+
+    def _transport_call(self, transport, messages, *args, **kwargs):
+        callbacks = kwargs.get("callbacks", args[0] if args else None)
+        if not (self.streaming and streaming.is_streaming() and not kwargs.get("tools")):
+            return transport.complete(
+                self.model, messages, stream=False, live=lambda: super(MeteredLLM, self).call(messages, *args, **kwargs)
+            )
+        return self._relay(transport.complete(
+            self.model, messages, stream=True, live=lambda: self._live_chunks(messages, callbacks)
+        ))
+
+    def supports_function_calling(self):
+        # Recorded and replayed runs must take the same text path, so native tool calls stay off
+        if get_transport() is not None:
+            return False
+        return super().supports_function_calling()
+
+    def _relay(self, chunks):
+        """Forward streamed text deltas to the active stream stage and return the full text."""
+        streaming.emit("start")
+        text = []
+        for delta in chunks:
+            text.append(delta)
+            streaming.emit("delta", delta)
+        return "".join(text)
+
+    def _completion_params(self, messages):
+        """The litellm.completion arguments ``LLM.call`` sends, built the same way."""
+        params = {
+            "model": self.model,
+            "messages": messages,
+            "timeout": self.timeout,
+            "temperature": self.temperature,
+            "top_p": self.top_p,
+            "n": self.n,
+            "stop": self.stop,
+            "max_tokens": self.max_tokens or self.max_completion_tokens,
+            "presence_penalty": self.presence_penalty,
+            "frequency_penalty": self.frequency_penalty,
+            "logit_bias": self.logit_bias,
+            "response_format": self.response_format,
+            "seed": self.seed,
+            "logprobs": self.logprobs,
+            "top_logprobs": self.top_logprobs,
+            "api_base": self.base_url,
+            "api_version": self.api_version,
+            "api_key": self.api_key,
+            **self.kwargs,
+        }
+        return {name: value for name, value in params.items() if value is not None}
+
+    def _live_chunks(self, messages, callbacks=None):
+        """Stream a completion from the provider, yielding the text deltas."""
+        import litellm
+
+        if callbacks:
+            self.set_callbacks(callbacks)
+        for chunk in litellm.completion(**{**self._completion_params(messages), "stream": True}):
+            if not chunk.choices:
+                continue
+            delta = chunk.choices[0].delta.content or ""
+            if delta:
+                yield delta
+
+    def usage(self):
+        """Totals over all calls made through this LLM so far."""
+        with self._usage_lock:
+            return dict(self._usage)
@@ -1,40 +1,119 @@
 #!/usr/bin/env python
+import argparse
 import sys
 import warnings
 
-from prompt_solution_crew.crew import PromptSolutionCrew
+from prompt_solution_crew.batch import normalize_inputs, run_batch
+from prompt_solution_crew.crew import PLANNING_MODES, PromptSolutionCrew
+from prompt_solution_crew.journal import CheckpointJournal
+from prompt_solution_crew.llm import set_transport
+from prompt_solution_crew.pipeline import DEFAULT_CONCURRENCY, DEFAULT_DIRECTIONS, MAX_DIRECTIONS, MIN_DIRECTIONS
+from prompt_solution_crew.transport import RecordingTransport, ReplayTransport
 
 warnings.filterwarnings("ignore", category=SyntaxWarning, module="pysbd")
 
-def run(inputs):
+# Architect inputs used by train and test, matching the page defaults
+SAMPLE_INPUTS = {
+    **normalize_inputs({
+        "task_description": "Extract order date, buyer name and email address from my order pdf",
+        "task_type": "Data Extraction",
+        "sample_data": "Order Details\nDate: 2024-03-20\nCustomer Information:\nName: John Smith\n"
+                       "Email: john.smith@example.com\nOrder Number: ORD-2024-001",
+    }),
+    "direction_count": DEFAULT_DIRECTIONS,
+}
+
+
+def run():
     """
-    Run the crew with the provided inputs.
+    Generate prompts for a JSONL file of task configurations.
+
+    Each line holds the same keys as the page's inputs (task_description,
+    task_type, model_preference, tone, context, sample_data, examples) and
+    an optional id. Results are appended to the output file as each record
+    completes, and finished stages are checkpointed to a journal so an
+    interrupted run can be restarted with the same command.
     """
-    return PromptSolutionCrew().crew().kickoff(inputs=inputs)
+    parser = argparse.ArgumentParser(
+        prog="prompt_solution_crew",
+        description="Generate prompts for a JSONL file of task configurations."
+    )
+    parser.add_argument("input", help="JSONL file of task configurations, or - for stdin")
+    parser.add_argument("output", help="JSONL file the results are appended to")
+    parser.add_argument("-w", "--workers", type=int, default=4,
+                        help="task configurations processed at the same time (default: 4)")
+    parser.add_argument("-n", "--directions", type=int, default=DEFAULT_DIRECTIONS,
+                        choices=range(MIN_DIRECTIONS, MAX_DIRECTIONS + 1), metavar="N",
+                        help=f"directions per task, {MIN_DIRECTIONS}-{MAX_DIRECTIONS} (default: {DEFAULT_DIRECTIONS})")
+    parser.add_argument("--engineer-concurrency", type=int, default=DEFAULT_CONCURRENCY,
+                        help=f"engineer crews run at the same time per task (default: {DEFAULT_CONCURRENCY})")
+    parser.add_argument("--planning", choices=PLANNING_MODES, help="crew planning mode (default: on)")
+    parser.add_argument("--no-cache", action="store_true", help="do not reuse or store cached crew results")
+    parser.add_argument("--journal", help="checkpoint journal to resume from (default: OUTPUT.journal)")
+    cassette = parser.add_mutually_exclusive_group()
+    cassette.add_argument("--record", metavar="CASSETTE", help="record every LLM call to a gzip cassette")
+    cassette.add_argument("--replay", metavar="CASSETTE", help="answer LLM calls from a recorded cassette, offline")
+    parser.add_argument("--replay-speed", type=float, default=0.0,
+                        help="replay timing speed-up, 1 for the recorded timing (default: 0, instant)")
+    args = parser.parse_args()
+
+    if args.record:
+        set_transport(RecordingTransport(args.record))
+    elif args.replay:
+        set_transport(ReplayTransport(args.replay, speed=args.replay_speed))
 
-def train(inputs, n_iterations, filename):
+    source = sys.stdin if args.input == "-" else open(args.input, encoding="utf-8")
+    journal = CheckpointJournal(args.journal or f"{args.output}.journal")
+    with source, journal, open(args.output, "a", encoding="utf-8") as output:
+        counts = run_batch(
+            source,
+            output,
+            workers=args.workers,
+            direction_count=args.directions,
+            max_concurrency=args.engineer_concurrency,
+            use_cache=not args.no_cache,
+            planning_mode=args.planning,
+            journal=journal,
+        )
+    print(
+        f"{counts['succeeded']} succeeded, {counts['failed']} failed, "
+        f"{counts['skipped']} already done",
+        file=sys.stderr
+    )
+    return 1 if counts["failed"] else 0
+
+
+def train():
     """
-    Train the crew for a given number of iterations.
+    Train the architect crew for a given number of iterations.
     """
     try:
-        return PromptSolutionCrew().crew().train(n_iterations=n_iterations, filename=filename, inputs=inputs)
+        return PromptSolutionCrew().architect_crew().train(
+            n_iterations=int(sys.argv[1]), filename=sys.argv[2], inputs=SAMPLE_INPUTS
+        )
     except Exception as e:
         raise Exception(f"An error occurred while training the crew: {e}")
 
-def replay(task_id):
+def replay():
     """
-    Replay the crew execution from a specific task.
+    Replay the architect crew execution from a specific task.
     """
     try:
-        return PromptSolutionCrew().crew().replay(task_id=task_id)
+        return PromptSolutionCrew().architect_crew().replay(task_id=sys.argv[1])
     except Exception as e:
         raise Exception(f"An error occurred while replaying the crew: {e}")
 
-def test(inputs, n_iterations, openai_model_name):
+def test():
     """
-    Test the crew execution and returns the results.
+    Test the architect crew execution and returns the results.
     """
     try:
-        return PromptSolutionCrew().crew().test(n_iterations=n_iterations, openai_model_name=openai_model_name, inputs=inputs)
+        return PromptSolutionCrew().architect_crew().test(
+            n_iterations=int(sys.argv[1]), openai_model_name=sys.argv[2], inputs=SAMPLE_INPUTS
+        )
     except Exception as e:
         raise Exception(f"An error occurred while testing the crew: {e}")
+
+
+if __name__ == "__main__":
+    sys.exit(run())
@@ -0,0 +1,212 @@
+import contextvars
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import nullcontext
+
+from prompt_solution_crew.cache import cache_key, get_cache
+from prompt_solution_crew.tracing import span
+
+MIN_DIRECTIONS = 1
+MAX_DIRECTIONS = 8
+DEFAULT_DIRECTIONS = 3
+DEFAULT_CONCURRENCY = 3
+
+
+# Running planning totals per crew name, so memory stays flat however many runs a process serves
+_planning_usage = {}
+_planning_lock = threading.Lock()
+
+PLANNING_FIELDS = ("seconds", "prompt_tokens", "completion_tokens")
+
+
+def record_planning_usage(crew_name, crew):
+    """Record what the planning step of a finished crew run cost."""
+    if not crew.planning or crew.planning_llm is None:
+        return
+    usage = crew.planning_llm.usage()
+    with _planning_lock:
+        totals = _planning_usage.setdefault(crew_name, dict.fromkeys(("runs",) + PLANNING_FIELDS, 0))
+        totals["runs"] += 1
+        for field in PLANNING_FIELDS:
+            totals[field] += usage[field]
+
+
+def planning_usage():
+    """Average seconds and tokens the planning step added per run, by crew."""
+    with _planning_lock:
+        usage = {name: dict(totals) for name, totals in _planning_usage.items()}
+    return {
+        name: {"runs": totals["runs"], **{field: totals[field] / totals["runs"] for field in PLANNING_FIELDS}}
+        for name, totals in usage.items()
+    }
+
+
+def crew_template(crew):
+    """The task and agent templates a crew's output depends on."""
+    return {
+        "planning": crew.planning,
+        "tasks": [
+            {
+                "description": task.description,
+                "expected_output": task.expected_output,
+                "role": task.agent.role if task.agent else None,
+                "goal": task.agent.goal if task.agent else None,
+                "backstory": task.agent.backstory if task.agent else None,
+            }
+            for task in crew.tasks
+        ],
+    }
+
+
+def crew_model(crew):
+    agent = crew.tasks[0].agent if crew.tasks else None
+    return getattr(getattr(agent, "llm", None), "model", None)
+
+
+def kickoff(crew, crew_name, inputs, use_cache=True, refresh=False):
+    """
+    Kick off a crew and return its output as a dict.
+
+    Results are cached per stage, keyed only by that stage's own inputs, so a
+    stage is rerun only when something it depends on changed. ``refresh``
+    skips the lookup and replaces the stored result with a fresh run.
+    """
+    if not use_cache:
+        return _kickoff(crew, crew_name, inputs)
+
+    cache = get_cache()
+    key = cache_key(inputs, crew_template(crew), crew_model(crew))
+    with span("cache.lookup", refresh=refresh) as lookup:
+        result = None if refresh else cache.get(key)
+        lookup.set(hit=result is not None)
+    if result is None:
+        result = _kickoff(crew, crew_name, inputs)
+        if result:
+            cache.set(key, result)
+    return result
+
+
+def _kickoff(crew, crew_name, inputs):
+    with span("crew.kickoff", crew=crew_name, planning=bool(crew.planning)):
+        output = crew.kickoff(inputs=inputs)
+    with span("output.to_dict"):
+        result = output.to_dict()
+    record_planning_usage(crew_name, crew)
+    return result
+
+
+def build_crew(crew_name, planning_mode=None):
+    """Load the agent and task configs and assemble one crew, tracing both steps."""
+    # crewAI is imported on first use so importing the pipeline stays cheap
+    from prompt_solution_crew.crew import PromptSolutionCrew
+
+    with span("crew.load_config"):
+        crew_base = PromptSolutionCrew(planning_mode=planning_mode)
+    with span("crew.assemble", crew=crew_name):
+        return getattr(crew_base, crew_name)()
+
+
+def run_architect_crew(inputs, direction_count=DEFAULT_DIRECTIONS, use_cache=True, refresh=False, planning_mode=None,
+                       stream=None, telemetry=None):
+    """
+    Kick off the architect crew and return its first ``direction_count`` directions.
+
+    When a ``streaming.TokenStream`` is given, the architect's output is
+    streamed to it under the ``architect`` stage; a ``telemetry.RunTelemetry``
+    records the stage's cost under the same name. The stage is traced as an
+    ``architect`` span.
+    """
+    if not MIN_DIRECTIONS <= direction_count <= MAX_DIRECTIONS:
+        raise ValueError(f"direction_count must be between {MIN_DIRECTIONS} and {MAX_DIRECTIONS}")
+    with span("architect", direction_count=direction_count), \
+            stream.stage("architect") if stream else nullcontext(), \
+            telemetry.scope("architect") if telemetry else nullcontext():
+        crew = build_crew("architect_crew", planning_mode)
+        result = kickoff(
+            crew,
+            "architect_crew",
+            {**inputs, "direction_count": direction_count},
+            use_cache=use_cache,
+            refresh=refresh,
+        )
+    if "directions" in result:
+        result = {**result, "directions": result["directions"][:direction_count]}
+    return result
+
+
+def architect_directions(result):
+    """The directions of an architect result, raising ValueError when it has none."""
+    directions = result.get("directions") if isinstance(result, dict) else None
+    if not directions:
+        raise ValueError("the architect returned no directions")
+    return directions
+
+
+def run_engineer_crew(inputs, direction, use_cache=True, refresh=False, planning_mode=None,
+                      stream=None, stage="engineer", telemetry=None):
+    """
+    Kick off the prompt engineer crew for one architect direction.
+
+    The stage only depends on the task configuration and its own direction,
+    so regenerating one solution reruns just this crew. When a
+    ``streaming.TokenStream`` or ``telemetry.RunTelemetry`` is given, the
+    output is streamed and the cost recorded under ``stage``, which also
+    names the stage's span.
+    """
+    start = time.perf_counter()
+    with span(stage, refresh=refresh), \
+            stream.stage(stage) if stream else nullcontext(), \
+            telemetry.scope(stage) if telemetry else nullcontext():
+        crew = build_crew("prompt_engineer_crew", planning_mode)
+        result = kickoff(
+            crew,
+            "prompt_engineer_crew",
+            {**inputs, "architect_direction": direction},
+            use_cache=use_cache,
+            refresh=refresh,
+        )
+    return result, time.perf_counter() - start
+
+
+def run_engineer_crews(inputs, directions, max_concurrency=DEFAULT_CONCURRENCY, use_cache=True, planning_mode=None,
+                       stream=None, on_result=None, telemetry=None):
+    """
+    Run one prompt engineer crew per direction.
+
+    Every engineer only depends on its own direction, so the crews are fanned
+    out over a thread pool of at most ``max_concurrency`` workers; a limit of
+    one runs them back-to-back. Returns the results and the seconds each crew
+    took, both in direction order. Streamed output and telemetry of the i-th
+    crew are tagged with the ``engineer:i`` stage, and
+    ``on_result(i, result, seconds)`` is called as soon as that crew
+    finishes. Workers inherit the caller's context, so the rate-limit lane,
+    stream bindings and parent span carry over.
+    """
+    directions = list(directions)
+    if not directions:
+        return [], []
+
+    def run(index, direction):
+        result, seconds = run_engineer_crew(
+            inputs,
+            direction,
+            use_cache=use_cache,
+            planning_mode=planning_mode,
+            stream=stream,
+            stage=f"engineer:{index}",
+            telemetry=telemetry,
+        )
+        if on_result is not None:
+            on_result(index, result, seconds)
+        return result, seconds
+
+    with ThreadPoolExecutor(max_workers=max(1, min(max_concurrency, len(directions)))) as pool:
+        futures = [
+            pool.submit(contextvars.copy_context().run, run, index, direction)
+            for index, direction in enumerate(directions)
+        ]
+        outcomes = [future.result() for future in futures]
+    results = [result for result, _ in outcomes]
+    timings = [seconds for _, seconds in outcomes]
+    return results, timings
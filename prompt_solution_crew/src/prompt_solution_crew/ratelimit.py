@@ -0,0 +1,154 @@
+import contextvars
+import os
+import threading
+import time
+from contextlib import contextmanager
+
+# Lanes in priority order: interactive generations go before batch jobs
+LANES = ("interactive", "batch")
+
+_lane = contextvars.ContextVar("prompt_solution_crew_lane", default="interactive")
+
+
+@contextmanager
+def lane(name):
+    """Run LLM calls made in this context in the given priority lane."""
+    if name not in LANES:
+        raise ValueError(f"lane must be one of {', '.join(LANES)}")
+    token = _lane.set(name)
+    try:
+        yield
+    finally:
+        _lane.reset(token)
+
+
+def current_lane():
+    return _lane.get()
+
+
+class TokenBucket:
+    """Bucket holding up to ``per_minute`` units, refilled continuously."""
+
+    def __init__(self, per_minute):
+        self.capacity = float(per_minute)
+        self.rate = self.capacity / 60
+        self.level = self.capacity
+        self.updated = time.monotonic()
+
+    def refill(self, now):
+        self.level = min(self.capacity, self.level + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def wait_time(self, amount):
+        """Seconds until ``amount`` units are available; requests larger than the bucket wait for a full one."""
+        amount = min(amount, self.capacity)
+        if self.level >= amount:
+            return 0.0
+        return (amount - self.level) / self.rate
+
+    def debit(self, amount):
+        """Take ``amount`` units, at most a full bucket, so one oversized request empties it but no more."""
+        self.level -= min(amount, self.capacity)
+
+
+class RateLimiter:
+    """
+    Process-wide scheduler for LLM calls.
+
+    Every call first acquires one request and its estimated tokens from two
+    token buckets sized by the provider's RPM and TPM limits. Waiting calls
+    are served in lane order, so a batch call never goes ahead of a waiting
+    interactive one. After a 429 all calls pause for a backoff that doubles
+    on consecutive rate-limit errors and resets on the next success. A limit
+    of 0 disables that bucket.
+    """
+
+    def __init__(self, rpm=0, tpm=0, max_backoff=60.0):
+        self.requests = TokenBucket(rpm) if rpm else None
+        self.tokens = TokenBucket(tpm) if tpm else None
+        self.max_backoff = max_backoff
+        self._backoff = 0.0
+        self._paused_until = 0.0
+        self._waiting = {name: 0 for name in LANES}
+        self._condition = threading.Condition()
+
+    def _buckets(self):
+        return [bucket for bucket in (self.requests, self.tokens) if bucket is not None]
+
+    def _ahead(self, lane_name):
+        """Whether a call in a higher-priority lane is waiting."""
+        return any(self._waiting[name] for name in LANES[:LANES.index(lane_name)])
+
+    def acquire(self, tokens):
+        """
+        Block until a call estimated at ``tokens`` tokens may be sent.
+
+        Returns the seconds spent waiting.
+        """
+        lane_name = current_lane()
+        start = time.monotonic()
+        with self._condition:
+            self._waiting[lane_name] += 1
+            try:
+                while True:
+                    now = time.monotonic()
+                    for bucket in self._buckets():
+                        bucket.refill(now)
+                    delay = max(
+                        self._paused_until - now,
+                        self.requests.wait_time(1) if self.requests else 0.0,
+                        self.tokens.wait_time(tokens) if self.tokens else 0.0,
+                    )
+                    if delay <= 0 and not self._ahead(lane_name):
+                        break
+                    # Woken early whenever a call finishes or a lane empties
+                    self._condition.wait(timeout=delay if delay > 0 else 1.0)
+                if self.requests:
+                    self.requests.debit(1)
+                if self.tokens:
+                    self.tokens.debit(tokens)
+            finally:
+                self._waiting[lane_name] -= 1
+                self._condition.notify_all()
+        return time.monotonic() - start
+
+    def settle(self, estimated, actual):
+        """Correct the token bucket once a call's real token count is known."""
+        with self._condition:
+            if self.tokens:
+                capacity = self.tokens.capacity
+                correction = min(estimated, capacity) - min(actual, capacity)
+                self.tokens.level = min(capacity, self.tokens.level + correction)
+            self._backoff = 0.0
+            self._condition.notify_all()
+
+    def backoff(self, retry_after=None):
+        """
+        Pause every call after a rate-limit error and return the pause in seconds.
+
+        Honors the provider's ``retry_after`` when it is longer.
+        """
+        with self._condition:
+            self._backoff = min(self.max_backoff, self._backoff * 2 if self._backoff else 1.0)
+            delay = max(self._backoff, retry_after or 0.0)
+            self._paused_until = max(self._paused_until, time.monotonic() + delay)
+            if self.tokens:
+                self.tokens.level = 0.0
+            self._condition.notify_all()
+            return delay
+
+
+_limiter = None
+_limiter_lock = threading.Lock()
+
+
+def get_limiter():
+    """Return the process-wide rate limiter, configured from the environment."""
+    global _limiter
+    with _limiter_lock:
+        if _limiter is None:
+            _limiter = RateLimiter(
+                rpm=int(os.getenv("PROMPT_LLM_RPM", 500)),
+                tpm=int(os.getenv("PROMPT_LLM_TPM", 200000)),
+            )
+        return _limiter
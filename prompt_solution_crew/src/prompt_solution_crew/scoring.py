@@ -0,0 +1,240 @@
+import re
+import warnings
+
+import numpy as np
+
+from prompt_solution_crew.evaluation import parse_output
+
+# Weighted dimensions, keyed by the slug used in the Dimension Weights slider keys
+DIMENSIONS = (
+    ("accuracy", "Accuracy"),
+    ("goal", "Goal Achievement"),
+    ("efficiency", "Efficiency"),
+    ("logic", "Logic Score"),
+    ("stability", "Stability"),
+    ("explain", "Explainability"),
+    ("creative", "Creativity"),
+    ("safety", "Safety"),
+)
+
+# Per-solution metrics reported next to the dimensions
+METRICS = (
+    "field_match", "completeness", "schema_validity", "reliability", "reasoning_coverage",
+    "example_match", "edge_case_match", "latency", "tokens",
+)
+
+# Output keys that carry the model's explanation of its answer
+REASONING_KEYS = ("reasoning", "explanation", "note", "notes", "rationale")
+
+
+def normalize(value):
+    """Compare strings case- and whitespace-insensitively and numbers by value."""
+    if isinstance(value, bool) or value is None:
+        return value
+    if isinstance(value, (int, float)):
+        return float(value)
+    text = re.sub(r"\s+", " ", str(value)).strip().lower()
+    try:
+        return float(text)
+    except ValueError:
+        return text
+
+
+def flatten(value, prefix=""):
+    """Leaf values of a JSON document keyed by their path, e.g. ``Order.order_date``."""
+    if isinstance(value, dict):
+        leaves = {}
+        for key, item in value.items():
+            leaves.update(flatten(item, f"{prefix}.{key}" if prefix else str(key)))
+        return leaves
+    if isinstance(value, list):
+        leaves = {}
+        for index, item in enumerate(value):
+            leaves.update(flatten(item, f"{prefix}[{index}]"))
+        return leaves
+    return {prefix: normalize(value)}
+
+
+def case_features(case, result):
+    """
+    Measurements of one test case, as floats with NaN where they do not apply.
+
+    ``field_match`` is the share of expected JSON fields the output
+    reproduced, or exact normalized equality when the expected output is not
+    JSON; ``complete`` is the share of expected fields present at all.
+    """
+    features = {
+        "error": float("error" in result),
+        "schema_valid": np.nan,
+        "field_match": np.nan,
+        "complete": np.nan,
+        "reasoning": np.nan,
+        "seconds": result["seconds"],
+        "tokens": float(result.get("tokens", np.nan)),
+    }
+    if "error" in result:
+        return features
+    output = result["json"]
+    features["reasoning"] = float(isinstance(output, dict) and any(
+        key.lower() in REASONING_KEYS for key in output
+    ))
+    expected = parse_output(case.get("expected"))
+    if expected is None:
+        features["schema_valid"] = float(output is not None)
+        if case.get("expected"):
+            features["field_match"] = float(normalize(result["output"]) == normalize(case["expected"]))
+            features["complete"] = features["field_match"]
+        return features
+    expected_fields = flatten(expected)
+    output_fields = flatten(output) if output is not None else {}
+    if isinstance(expected, dict):
+        features["schema_valid"] = float(isinstance(output, dict) and set(expected) <= set(output))
+    else:
+        features["schema_valid"] = float(type(output) is type(expected))
+    if expected_fields:
+        features["field_match"] = np.mean([
+            output_fields.get(path, object()) == value for path, value in expected_fields.items()
+        ])
+        features["complete"] = np.mean([path in output_fields for path in expected_fields])
+    return features
+
+
+def _group_mean(values, solutions, count, mask=None):
+    """Per-solution mean of ``values``, ignoring NaN and rows outside ``mask``; NaN for empty groups."""
+    valid = ~np.isnan(values)
+    if mask is not None:
+        valid &= mask
+    totals = np.bincount(solutions[valid], weights=values[valid], minlength=count)
+    counts = np.bincount(solutions[valid], minlength=count)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        return np.where(counts > 0, totals / np.maximum(counts, 1), np.nan)
+
+
+def _nanmean_rows(*rows):
+    """Column means of the given rows, ignoring NaN; NaN where a column has no values."""
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore", RuntimeWarning)
+        return np.nanmean(np.vstack(rows), axis=0)
+
+
+def _relative(values):
+    """Best value over each value, so the cheapest or fastest solution scores 1."""
+    if np.all(np.isnan(values)):
+        return values
+    best = np.nanmin(values)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        return np.where(np.isnan(values), np.nan, np.where(values > 0, best / values, 1.0))
+
+
+def score_tests(cases, results):
+    """
+    Score every solution's test run on the weighted dimensions.
+
+    ``cases`` and ``results`` hold one list per solution, as passed to and
+    returned by ``evaluation.run_tests``. Case measurements are gathered
+    into one array per feature and aggregated per solution in a single pass.
+    Returns ``{"dimensions": {slug: [score or None per solution]},
+    "metrics": {name: [...]}}`` with scores on a 0-100 scale; a dimension
+    the tests cannot measure, such as safety, is None. Latency and tokens
+    only average the cases that succeeded, so they are None for a
+    solution whose every case errored.
+    """
+    count = len(results)
+    rows = [
+        (solution, case.get("kind"), case_features(case, result))
+        for solution, (solution_cases, solution_results) in enumerate(zip(cases, results))
+        for case, result in zip(solution_cases, solution_results)
+    ]
+    if not rows:
+        return {
+            "dimensions": {slug: [None] * count for slug, _ in DIMENSIONS},
+            "metrics": {name: [None] * count for name in METRICS},
+        }
+    solutions = np.array([row[0] for row in rows])
+    kinds = np.array([row[1] or "" for row in rows])
+    feature = {name: np.array([row[2][name] for row in rows], dtype=float) for name in rows[0][2]}
+
+    def mean(name, mask=None):
+        return _group_mean(feature[name], solutions, count, mask)
+
+    succeeded = feature["error"] == 0
+
+    metrics = {
+        "field_match": mean("field_match"),
+        "completeness": mean("complete"),
+        "schema_validity": mean("schema_valid"),
+        "reliability": 1 - mean("error"),
+        "reasoning_coverage": mean("reasoning"),
+        "example_match": mean("field_match", kinds == "example"),
+        "edge_case_match": mean("field_match", kinds == "edge_case"),
+        # Failed calls often return fast and cheap; only successful cases count towards cost
+        "latency": mean("seconds", succeeded),
+        "tokens": mean("tokens", succeeded),
+    }
+    dimensions = {
+        "accuracy": metrics["field_match"],
+        "goal": metrics["completeness"],
+        "efficiency": _nanmean_rows(_relative(metrics["latency"]), _relative(metrics["tokens"])),
+        "logic": metrics["edge_case_match"],
+        "stability": _nanmean_rows(metrics["schema_validity"], metrics["reliability"]),
+        "explain": metrics["reasoning_coverage"],
+        "creative": metrics["example_match"],
+        "safety": np.full(count, np.nan),
+    }
+
+    def as_scores(values):
+        return [None if np.isnan(value) else round(float(value) * 100) for value in values]
+
+    return {
+        "dimensions": {slug: as_scores(dimensions[slug]) for slug, _ in DIMENSIONS},
+        "metrics": {
+            name: (
+                [None if np.isnan(value) else float(value) for value in values]
+                if name in ("latency", "tokens") else as_scores(values)
+            )
+            for name, values in metrics.items()
+        },
+    }
+
+
+# Default weight of each dimension, as preset on the Dimension Weights sliders
+DEFAULT_WEIGHTS = {
+    "accuracy": 0.3,
+    "goal": 0.2,
+    "efficiency": 0.2,
+    "logic": 0.3,
+    "stability": 0.1,
+    "explain": 0.1,
+    "creative": 0.1,
+    "safety": 0.1,
+}
+
+
+def rank_solutions(dimensions, weights):
+    """
+    Weighted composite score of every solution and their ranking.
+
+    ``dimensions`` maps each slug to one score (or None) per solution, as
+    returned by ``score_tests``; ``weights`` is one ``{slug: weight}`` dict per
+    solution. The composite is the weighted mean over the dimensions that
+    were measured for every solution, so all solutions are compared on the
+    same dimensions; it is computed for all solutions at once from the
+    score and weight matrices. Returns the composites (None when no
+    dimension was measured for every solution) and the solution indices
+    from best to worst.
+    """
+    slugs = [slug for slug, _ in DIMENSIONS]
+    scores = np.array(
+        [[np.nan if score is None else score for score in dimensions[slug]] for slug in slugs], dtype=float
+    ).T
+    weight_matrix = np.array(
+        [[weight.get(slug, 0.0) for slug in slugs] for weight in weights], dtype=float
+    ).reshape(len(weights), len(slugs))
+    measured = np.broadcast_to(~np.isnan(scores).any(axis=0), scores.shape)
+    total_weight = (weight_matrix * measured).sum(axis=1)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        composite = np.where(
+            total_weight > 0, np.nansum(np.where(measured, scores * weight_matrix, 0), axis=1) / total_weight, np.nan
+        )
+    order = [int(index) for index in np.argsort(-np.nan_to_num(composite, nan=-1.0), kind="stable")]
+    return [None if np.isnan(value) else round(float(value), 1) for value in composite], order
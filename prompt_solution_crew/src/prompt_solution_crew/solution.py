@@ -0,0 +1,83 @@
+import functools
+from dataclasses import dataclass, fields
+
+from prompt_solution_crew.store import get_result_store
+
+# Solution fields taken from the architect's direction
+DIRECTION_FIELDS = ("codename", "name", "focus")
+
+# Solution fields taken from the engineer crew's result, and the result key each comes from
+RESULT_FIELDS = {
+    "overview": "explanation_of_optimization_choices",
+    "role": "role",
+    "task": "task",
+    "rules": "rules_constraints",
+    "reasoning": "reasoning_method",
+    "planning": "planning_method",
+    "output_format": "output_format",
+}
+
+TEXT_FIELDS = DIRECTION_FIELDS + tuple(RESULT_FIELDS)
+
+
+@dataclass(frozen=True, slots=True)
+class Solution:
+    """
+    One generated solution: an architect direction and the prompt written for it.
+
+    The text fields refer to the strings of the stored run rather than
+    copying them, and the prompt sections use the field names that
+    ``evaluation.assemble_prompt`` expects, so ``to_dict()`` can be passed
+    to it directly.
+    """
+
+    codename: str | None = None
+    name: str | None = None
+    focus: str | None = None
+    overview: str | None = None
+    role: str | None = None
+    task: str | None = None
+    rules: str | None = None
+    reasoning: str | None = None
+    planning: str | None = None
+    output_format: str | None = None
+    seconds: float | None = None
+    telemetry: dict | None = None
+
+    @classmethod
+    def from_run(cls, run, index):
+        """The ``index``-th solution of a stored run."""
+        direction = run["architect"]["directions"][index]
+        result = run["solutions"][index]
+        return cls(
+            **{field: direction.get(field) for field in DIRECTION_FIELDS},
+            **{field: result.get(key) for field, key in RESULT_FIELDS.items()},
+            seconds=run["timings"][index],
+            telemetry=run["telemetry"]["engineers"][index],
+        )
+
+    def to_dict(self):
+        """The solution as a JSON-serializable dict."""
+        return {field.name: getattr(self, field.name) for field in fields(self)}
+
+    @classmethod
+    def from_dict(cls, data):
+        """Rebuild a solution from ``to_dict()`` output, ignoring unknown keys."""
+        return cls(**{field.name: data.get(field.name) for field in fields(cls)})
+
+
+def run_solutions(run):
+    """All solutions of a stored run, in direction order."""
+    return tuple(Solution.from_run(run, index) for index in range(len(run["solutions"])))
+
+
+@functools.lru_cache(maxsize=64)
+def load_solutions(run_id):
+    """
+    The solutions of the stored run ``run_id``, or an empty tuple if it is unknown.
+
+    Runs never change once saved, so the records are built once per run
+    and shared by every session showing it.
+    """
+    run = get_result_store().load(run_id)
+    return () if run is None else run_solutions(run)
@@ -0,0 +1,132 @@
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+import uuid
+import zlib
+from collections import OrderedDict
+from contextlib import closing
+from pathlib import Path
+
+DEFAULT_STORE_PATH = Path.home() / ".cache" / "prompt_solution_crew" / "results.db"
+
+# Fields of a run that depend only on what was generated; identical content is stored once
+CONTENT_FIELDS = ("inputs", "architect", "solutions")
+
+
+def _pack(value):
+    return zlib.compress(json.dumps(value, sort_keys=True, separators=(",", ":"), default=str).encode("utf-8"))
+
+
+def _unpack(blob):
+    return json.loads(zlib.decompress(blob).decode("utf-8"))
+
+
+def content_digest(content):
+    """Stable hash of a run's generated content."""
+    payload = json.dumps(content, sort_keys=True, separators=(",", ":"), default=str)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class ResultStore:
+    """
+    Server-side store of generation runs, shared by every session.
+
+    A run is one generation: its inputs, the architect output and one
+    solution per direction, plus per-run metadata such as timings,
+    telemetry and the trace. The generated content is stored once per
+    distinct value as compressed JSON keyed by its hash, so identical
+    generations from different users share one copy; each run only adds a
+    small metadata row. Runs are immutable, so sessions can hold just a run
+    ID. Decoded runs are kept in a small in-memory LRU shared by all
+    sessions, and runs older than ``ttl`` seconds are pruned with any
+    content no run refers to.
+    """
+
+    def __init__(self, path=DEFAULT_STORE_PATH, ttl=7 * 24 * 3600, memory_entries=64):
+        self.path = Path(path)
+        self.ttl = ttl
+        self.memory_entries = memory_entries
+        self._memory = OrderedDict()
+        self._lock = threading.Lock()
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        with closing(self._connect()) as conn, conn:
+            conn.execute("CREATE TABLE IF NOT EXISTS contents (digest TEXT PRIMARY KEY, body BLOB NOT NULL)")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS runs ("
+                "run_id TEXT PRIMARY KEY, digest TEXT NOT NULL, meta BLOB NOT NULL, created REAL NOT NULL)"
+            )
+            conn.execute("CREATE INDEX IF NOT EXISTS runs_created ON runs (created)")
+
+    def _connect(self):
+        return sqlite3.connect(self.path, timeout=30)
+
+    def save(self, run):
+        """Store a run dict and return its new run ID."""
+        content = {field: run[field] for field in CONTENT_FIELDS}
+        meta = {field: value for field, value in run.items() if field not in CONTENT_FIELDS}
+        digest = content_digest(content)
+        run_id = uuid.uuid4().hex
+        now = time.time()
+        with closing(self._connect()) as conn, conn:
+            conn.execute("INSERT OR IGNORE INTO contents (digest, body) VALUES (?, ?)", (digest, _pack(content)))
+            conn.execute(
+                "INSERT INTO runs (run_id, digest, meta, created) VALUES (?, ?, ?, ?)",
+                (run_id, digest, _pack(meta), now),
+            )
+            if self.ttl is not None:
+                conn.execute("DELETE FROM runs WHERE created < ?", (now - self.ttl,))
+                conn.execute("DELETE FROM contents WHERE digest NOT IN (SELECT digest FROM runs)")
+        return run_id
+
+    def load(self, run_id):
+        """
+        The run with this ID, or None if it is unknown or was pruned.
+
+        The returned dict is shared with other readers and must not be
+        modified; save a changed copy as a new run instead.
+        """
+        with self._lock:
+            run = self._memory.get(run_id)
+            if run is not None:
+                self._memory.move_to_end(run_id)
+                return run
+        with closing(self._connect()) as conn:
+            row = conn.execute(
+                "SELECT contents.body, runs.meta FROM runs JOIN contents USING (digest) WHERE run_id = ?",
+                (run_id,),
+            ).fetchone()
+        if row is None:
+            return None
+        run = {**_unpack(row[0]), **_unpack(row[1]), "run_id": run_id}
+        with self._lock:
+            self._memory[run_id] = run
+            while len(self._memory) > self.memory_entries:
+                self._memory.popitem(last=False)
+        return run
+
+    def stats(self):
+        """Number of runs and of distinct stored contents."""
+        with closing(self._connect()) as conn:
+            return {
+                "runs": conn.execute("SELECT COUNT(*) FROM runs").fetchone()[0],
+                "contents": conn.execute("SELECT COUNT(*) FROM contents").fetchone()[0],
+            }
+
+
+_store = None
+_store_lock = threading.Lock()
+
+
+def get_result_store():
+    """Return the process-wide result store, configured from the environment."""
+    global _store
+    with _store_lock:
+        if _store is None:
+            _store = ResultStore(
+                path=os.getenv("PROMPT_STORE_PATH", DEFAULT_STORE_PATH),
+                ttl=float(os.getenv("PROMPT_STORE_TTL", 7 * 24 * 3600)),
+            )
+        return _store
@@ -0,0 +1,96 @@
+import contextvars
+import queue
+import re
+from contextlib import contextmanager
+
+_current = contextvars.ContextVar("prompt_solution_crew_stream", default=None)
+
+_ESCAPES = {"n": "\n", "t": "\t", "r": "\r", "b": "\b", "f": "\f", '"': '"', "\\": "\\", "/": "/"}
+
+
+class TokenStream:
+    """
+    Hands streamed LLM tokens from worker threads to a single reader.
+
+    Producers tag their output with a stage name by running inside
+    ``stream.stage(name)``; the reader calls ``poll()`` and reads ``texts``,
+    which holds the output of the latest LLM call of each stage.
+    """
+
+    def __init__(self):
+        self.texts = {}
+        self._events = queue.Queue()
+
+    @contextmanager
+    def stage(self, name):
+        token = _current.set((self, name))
+        try:
+            yield
+        finally:
+            _current.reset(token)
+
+    def emit(self, stage, kind, text=""):
+        self._events.put((stage, kind, text))
+
+    def poll(self):
+        """Apply pending events to ``texts`` and return the stages that changed."""
+        changed = set()
+        while True:
+            try:
+                stage, kind, text = self._events.get_nowait()
+            except queue.Empty:
+                return changed
+            if kind == "start":
+                self.texts[stage] = ""
+            else:
+                self.texts[stage] = self.texts.get(stage, "") + text
+            changed.add(stage)
+
+
+def is_streaming():
+    return _current.get() is not None
+
+
+def emit(kind, text=""):
+    """Send a ``start`` or ``delta`` event to the stream bound to this context, if any."""
+    target = _current.get()
+    if target is not None:
+        stream, stage = target
+        stream.emit(stage, kind, text)
+
+
+def partial_json_values(text, field):
+    """
+    Values of every ``"field": "..."`` string in possibly incomplete JSON.
+
+    Values are returned in order of appearance; the last one may be cut off
+    mid-string while the model is still writing it.
+    """
+    values = []
+    for match in re.finditer(r'"%s"\s*:\s*"' % re.escape(field), text):
+        chars = []
+        i = match.end()
+        while i < len(text):
+            char = text[i]
+            if char == '"':
+                break
+            if char == "\\":
+                if i + 1 >= len(text):
+                    break
+                escaped = text[i + 1]
+                if escaped == "u":
+                    if i + 6 > len(text):
+                        break
+                    try:
+                        chars.append(chr(int(text[i + 2:i + 6], 16)))
+                    except ValueError:
+                        pass
+                    i += 6
+                    continue
+                chars.append(_ESCAPES.get(escaped, escaped))
+                i += 2
+                continue
+            chars.append(char)
+            i += 1
+        values.append("".join(chars))
+    return values
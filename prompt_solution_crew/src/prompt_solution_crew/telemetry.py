@@ -0,0 +1,110 @@
+import contextvars
+import threading
+import time
+from contextlib import contextmanager
+
+_current = contextvars.ContextVar("prompt_solution_crew_telemetry", default=None)
+
+# USD per million prompt/completion tokens, used when litellm has no price
+PRICES = {
+    "gpt-4o-mini": (0.15, 0.60),
+    "gpt-4o": (2.50, 10.00),
+}
+
+
+def call_cost(model, prompt_tokens, completion_tokens):
+    """Cost of one LLM call in USD, or 0.0 for models without a known price."""
+    try:
+        from litellm import cost_per_token
+        prompt_cost, completion_cost = cost_per_token(
+            model=model, prompt_tokens=prompt_tokens, completion_tokens=completion_tokens
+        )
+        return prompt_cost + completion_cost
+    except Exception:
+        prompt_price, completion_price = PRICES.get(model, (0.0, 0.0))
+        return (prompt_tokens * prompt_price + completion_tokens * completion_price) / 1_000_000
+
+
+class RunTelemetry:
+    """
+    Collects the cost of one generation run, broken down by stage.
+
+    Work runs inside ``telemetry.scope(name)``, which measures its wall time;
+    every ``MeteredLLM`` call made in that context is added to the scope with
+    its tokens, latency, rate-limit queue wait and cost.
+    """
+
+    def __init__(self):
+        self.calls = {}
+        self.wall_seconds = {}
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def scope(self, name):
+        token = _current.set((self, name))
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            _current.reset(token)
+            with self._lock:
+                self.wall_seconds[name] = self.wall_seconds.get(name, 0.0) + time.perf_counter() - start
+
+    def add(self, scope, call):
+        with self._lock:
+            self.calls.setdefault(scope, []).append(call)
+
+    def summary(self, scope):
+        """Totals for one scope; a scope served from the cache has no calls."""
+        with self._lock:
+            calls = list(self.calls.get(scope, []))
+            wall_seconds = self.wall_seconds.get(scope, 0.0)
+        return {
+            "calls": len(calls),
+            "prompt_tokens": sum(call["prompt_tokens"] for call in calls),
+            "completion_tokens": sum(call["completion_tokens"] for call in calls),
+            "llm_seconds": sum(call["seconds"] for call in calls),
+            "queued_seconds": sum(call["queued_seconds"] for call in calls),
+            "wall_seconds": wall_seconds,
+            "cost": sum(call["cost"] for call in calls),
+        }
+
+    def summaries(self):
+        with self._lock:
+            names = set(self.calls) | set(self.wall_seconds)
+        return {name: self.summary(name) for name in sorted(names)}
+
+
+def record(model, call):
+    """Add a finished LLM call to the telemetry scope bound to this context, if any."""
+    target = _current.get()
+    if target is not None:
+        telemetry, scope = target
+        telemetry.add(scope, {
+            **call,
+            "model": model,
+            "cost": call_cost(model, call["prompt_tokens"], call["completion_tokens"]),
+        })
+
+
+def efficiency_scores(summaries):
+    """
+    Relative efficiency of each solution on a 0-100 scale.
+
+    Each solution is scored against the cheapest and the fastest one, with
+    cost and wall time weighted equally. Returns None for missing summaries.
+    """
+    measured = [summary for summary in summaries if summary]
+    if not measured:
+        return [None] * len(summaries)
+    best_cost = min(summary["cost"] for summary in measured)
+    best_time = min(summary["wall_seconds"] for summary in measured)
+
+    def ratio(best, value):
+        return best / value if value else 1.0
+
+    return [
+        round(50 * (ratio(best_cost, summary["cost"]) + ratio(best_time, summary["wall_seconds"])))
+        if summary else None
+        for summary in summaries
+    ]
@@ -0,0 +1,207 @@
+import contextvars
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
+from pathlib import Path
+
+DEFAULT_TRACE_PATH = Path.home() / ".cache" / "prompt_solution_crew" / "traces.jsonl"
+SERVICE_NAME = "prompt_solution_crew"
+
+# Trace file size at which it is rotated, and the number of rotated files kept
+DEFAULT_TRACE_MAX_BYTES = 50 * 1024 * 1024
+DEFAULT_TRACE_BACKUPS = 3
+
+_current = contextvars.ContextVar("prompt_solution_crew_span", default=None)
+
+
+def _otlp_value(value):
+    if isinstance(value, bool):
+        return {"boolValue": value}
+    if isinstance(value, int):
+        return {"intValue": str(value)}
+    if isinstance(value, float):
+        return {"doubleValue": value}
+    return {"stringValue": str(value)}
+
+
+class Span:
+    """One timed operation; ``parent_id`` is None for the root span of a trace."""
+
+    def __init__(self, name, trace_id, parent_id, attributes):
+        self.name = name
+        self.trace_id = trace_id
+        self.span_id = os.urandom(8).hex()
+        self.parent_id = parent_id
+        self.attributes = dict(attributes)
+        self.start_ns = time.time_ns()
+        self.end_ns = None
+        self.error = None
+
+    def set(self, **attributes):
+        self.attributes.update(attributes)
+
+    def to_dict(self):
+        return {
+            "name": self.name,
+            "trace_id": self.trace_id,
+            "span_id": self.span_id,
+            "parent_id": self.parent_id,
+            "start_ns": self.start_ns,
+            "end_ns": self.end_ns,
+            "attributes": self.attributes,
+            "error": self.error,
+        }
+
+    def to_otlp(self):
+        span = {
+            "traceId": self.trace_id,
+            "spanId": self.span_id,
+            "name": self.name,
+            "kind": 1,
+            "startTimeUnixNano": str(self.start_ns),
+            "endTimeUnixNano": str(self.end_ns),
+            "attributes": [{"key": key, "value": _otlp_value(value)} for key, value in self.attributes.items()],
+            "status": {"code": 2, "message": self.error} if self.error else {"code": 1},
+        }
+        if self.parent_id:
+            span["parentSpanId"] = self.parent_id
+        return span
+
+
+class OtlpJsonFileExporter:
+    """
+    Appends each finished trace to a file as one OTLP/JSON ``resourceSpans`` line.
+
+    This is the format the OpenTelemetry collector's file exporter writes,
+    so traces can be loaded into any OTLP-compatible viewer later. Once a
+    line would take the file past ``max_bytes`` it is rotated the way
+    ``logging.handlers.RotatingFileHandler`` does, to ``<path>.1`` and on
+    up to ``backups`` files, so a long-running server keeps a bounded
+    amount of trace history.
+    """
+
+    def __init__(self, path, max_bytes=DEFAULT_TRACE_MAX_BYTES, backups=DEFAULT_TRACE_BACKUPS):
+        self.path = Path(path)
+        self.max_bytes = max_bytes
+        self.backups = backups
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+
+    def _backup(self, index):
+        return self.path.with_name(f"{self.path.name}.{index}")
+
+    def _rotate(self):
+        for index in range(self.backups - 1, 0, -1):
+            if self._backup(index).exists():
+                os.replace(self._backup(index), self._backup(index + 1))
+        if self.backups > 0:
+            os.replace(self.path, self._backup(1))
+        else:
+            self.path.unlink()
+
+    def export(self, spans):
+        payload = {
+            "resourceSpans": [{
+                "resource": {"attributes": [{"key": "service.name", "value": {"stringValue": SERVICE_NAME}}]},
+                "scopeSpans": [{"scope": {"name": SERVICE_NAME}, "spans": [span.to_otlp() for span in spans]}],
+            }]
+        }
+        line = (json.dumps(payload) + "\n").encode("utf-8")
+        with self._lock:
+            try:
+                size = self.path.stat().st_size
+            except FileNotFoundError:
+                size = 0
+            if size and size + len(line) > self.max_bytes:
+                self._rotate()
+            with open(self.path, "ab") as output:
+                output.write(line)
+
+
+class Tracer:
+    """
+    Records nested spans across threads.
+
+    The active span is kept in a context variable, so spans opened inside
+    ``span()`` become its children, including in pool workers started with
+    a copy of the context. When a root span ends its whole trace is handed
+    to the exporter and kept in memory for the last ``keep`` traces.
+    """
+
+    def __init__(self, exporter=None, keep=20):
+        self.exporter = exporter
+        self.keep = keep
+        self._open = {}
+        self._finished = OrderedDict()
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def span(self, name, **attributes):
+        parent = _current.get()
+        trace_id = parent.trace_id if parent else os.urandom(16).hex()
+        span = Span(name, trace_id, parent.span_id if parent else None, attributes)
+        token = _current.set(span)
+        try:
+            yield span
+        except BaseException as e:
+            span.error = f"{type(e).__name__}: {e}"
+            raise
+        finally:
+            _current.reset(token)
+            span.end_ns = time.time_ns()
+            self._end(span)
+
+    def _end(self, span):
+        with self._lock:
+            spans = self._open.setdefault(span.trace_id, [])
+            spans.append(span)
+            if span.parent_id is not None:
+                return
+            del self._open[span.trace_id]
+            self._finished[span.trace_id] = spans
+            while len(self._finished) > self.keep:
+                self._finished.popitem(last=False)
+        if self.exporter is not None:
+            self.exporter.export(spans)
+
+    def trace(self, trace_id):
+        """Spans of a finished trace as dicts, ordered by start time."""
+        with self._lock:
+            spans = list(self._finished.get(trace_id, []))
+        return [span.to_dict() for span in sorted(spans, key=lambda span: span.start_ns)]
+
+
+def current_span():
+    return _current.get()
+
+
+_tracer = None
+_tracer_lock = threading.Lock()
+
+
+def get_tracer():
+    """
+    Return the process-wide tracer, configured from the environment.
+
+    Traces are written to ``PROMPT_TRACE_PATH``; set it to an empty string
+    to only keep them in memory. The file is rotated at
+    ``PROMPT_TRACE_MAX_BYTES``, keeping ``PROMPT_TRACE_BACKUPS`` old files.
+    """
+    global _tracer
+    with _tracer_lock:
+        if _tracer is None:
+            path = os.getenv("PROMPT_TRACE_PATH", DEFAULT_TRACE_PATH)
+            _tracer = Tracer(OtlpJsonFileExporter(
+                path,
+                max_bytes=int(os.getenv("PROMPT_TRACE_MAX_BYTES", DEFAULT_TRACE_MAX_BYTES)),
+                backups=int(os.getenv("PROMPT_TRACE_BACKUPS", DEFAULT_TRACE_BACKUPS)),
+            ) if path else None)
+        return _tracer
+
+
+def span(name, **attributes):
+    """Open a span on the process-wide tracer."""
+    return get_tracer().span(name, **attributes)
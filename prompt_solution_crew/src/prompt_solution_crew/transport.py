@@ -0,0 +1,130 @@
+import gzip
+import hashlib
+import json
+import os
+import threading
+import time
+import zlib
+from collections import defaultdict
+
+
+def request_key(model, messages):
+    """Stable hash of one LLM request, used to find its recorded response."""
+    payload = json.dumps({"model": model, "messages": messages}, sort_keys=True, default=str)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class CassetteMiss(KeyError):
+    """A replayed run made a request that was never recorded."""
+
+
+class RecordingTransport:
+    """
+    Passes every call to the provider and records it to a gzip cassette.
+
+    Each response is appended as one JSON line holding the request key and
+    the response chunks with their offsets in seconds, so a replay can
+    reproduce the original streaming timing. Every entry is written as its
+    own gzip member, so an interrupted recording keeps all finished calls.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self._lock = threading.Lock()
+
+    def complete(self, model, messages, stream=False, live=None):
+        start = time.perf_counter()
+        if not stream:
+            text = live()
+            self._write(model, messages, [[time.perf_counter() - start, text]])
+            return text
+        return self._record_stream(model, messages, live(), start)
+
+    def _record_stream(self, model, messages, chunks, start):
+        recorded = []
+        for chunk in chunks:
+            recorded.append([time.perf_counter() - start, chunk])
+            yield chunk
+        self._write(model, messages, recorded)
+
+    def _write(self, model, messages, chunks):
+        line = json.dumps({
+            "key": request_key(model, messages),
+            "model": model,
+            "chunks": [[round(offset, 4), text] for offset, text in chunks],
+        })
+        with self._lock, gzip.open(self.path, "at", encoding="utf-8") as cassette:
+            cassette.write(line + "\n")
+
+
+class ReplayTransport:
+    """
+    Answers calls from a recorded cassette without touching the network.
+
+    Responses are replayed with their recorded timing divided by ``speed``;
+    a speed of 0 replays instantly. A request recorded several times is
+    answered with its recordings in order, repeating the last one. A request
+    that was never recorded raises ``CassetteMiss``. A cassette cut off
+    mid-write keeps its complete entries; one with none raises ValueError.
+    """
+
+    offline = True
+
+    def __init__(self, path, speed=0.0):
+        self.path = path
+        self.speed = speed
+        self._entries = defaultdict(list)
+        self._served = defaultdict(int)
+        self._lock = threading.Lock()
+        with gzip.open(path, "rt", encoding="utf-8") as cassette:
+            try:
+                for line in cassette:
+                    if line.strip():
+                        entry = json.loads(line)
+                        self._entries[entry["key"]].append(entry["chunks"])
+            except (EOFError, zlib.error, gzip.BadGzipFile, json.JSONDecodeError) as e:
+                # A recording cut off mid-write; keep every complete entry
+                if not self._entries:
+                    raise ValueError(f"{path} is not a readable cassette: {e}") from e
+
+    def complete(self, model, messages, stream=False, live=None):
+        key = request_key(model, messages)
+        with self._lock:
+            recordings = self._entries.get(key)
+            if not recordings:
+                raise CassetteMiss(f"no recorded response for this {model} request in {self.path}")
+            chunks = recordings[min(self._served[key], len(recordings) - 1)]
+            self._served[key] += 1
+        if not stream:
+            self._sleep(chunks[-1][0] if chunks else 0.0)
+            return "".join(text for _, text in chunks)
+        return self._replay_stream(chunks)
+
+    def _replay_stream(self, chunks):
+        elapsed = 0.0
+        for offset, text in chunks:
+            self._sleep(offset - elapsed)
+            elapsed = offset
+            yield text
+
+    def _sleep(self, seconds):
+        if self.speed and seconds > 0:
+            time.sleep(seconds / self.speed)
+
+
+def transport_from_env():
+    """
+    The transport configured by ``PROMPT_LLM_CASSETTE``, or None for live calls.
+
+    ``PROMPT_LLM_CASSETTE_MODE`` is ``replay`` (the default) or ``record``;
+    ``PROMPT_LLM_REPLAY_SPEED`` scales replay timing and defaults to 0, instant, like the CLI.
+    """
+    path = os.getenv("PROMPT_LLM_CASSETTE")
+    if not path:
+        return None
+    mode = os.getenv("PROMPT_LLM_CASSETTE_MODE", "replay")
+    if mode == "record":
+        return RecordingTransport(path)
+    if mode == "replay":
+        return ReplayTransport(path, speed=float(os.getenv("PROMPT_LLM_REPLAY_SPEED", 0.0)))
+    raise ValueError(f"Unknown cassette mode {mode!r}, expected 'record' or 'replay'")
@@ -0,0 +1,5 @@
+import os
+
+# Keep test runs offline: LiteLLM's bundled price list and no crewAI telemetry
+os.environ.setdefault("LITELLM_LOCAL_MODEL_COST_MAP", "True")
+os.environ.setdefault("OTEL_SDK_DISABLED", "true")
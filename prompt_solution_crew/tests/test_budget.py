@@ -0,0 +1,47 @@
+import pytest
+
+from prompt_solution_crew.budget import OMISSION_MARKER, TOKENIZER_MODEL, count_tokens, fit_text
+
+
+def tokens(text):
+    return count_tokens(TOKENIZER_MODEL, text=text)
+
+
+ROWS = "\n".join(f"ORD-{i},2024-03-{i % 28 + 1:02d},Customer {i},c{i}@example.com" for i in range(5000))
+
+
+def test_text_within_budget_is_unchanged():
+    fitted, before, after = fit_text("short text", 100)
+    assert fitted == "short text"
+    assert before == after
+
+
+def test_cut_keeps_start_and_end():
+    fitted, before, after = fit_text("id,date,name,email\n" + ROWS, 300)
+    lines = fitted.splitlines()
+    assert lines[0] == "id,date,name,email"
+    assert lines[-1] == ROWS.splitlines()[-1]
+    assert any(line.startswith("[... ") for line in lines)
+    assert after < before
+
+
+@pytest.mark.parametrize("text", [ROWS, "x" * 200000], ids=["lines", "one-line"])
+@pytest.mark.parametrize("budget", [0, 1, 5, 13, 50, 300])
+def test_result_never_exceeds_budget_or_marker(text, budget):
+    fitted, before, after = fit_text(text, budget)
+    marker = next(line for line in fitted.splitlines() if line.startswith("[... "))
+    assert after == tokens(fitted)
+    assert after <= max(budget, tokens(marker))
+    assert after < before
+
+
+def test_budget_smaller_than_marker_keeps_only_the_marker():
+    fitted, _, _ = fit_text(ROWS, tokens(OMISSION_MARKER) - 1)
+    assert fitted.startswith("[... ") and "\n" not in fitted
+
+
+def test_many_short_lines_stay_within_budget():
+    text = "\n".join(f"Page {i} order ORD-{i}" for i in range(3000))
+    fitted, _, after = fit_text(text, 3000)
+    assert after <= 3000
+    assert fitted.splitlines()[0] == "Page 0 order ORD-0"
@@ -0,0 +1,120 @@
+import sqlite3
+import time
+from contextlib import closing
+
+import pytest
+
+from prompt_solution_crew import batch, jobs, tracing
+from prompt_solution_crew.jobs import DONE, FAILED, FINISHED, RUNNING, JobQueue
+
+
+def queue(tmp_path, **options):
+    # No worker threads: the tests claim jobs themselves
+    return JobQueue(lambda request, report: request, path=tmp_path / "jobs.db", workers=0, **options)
+
+
+def set_running(jobs, job_id, heartbeat):
+    with closing(sqlite3.connect(jobs.path)) as conn, conn:
+        conn.execute(
+            "UPDATE jobs SET status = ?, started = ?, heartbeat = ? WHERE id = ?",
+            (RUNNING, heartbeat, heartbeat, job_id),
+        )
+
+
+def wait_finished(jobs, job_id, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while (job := jobs.get(job_id))["status"] not in FINISHED:
+        assert time.monotonic() < deadline, f"job still {job['status']}"
+        time.sleep(0.01)
+    return job
+
+
+def test_claims_go_to_the_owner_with_the_fewest_running_jobs(tmp_path):
+    jobs = queue(tmp_path)
+    a1, a2, a3 = (jobs.submit("a", {"job": name}) for name in ("a1", "a2", "a3"))
+    b1 = jobs.submit("b", {"job": "b1"})
+
+    assert [jobs._claim()[0] for _ in range(4)] == [a1, b1, a2, a3]
+    assert jobs._claim() is None
+
+
+def test_ties_go_to_the_owner_served_least_recently(tmp_path):
+    jobs = queue(tmp_path)
+    a1, b1 = jobs.submit("a", {}), jobs.submit("b", {})
+    jobs._claim(), jobs._claim()
+    for job_id in (a1, b1):
+        jobs._update(job_id, status=DONE, finished=time.time())
+    b2, a2 = jobs.submit("b", {}), jobs.submit("a", {})
+
+    # b was served last, so a goes first even though b queued first
+    assert [jobs._claim()[0] for _ in range(2)] == [a2, b2]
+
+
+def test_finished_and_failed_jobs_are_recorded(tmp_path):
+    def handler(request, report):
+        report({"stage": "working"})
+        if request.get("fail"):
+            raise RuntimeError("boom")
+        return {"answer": request["n"] * 2}
+
+    jobs = JobQueue(handler, path=tmp_path / "jobs.db", workers=1)
+    done = wait_finished(jobs, jobs.submit("a", {"n": 21}))
+    failed = wait_finished(jobs, jobs.submit("a", {"fail": True}))
+
+    assert (done["status"], done["result"], done["error"]) == (DONE, {"answer": 42}, None)
+    assert (failed["status"], failed["result"], failed["error"]) == (FAILED, None, "RuntimeError: boom")
+    assert failed["progress"] == {"stage": "working"}
+    assert failed["finished"] >= failed["started"]
+
+
+def test_only_running_jobs_with_a_stale_heartbeat_are_requeued(tmp_path):
+    jobs = queue(tmp_path, stale_seconds=60)
+    stale, live = jobs.submit("a", {"n": 1}), jobs.submit("b", {"n": 2})
+    set_running(jobs, stale, time.time() - 120)
+    set_running(jobs, live, time.time())
+
+    assert jobs._claim() == (stale, {"n": 1})
+    assert jobs.get(live)["status"] == RUNNING
+    assert jobs._claim() is None
+
+
+def test_a_second_queue_on_the_same_database_leaves_live_jobs_running(tmp_path):
+    jobs = queue(tmp_path)
+    job_id = jobs.submit("a", {"n": 1})
+    jobs._claim()
+
+    queue(tmp_path)
+    assert jobs.get(job_id)["status"] == RUNNING
+
+
+def test_databases_without_a_heartbeat_column_are_migrated(tmp_path):
+    with closing(sqlite3.connect(tmp_path / "jobs.db")) as conn, conn:
+        conn.execute(
+            "CREATE TABLE jobs ("
+            "id TEXT PRIMARY KEY, owner TEXT NOT NULL, status TEXT NOT NULL, "
+            "request TEXT NOT NULL, progress TEXT, result TEXT, error TEXT, "
+            "created REAL NOT NULL, started REAL, finished REAL)"
+        )
+        conn.execute(
+            "INSERT INTO jobs (id, owner, status, request, created, started) VALUES (?, ?, ?, ?, ?, ?)",
+            ("old", "a", RUNNING, "{}", 0.0, 0.0),
+        )
+    jobs = queue(tmp_path)
+
+    assert jobs._claim() == ("old", {})
+    assert jobs.get("old")["heartbeat"] is not None
+    assert jobs.get("old")["status"] == RUNNING
+
+
+@pytest.mark.parametrize("architect_result", [{}, {"analysis": "no directions key"}, {"directions": []}])
+def test_generation_without_directions_fails_like_a_batch_run(monkeypatch, architect_result):
+    monkeypatch.setattr(jobs, "run_architect_crew", lambda *args, **kwargs: architect_result)
+    monkeypatch.setattr(batch, "run_architect_crew", lambda *args, **kwargs: architect_result)
+    # Keep the spans in memory
+    monkeypatch.setattr(tracing, "_tracer", tracing.Tracer())
+    request = {"inputs": {}, "direction_count": 3, "max_concurrency": 1, "use_cache": False, "planning_mode": "off"}
+
+    with pytest.raises(ValueError, match="no directions"):
+        jobs.run_generation(request, lambda progress: None)
+    with pytest.raises(ValueError, match="no directions"):
+        batch.generate({}, 3, 1, False, "off")
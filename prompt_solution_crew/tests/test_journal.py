@@ -0,0 +1,75 @@
+import io
+import json
+
+import pytest
+
+from prompt_solution_crew import batch, tracing
+from prompt_solution_crew.journal import CheckpointJournal, record_key
+
+
+def test_a_reopened_journal_resumes_with_every_recorded_stage(tmp_path):
+    path = tmp_path / "run.journal"
+    with CheckpointJournal(path) as journal:
+        journal.record("a", "architect", {"directions": [1, 2]})
+        journal.record("a", "engineer:0", {"role": "r"})
+
+    with CheckpointJournal(path) as journal:
+        assert journal.get("a", "architect") == {"directions": [1, 2]}
+        assert journal.get("a", "engineer:0") == {"role": "r"}
+        assert journal.get("a", "engineer:1") is None
+
+
+def test_a_torn_last_line_is_ignored_and_the_next_entry_starts_a_new_line(tmp_path):
+    path = tmp_path / "run.journal"
+    with CheckpointJournal(path) as journal:
+        journal.record("a", "architect", {"directions": [1]})
+    with open(path, "a", encoding="utf-8") as file:
+        file.write('{"key": "a", "stage": "engineer:0", "res')
+
+    with CheckpointJournal(path) as journal:
+        assert journal.get("a", "engineer:0") is None
+        journal.record("a", "engineer:0", {"role": "r"})
+
+    with CheckpointJournal(path) as journal:
+        assert journal.get("a", "architect") == {"directions": [1]}
+        assert journal.get("a", "engineer:0") == {"role": "r"}
+
+
+def test_record_keys_depend_on_inputs_and_direction_count():
+    inputs = {"task_description": "t"}
+    assert record_key(inputs, 3) == record_key(dict(inputs), 3)
+    assert record_key(inputs, 3) != record_key(inputs, 4)
+
+
+@pytest.fixture
+def fake_generate(monkeypatch):
+    calls = []
+
+    def generate(inputs, **options):
+        calls.append(inputs["task_description"])
+        return {"solutions": []}
+
+    monkeypatch.setattr(batch, "generate", generate)
+    # Keep the spans in memory
+    monkeypatch.setattr(tracing, "_tracer", tracing.Tracer())
+    return calls
+
+
+def test_a_rerun_skips_records_the_journal_marks_done(tmp_path, fake_generate):
+    lines = [json.dumps({"task_description": name}) for name in ("one", "two")]
+    with CheckpointJournal(tmp_path / "run.journal") as journal:
+        assert batch.run_batch(lines[:1], io.StringIO(), journal=journal)["succeeded"] == 1
+    with CheckpointJournal(tmp_path / "run.journal") as journal:
+        counts = batch.run_batch(lines, io.StringIO(), journal=journal)
+
+    assert counts == {"succeeded": 1, "failed": 0, "skipped": 1}
+    assert fake_generate == ["one", "two"]
+
+
+def test_an_output_write_failure_stops_the_run(fake_generate):
+    class BrokenOutput(io.StringIO):
+        def write(self, text):
+            raise OSError("disk full")
+
+    with pytest.raises(OSError, match="disk full"):
+        batch.run_batch([json.dumps({"task_description": "one"})], BrokenOutput(), workers=1)
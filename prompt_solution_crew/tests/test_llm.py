@@ -0,0 +1,37 @@
+from types import SimpleNamespace
+
+import litellm
+from crewai import LLM
+
+from prompt_solution_crew.llm import MeteredLLM
+
+
+def test_streamed_calls_send_the_same_params_as_unstreamed_ones(monkeypatch):
+    calls = []
+
+    def completion(**params):
+        calls.append(params)
+        if params["stream"]:
+            return iter([SimpleNamespace(choices=[SimpleNamespace(delta=SimpleNamespace(content="ok"))])])
+        return {"choices": [{"message": {"content": "ok"}}]}
+
+    monkeypatch.setattr(litellm, "completion", completion)
+    llm = MeteredLLM(
+        model="gpt-4o-mini",
+        max_completion_tokens=50,
+        response_format={"type": "json_object"},
+        api_key="test",
+        user="someone",
+    )
+    messages = [{"role": "user", "content": "hi"}]
+
+    assert "".join(llm._live_chunks(messages)) == "ok"
+    LLM.call(llm, messages)
+
+    streamed, unstreamed = calls
+    assert streamed.pop("stream") is True
+    assert unstreamed.pop("stream") is False
+    assert streamed == unstreamed
+    assert streamed["max_tokens"] == 50
+    assert streamed["response_format"] == {"type": "json_object"}
+    assert streamed["user"] == "someone"
@@ -0,0 +1,51 @@
+import threading
+import time
+
+from prompt_solution_crew.ratelimit import RateLimiter, TokenBucket, lane
+
+# Seconds a bucket takes to refill from empty, whatever its size
+REFILL_WINDOW = 60.0
+
+
+def test_request_within_capacity_is_debited_in_full():
+    bucket = TokenBucket(100)
+    bucket.debit(30)
+    assert bucket.level == 70
+
+
+def test_oversized_request_empties_the_bucket_but_no_more():
+    bucket = TokenBucket(100)
+    bucket.debit(500)
+    assert bucket.level == 0
+
+
+def test_oversized_call_does_not_block_the_next_call_past_one_refill_window():
+    limiter = RateLimiter(tpm=100)
+    assert limiter.acquire(500) < 1.0
+    limiter.tokens.refill(time.monotonic())
+    assert limiter.tokens.wait_time(20) <= REFILL_WINDOW
+
+
+def test_settle_of_an_oversized_call_stays_within_one_bucket():
+    limiter = RateLimiter(tpm=100)
+    limiter.acquire(500)
+    limiter.settle(500, 480)
+    assert -limiter.tokens.capacity <= limiter.tokens.level <= limiter.tokens.capacity
+    limiter.tokens.refill(time.monotonic())
+    assert limiter.tokens.wait_time(20) <= REFILL_WINDOW
+
+
+def test_next_call_in_the_same_lane_goes_through_after_a_short_refill():
+    # 6000 tokens a minute refill 100 tokens a second
+    limiter = RateLimiter(tpm=6000)
+    with lane("batch"):
+        limiter.acquire(60000)
+        done = threading.Event()
+
+        def next_call():
+            limiter.acquire(50)
+            done.set()
+
+        worker = threading.Thread(target=next_call, daemon=True)
+        worker.start()
+        assert done.wait(timeout=3.0)
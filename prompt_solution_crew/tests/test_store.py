@@ -0,0 +1,45 @@
+import sqlite3
+from contextlib import closing
+
+from prompt_solution_crew.store import ResultStore
+
+
+def run(seconds=1.0, role="r"):
+    return {
+        "inputs": {"task_description": "t"},
+        "architect": {"directions": [{"codename": "A"}]},
+        "solutions": [{"role": role}],
+        "timings": [seconds],
+    }
+
+
+def test_identical_runs_share_one_content_row(tmp_path):
+    store = ResultStore(tmp_path / "results.db")
+    first, second = store.save(run(seconds=1.0)), store.save(run(seconds=2.0))
+
+    assert first != second
+    assert store.stats() == {"runs": 2, "contents": 1}
+    store.save(run(role="other"))
+    assert store.stats() == {"runs": 3, "contents": 2}
+
+
+def test_runs_load_with_their_own_metadata(tmp_path):
+    store = ResultStore(tmp_path / "results.db")
+    first, second = store.save(run(seconds=1.0)), store.save(run(seconds=2.0))
+    # A fresh store reads from disk rather than the in-memory LRU
+    store = ResultStore(tmp_path / "results.db")
+
+    assert store.load(first) == {**run(seconds=1.0), "run_id": first}
+    assert store.load(second)["timings"] == [2.0]
+    assert store.load("unknown") is None
+
+
+def test_expired_runs_are_pruned_with_their_content(tmp_path):
+    store = ResultStore(tmp_path / "results.db", ttl=60)
+    old = store.save(run(role="old"))
+    with closing(sqlite3.connect(store.path)) as conn, conn:
+        conn.execute("UPDATE runs SET created = 0 WHERE run_id = ?", (old,))
+    store.save(run())
+
+    assert store.stats() == {"runs": 1, "contents": 1}
+    assert ResultStore(tmp_path / "results.db").load(old) is None